@@ -0,0 +1,165 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import requests
+
+from audio_buffer import AudioBuffer
+from frame_store import encode_frames
+
+
+class ServiceError(RuntimeError):
+    """A job failed in the analysis service, or the service could not be reached."""
+
+
+class AnalysisClient:
+    def __init__(self, base_url: str, timeout: float = 600.0, request_timeout: float = 30.0):
+        """
+        Client of the analysis service (analysis_service.py).
+        Args:
+            base_url: Service URL, e.g. http://127.0.0.1:8765
+            timeout: Seconds to wait for a job to finish
+            request_timeout: Seconds allowed for a single HTTP request
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.request_timeout = request_timeout
+        self.session = requests.Session()
+
+    def _submit(self, kind: str, name: str, data: bytes, fields: Optional[Dict] = None) -> str:
+        response = self.session.post(f"{self.base_url}/jobs/{kind}", files={'file': (name, data)},
+                                     data=fields or {}, timeout=self.request_timeout)
+        response.raise_for_status()
+        return response.json()['id']
+
+    def submit_resume(self, pdf_path: str) -> str:
+        """Queue resume parsing. Returns the job id."""
+        with open(pdf_path, 'rb') as f:
+            return self._submit('resume', os.path.basename(pdf_path), f.read())
+
+    def submit_audio(self, audio, question: Dict, skills: List[str], transcription: Optional[Dict] = None) -> str:
+        """
+        Queue the audio stages of an answer (transcription, voice, fluency, content, evaluation).
+        Args:
+            audio: AudioBuffer or path to an audio file
+            question: Question dictionary the answer is evaluated against
+            skills: Candidate skills
+            transcription: Transcription already produced while recording (optional)
+        Returns:
+            Job id
+        """
+        if isinstance(audio, AudioBuffer):
+            name, data = 'audio.npz', audio.to_bytes()
+        else:
+            with open(audio, 'rb') as f:
+                name, data = os.path.basename(audio), f.read()
+        fields = {'question': json.dumps(question, ensure_ascii=False), 'skills': json.dumps(list(skills))}
+        if transcription is not None:
+            fields['transcription'] = json.dumps(transcription, ensure_ascii=False, default=str)
+        return self._submit('audio', name, data, fields)
+
+    def submit_frames(self, frames: Sequence[np.ndarray], timestamps: Optional[Sequence[float]] = None) -> str:
+        """Queue facial emotion analysis of a batch of frames (sent as JPEG). Returns the job id."""
+        return self._submit('frames', 'frames.npz', encode_frames(frames, timestamps))
+
+    def get(self, job_id: str, wait: float = 0.0) -> Dict:
+        """Job status (and result once done), long-polling for up to wait seconds."""
+        response = self.session.get(f"{self.base_url}/jobs/{job_id}", params={'wait': wait} if wait else None,
+                                    timeout=self.request_timeout + wait)
+        response.raise_for_status()
+        return response.json()
+
+    def wait(self, job_id: str, timeout: Optional[float] = None):
+        """
+        Wait for a job and return its result.
+        Raises:
+            ServiceError if the job failed or did not finish in time
+        """
+        deadline = time.monotonic() + (timeout if timeout is not None else self.timeout)
+        while True:
+            remaining = deadline - time.monotonic()
+            job = self.get(job_id, wait=min(max(remaining, 0.0), 20.0))
+            if job['status'] == 'done':
+                return job.get('result')
+            if job['status'] == 'error':
+                raise ServiceError(job.get('error') or 'job failed')
+            if remaining <= 0:
+                raise ServiceError(f"job {job_id} still {job['status']} after {self.timeout}s")
+
+    def stream(self, job_id: str) -> Iterator[Dict]:
+        """Yield the job's state on every status change (server-sent events) until it finishes."""
+        with self.session.get(f"{self.base_url}/jobs/{job_id}/stream", stream=True,
+                              timeout=(self.request_timeout, self.timeout)) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if line and line.startswith('data: '):
+                    yield json.loads(line[len('data: '):])
+
+    def stats(self) -> Dict:
+        """Queue depth and worker utilization."""
+        response = self.session.get(f"{self.base_url}/stats", timeout=self.request_timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def analyze_resume(self, pdf_path: str) -> Optional[Dict]:
+        """Same result as ResumeParser.analyze_resume, computed by the service (None on failure)."""
+        try:
+            return self.wait(self.submit_resume(pdf_path))
+        except Exception as e:
+            print(f"Error analyzing resume in the service: {str(e)}")
+            return None
+
+    def analyze_response(self, audio, video_frames, question: Dict, skills: List[str],
+                         transcription: Optional[Dict] = None) -> Dict:
+        """
+        Same result as AnalysisPipeline.analyze_response, computed by the service.
+        The audio and frame jobs are queued together so two workers can run them at once.
+        """
+        errors = {}
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            audio_future = pool.submit(self._run_audio, audio, question, skills, transcription)
+            emotion_future = pool.submit(self._run_frames, video_frames)
+            try:
+                analysis = audio_future.result()
+            except Exception as e:
+                print(f"Error analyzing audio in the service: {str(e)}")
+                errors['audio'] = str(e)
+                analysis = {
+                    'transcription': '',
+                    'voice_analysis': {'error': 'Audio analysis failed'},
+                    'content_analysis': {},
+                    'answer_evaluation': {},
+                    'stage_errors': {},
+                    'timestamp': datetime.now().isoformat(),
+                    'trace_id': None
+                }
+            try:
+                analysis['emotion_analysis'] = emotion_future.result()
+            except Exception as e:
+                print(f"Error analyzing frames in the service: {str(e)}")
+                errors['emotion'] = str(e)
+                analysis['emotion_analysis'] = {'dominant_emotion': 'error', 'emotions': {}}
+        analysis['stage_errors'] = {**analysis.get('stage_errors', {}), **errors}
+        return analysis
+
+    def _run_audio(self, audio, question: Dict, skills: List[str], transcription: Optional[Dict]) -> Dict:
+        if audio is None:
+            raise ServiceError('No audio recorded')
+        return self.wait(self.submit_audio(audio, question, skills, transcription))
+
+    def _run_frames(self, video_frames) -> Dict:
+        if video_frames is None or len(video_frames) == 0:
+            return {'dominant_emotion': 'unavailable', 'emotions': {}}
+        return self.wait(self.submit_frames(video_frames))
+
+
+def default_client() -> Optional[AnalysisClient]:
+    """Client for INTERVIEW_SERVICE_URL, or None to analyze in this process."""
+    url = os.environ.get('INTERVIEW_SERVICE_URL')
+    if not url:
+        return None
+    return AnalysisClient(url, timeout=float(os.environ.get('INTERVIEW_SERVICE_TIMEOUT', 600)))
@@ -0,0 +1,214 @@
+import os
+from datetime import datetime
+from functools import partial
+from typing import Dict, Iterable, Optional
+
+from audio_buffer import AudioBuffer
+from content_matcher import ContentMatcher
+from frame_store import FrameView
+from interview_bot import InterviewBot
+from result_cache import ResultCache
+from speech_to_text import SpeechToText, WhisperConfig
+from stage_graph import Stage, StageGraph
+from tracing import Tracer, default_tracer
+from voice_analysis import VoiceAnalyzer
+
+# Try to import optional modules
+try:
+    from facial_emotion import FacialEmotionAnalyzer
+    FACIAL_EMOTION_AVAILABLE = True
+except Exception as e:
+    print(f"Facial analysis not available: {str(e)}")
+    FACIAL_EMOTION_AVAILABLE = False
+    FacialEmotionAnalyzer = None
+
+# Stages run in worker processes by default: librosa and the emotion model are CPU-bound Python
+# work, while CTranslate2 (Whisper) releases the GIL and runs in a thread
+DEFAULT_PROCESS_STAGES = ('voice', 'emotion')
+
+
+def _audio_bytes(audio) -> int:
+    return audio.samples.nbytes if isinstance(audio, AudioBuffer) else 0
+
+
+def _text_bytes(transcription: Dict) -> int:
+    return len(transcription['text'].encode('utf-8'))
+
+
+def _frames_bytes(video_frames) -> int:
+    if isinstance(video_frames, FrameView):
+        return video_frames.nbytes
+    return sum(frame.nbytes for frame in video_frames or [])
+
+
+def _voice_stage(voice_analyzer: VoiceAnalyzer, audio) -> Dict:
+    """Voice characteristics of the answer (module-level so process pools can run it)."""
+    if not isinstance(audio, AudioBuffer) or len(audio) == 0:
+        return {'error': 'No audio recorded'}
+    voice_features = voice_analyzer.extract_features(audio)
+    return voice_analyzer.analyze_voice_characteristics(voice_features)
+
+
+def _emotion_stage(facial_analyzer, video_frames) -> Dict:
+    """Facial emotion summary of the answer (module-level so process pools can run it).
+
+    Frames in a shared FrameStore reach process workers as a handle and are mapped here
+    instead of being pickled.
+    """
+    if not facial_analyzer or not video_frames:
+        return {'dominant_emotion': 'unavailable', 'emotions': {}}
+    try:
+        emotion_analysis = facial_analyzer.analyze_frames(video_frames,
+                                                          timestamps=getattr(video_frames, 'timestamps', None))
+    finally:
+        if isinstance(video_frames, FrameView) and video_frames.attached:
+            video_frames.close()
+    # Ensure the analysis has the required keys
+    if not isinstance(emotion_analysis, dict):
+        emotion_analysis = {'dominant_emotion': 'error', 'emotions': {}}
+    if 'dominant_emotion' not in emotion_analysis:
+        emotion_analysis['dominant_emotion'] = 'neutral'
+    if 'emotions' not in emotion_analysis:
+        emotion_analysis['emotions'] = {}
+    return emotion_analysis
+
+
+class AnalysisPipeline:
+    def __init__(self, facial_analyzer=None, voice_analyzer=None, speech_to_text=None,
+                 content_matcher=None, interview_bot=None, cache: Optional[ResultCache] = None,
+                 tracer: Optional[Tracer] = None, process_stages: Optional[Iterable[str]] = None,
+                 stage_timeouts: Optional[Dict[str, float]] = None,
+                 stage_workers: Optional[Dict[str, int]] = None):
+        """
+        Run every analysis stage on a recorded answer; used by the app and headless tools.
+        Analyzers not given are created with their defaults (models load on first use).
+        Transcription, voice features and facial analysis run concurrently; content matching
+        and answer evaluation start as soon as the transcript is ready.
+        Args:
+            facial_analyzer: FacialEmotionAnalyzer, or None to create one when available
+            voice_analyzer: VoiceAnalyzer
+            speech_to_text: SpeechToText
+            content_matcher: ContentMatcher
+            interview_bot: InterviewBot
+            cache: Result cache used by analyzers created here
+            tracer: Tracer for per-stage spans (default_tracer() by default)
+            process_stages: Stages run in worker processes (INTERVIEW_PROCESS_STAGES, default
+                voice and emotion); the others run in threads
+            stage_timeouts: Seconds allowed per stage name (INTERVIEW_STAGE_TIMEOUT for all by default)
+            stage_workers: Pool size per stage name (INTERVIEW_STAGE_WORKERS for all by default,
+                otherwise sized from the CPU count)
+        """
+        if facial_analyzer is None and FACIAL_EMOTION_AVAILABLE:
+            facial_analyzer = FacialEmotionAnalyzer()
+        self.facial_analyzer = facial_analyzer
+        self.voice_analyzer = voice_analyzer or VoiceAnalyzer()
+        self.speech_to_text = speech_to_text or SpeechToText(config=WhisperConfig.from_env(), cache=cache)
+        self.content_matcher = content_matcher or ContentMatcher()
+        self.interview_bot = interview_bot or InterviewBot()
+        self.tracer = tracer or default_tracer()
+
+        if process_stages is None:
+            env_stages = os.environ.get('INTERVIEW_PROCESS_STAGES')
+            process_stages = env_stages.split(',') if env_stages is not None else DEFAULT_PROCESS_STAGES
+        self.process_stages = {name.strip() for name in process_stages if name.strip()}
+        if stage_timeouts is None:
+            default_timeout = os.environ.get('INTERVIEW_STAGE_TIMEOUT')
+            stage_timeouts = {}
+            if default_timeout:
+                stage_timeouts = {name: float(default_timeout)
+                                  for name in ('transcription', 'voice', 'fluency', 'emotion', 'content', 'evaluation')}
+        self.stage_timeouts = stage_timeouts
+        if stage_workers is None:
+            default_workers = os.environ.get('INTERVIEW_STAGE_WORKERS')
+            stage_workers = {}
+            if default_workers:
+                stage_workers = {name: int(default_workers)
+                                 for name in ('transcription', 'voice', 'fluency', 'emotion', 'content', 'evaluation')}
+        self.stage_workers = stage_workers
+        self.graph = self._build_graph()
+
+    def _build_graph(self) -> StageGraph:
+        """Declare the analysis stages and their inputs."""
+        def executor(name):
+            return 'process' if name in self.process_stages else 'thread'
+
+        def stage(name, func, inputs, fallback, input_bytes=None, cpu_clock='thread'):
+            return Stage(name, func, inputs, executor=executor(name), workers=self.stage_workers.get(name),
+                         timeout=self.stage_timeouts.get(name), fallback=fallback, input_bytes=input_bytes,
+                         cpu_clock=cpu_clock)
+
+        return StageGraph([
+            stage('transcription', self._transcription_stage, ('audio', 'streamed_transcription'),
+                  {'text': 'Error processing audio', 'segments': [], 'language': 'en'},
+                  lambda audio, streamed_transcription: _audio_bytes(audio),
+                  # CTranslate2 decodes on its own threads, invisible to the thread clock
+                  cpu_clock='process'),
+            stage('voice', partial(_voice_stage, self.voice_analyzer), ('audio',),
+                  {'error': 'Audio analysis failed'}, lambda audio: _audio_bytes(audio)),
+            stage('fluency', self._fluency_stage, ('transcription',), {}),
+            stage('emotion', partial(_emotion_stage, self.facial_analyzer), ('video_frames',),
+                  {'dominant_emotion': 'error', 'emotions': {}},
+                  _frames_bytes),
+            stage('content', self._content_stage, ('transcription', 'skills'), None,
+                  lambda transcription, skills: _text_bytes(transcription)),
+            stage('evaluation', self._evaluation_stage, ('transcription', 'question', 'skills'), None,
+                  lambda transcription, question, skills: _text_bytes(transcription)),
+        ], inputs=('audio', 'streamed_transcription', 'video_frames', 'question', 'skills'))
+
+    def _transcription_stage(self, audio, streamed_transcription) -> Dict:
+        # Use the streaming transcription when it was produced during recording
+        if not isinstance(audio, AudioBuffer) or len(audio) == 0:
+            print("Audio not available")
+            return {'text': 'Audio recording failed', 'segments': [], 'language': 'en'}
+        return streamed_transcription or self.speech_to_text.transcribe(audio)
+
+    def _fluency_stage(self, transcription) -> Dict:
+        # Speaking rate, pauses and fillers from the word timestamps
+        return self.speech_to_text.get_word_timeline(transcription).fluency_metrics()
+
+    def _content_stage(self, transcription, skills) -> Dict:
+        return self.content_matcher.analyze_content_match(skills, transcription['text'])
+
+    def _evaluation_stage(self, transcription, question, skills) -> Dict:
+        return self.interview_bot.evaluate_answer(question, transcription['text'], skills)
+
+    def analyze_response(self, audio, video_frames, question, skills, transcription=None):
+        """Analyze the user's response comprehensively.
+
+        audio is an AudioBuffer shared by transcription and voice analysis, or a path to an audio file.
+        Each stage is recorded as a span of one trace per answer when the tracer samples it.
+        Stages that fail or time out are reported under 'stage_errors' and replaced by their
+        fallback result, so the other stages' results are still returned.
+        """
+        with self.tracer.trace('analyze_response', frames=len(video_frames or [])) as trace:
+            # Decode file paths once so both stages share the same samples
+            if audio is not None and not isinstance(audio, AudioBuffer) and os.path.exists(audio):
+                with trace.span('decode_audio', input_bytes=os.path.getsize(audio)):
+                    audio = AudioBuffer.from_file(audio)
+
+            results, errors = self.graph.run({
+                'audio': audio,
+                'streamed_transcription': transcription,
+                'video_frames': video_frames,
+                'question': question,
+                'skills': skills
+            }, trace=trace)
+
+            voice_analysis = results['voice']
+            if 'error' not in voice_analysis:
+                voice_analysis['fluency'] = results['fluency']
+
+            return {
+                'transcription': results['transcription']['text'],
+                'voice_analysis': voice_analysis,
+                'emotion_analysis': results['emotion'],
+                'content_analysis': results.get('content', {}),
+                'answer_evaluation': results.get('evaluation', {}),
+                'stage_errors': errors,
+                'timestamp': datetime.now().isoformat(),
+                'trace_id': trace.trace_id
+            }
+
+    def shutdown(self):
+        """Stop the stage worker pools."""
+        self.graph.shutdown()
@@ -0,0 +1,582 @@
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import suppress
+from typing import Dict, List, Optional
+
+from flask import Flask, Response, jsonify, request
+
+from result_cache import json_default
+
+DEFAULT_SERVICE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "self_interview", "service")
+
+JOB_KINDS = ('resume', 'audio', 'frames')
+
+# Seconds between the heartbeats of an idle worker
+HEARTBEAT_SECONDS = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    input_path TEXT,
+    result TEXT,
+    error TEXT,
+    worker TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at);
+CREATE TABLE IF NOT EXISTS workers (
+    id TEXT PRIMARY KEY,
+    pid INTEGER,
+    status TEXT NOT NULL,
+    job_id TEXT,
+    jobs_done INTEGER NOT NULL DEFAULT 0,
+    busy_seconds REAL NOT NULL DEFAULT 0,
+    started_at REAL NOT NULL,
+    busy_since REAL,
+    heartbeat_at REAL
+);
+"""
+
+
+class JobQueue:
+    def __init__(self, path: str):
+        """
+        Job queue and worker registry in one SQLite database, shared by the web process
+        and the worker processes (each opens its own connections).
+        Args:
+            path: Database file
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+
+    def __getstate__(self) -> Dict:
+        # Connections belong to the process (and thread) that opened them
+        return {'path': self.path}
+
+    def __setstate__(self, state: Dict):
+        self.path = state['path']
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's connection, in autocommit mode (transactions are explicit)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def submit(self, kind: str, params: Dict, input_path: Optional[str] = None) -> str:
+        """
+        Queue a job.
+        Args:
+            kind: One of JOB_KINDS
+            params: JSON-serializable job parameters
+            input_path: Uploaded input file, deleted once the job finishes
+        Returns:
+            Job id
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = uuid.uuid4().hex
+        self._connect().execute(
+            "INSERT INTO jobs (id, kind, status, params, input_path, created_at) VALUES (?, ?, 'queued', ?, ?, ?)",
+            (job_id, kind, json.dumps(params, ensure_ascii=False), input_path, time.time())
+        )
+        return job_id
+
+    def claim(self, worker_id: str) -> Optional[Dict]:
+        """
+        Atomically take the oldest queued job and mark the worker busy.
+        Returns:
+            Job dictionary (id, kind, params, input_path), or None when the queue is empty
+        """
+        conn = self._connect()
+        # Cheap read first, so idle workers do not take the write lock on every poll
+        if conn.execute("SELECT 1 FROM jobs WHERE status = 'queued' LIMIT 1").fetchone() is None:
+            return None
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id, kind, params, input_path FROM jobs WHERE status = 'queued' "
+                "ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                now = time.time()
+                conn.execute("UPDATE jobs SET status = 'running', worker = ?, started_at = ? WHERE id = ?",
+                             (worker_id, now, row['id']))
+                conn.execute("UPDATE workers SET status = 'busy', job_id = ?, busy_since = ?, heartbeat_at = ? "
+                             "WHERE id = ?", (row['id'], now, now, worker_id))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        return {'id': row['id'], 'kind': row['kind'], 'params': json.loads(row['params']),
+                'input_path': row['input_path']}
+
+    def finish(self, job_id: str, worker_id: str, result=None, error: Optional[str] = None):
+        """Store a job's result (or error) and mark the worker idle."""
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                ('error' if error is not None else 'done',
+                 json.dumps(result, ensure_ascii=False, default=json_default) if error is None else None,
+                 error, now, job_id)
+            )
+            conn.execute(
+                "UPDATE workers SET status = 'idle', job_id = NULL, jobs_done = jobs_done + 1, "
+                "busy_seconds = busy_seconds + (? - COALESCE(busy_since, ?)), busy_since = NULL, heartbeat_at = ? "
+                "WHERE id = ?", (now, now, now, worker_id)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        Job status, with the result once finished and the queue position while queued.
+        Returns:
+            Job dictionary, or None for an unknown id
+        """
+        conn = self._connect()
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {
+            'id': row['id'],
+            'kind': row['kind'],
+            'status': row['status'],
+            'worker': row['worker'],
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'finished_at': row['finished_at'],
+        }
+        if row['status'] == 'queued':
+            job['queue_position'] = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at < ?", (row['created_at'],)
+            ).fetchone()[0]
+        if row['status'] == 'done':
+            job['result'] = json.loads(row['result']) if row['result'] is not None else None
+        if row['status'] == 'error':
+            job['error'] = row['error']
+        return job
+
+    def register_worker(self, worker_id: str, pid: int):
+        """Add (or reset) a worker's row when its process starts."""
+        now = time.time()
+        self._connect().execute(
+            "INSERT OR REPLACE INTO workers (id, pid, status, jobs_done, busy_seconds, started_at, heartbeat_at) "
+            "VALUES (?, ?, 'starting', 0, 0, ?, ?)", (worker_id, pid, now, now)
+        )
+
+    def set_worker_status(self, worker_id: str, status: str):
+        """Record a worker state change (starting, idle, stopped) and its heartbeat."""
+        self._connect().execute("UPDATE workers SET status = ?, heartbeat_at = ? WHERE id = ?",
+                                (status, time.time(), worker_id))
+
+    def fail_worker_jobs(self, worker_id: str, error: str) -> int:
+        """Fail the jobs a dead worker was running. Returns the number of jobs failed."""
+        conn = self._connect()
+        now = time.time()
+        cursor = conn.execute("UPDATE jobs SET status = 'error', error = ?, finished_at = ? "
+                              "WHERE status = 'running' AND worker = ?", (error, now, worker_id))
+        conn.execute("UPDATE workers SET status = 'stopped', job_id = NULL, busy_since = NULL WHERE id = ?",
+                     (worker_id,))
+        return cursor.rowcount
+
+    def recover(self) -> int:
+        """Requeue jobs left running by a previous service run and forget its workers."""
+        conn = self._connect()
+        cursor = conn.execute("UPDATE jobs SET status = 'queued', worker = NULL, started_at = NULL "
+                              "WHERE status = 'running'")
+        conn.execute("DELETE FROM workers")
+        return cursor.rowcount
+
+    def prune(self, max_age_seconds: float) -> List[str]:
+        """
+        Delete finished jobs older than max_age_seconds.
+        Returns:
+            Input files of the deleted jobs that still exist
+        """
+        conn = self._connect()
+        cutoff = time.time() - max_age_seconds
+        rows = conn.execute("SELECT input_path FROM jobs WHERE finished_at < ?", (cutoff,)).fetchall()
+        conn.execute("DELETE FROM jobs WHERE finished_at < ?", (cutoff,))
+        return [row['input_path'] for row in rows if row['input_path'] and os.path.exists(row['input_path'])]
+
+    def stats(self) -> Dict:
+        """
+        Queue depth by status and per-worker utilization.
+        Returns:
+            Dictionary with 'queue' (job counts by status), 'queue_depth' (queued jobs),
+            'workers' and 'utilization' (busy fraction of the workers' uptime)
+        """
+        conn = self._connect()
+        now = time.time()
+        queue = {status: 0 for status in ('queued', 'running', 'done', 'error')}
+        for row in conn.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status"):
+            queue[row['status']] = row['count']
+        oldest = conn.execute("SELECT MIN(created_at) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+        workers = []
+        busy_total = uptime_total = 0.0
+        for row in conn.execute("SELECT * FROM workers ORDER BY id"):
+            busy = row['busy_seconds'] + (now - row['busy_since'] if row['busy_since'] else 0.0)
+            uptime = max(now - row['started_at'], 1e-9)
+            busy_total += busy
+            uptime_total += uptime
+            workers.append({
+                'id': row['id'],
+                'pid': row['pid'],
+                'status': row['status'],
+                'job_id': row['job_id'],
+                'jobs_done': row['jobs_done'],
+                'busy_seconds': busy,
+                'utilization': busy / uptime,
+                'heartbeat_age_seconds': now - row['heartbeat_at'] if row['heartbeat_at'] else None
+            })
+        return {
+            'queue': queue,
+            'queue_depth': queue['queued'],
+            'oldest_queued_seconds': now - oldest if oldest else 0.0,
+            'workers': workers,
+            'utilization': busy_total / uptime_total if uptime_total else 0.0
+        }
+
+
+class JobHandler:
+    def __init__(self):
+        """Analyzers of one worker process; models stay loaded between jobs."""
+        from analysis_pipeline import AnalysisPipeline
+        from resume_parser import ResumeParser
+        from result_cache import default_cache
+        from speech_to_text import SpeechToText
+        from whisper_tuning import whisper_config_from_env
+
+        cache = default_cache()
+        self.resume_parser = ResumeParser(cache=cache)
+        # The worker already is a separate process, so every stage runs in its threads
+        self.pipeline = AnalysisPipeline(
+            speech_to_text=SpeechToText(config=whisper_config_from_env(cache), cache=cache),
+            cache=cache,
+            process_stages=()
+        )
+
+    def run(self, job: Dict):
+        """Run one job and return its JSON-serializable result."""
+        return getattr(self, f"_run_{job['kind']}")(job['params'], job['input_path'])
+
+    def _run_resume(self, params: Dict, input_path: str) -> Optional[Dict]:
+        return self.resume_parser.analyze_resume(input_path)
+
+    def _run_audio(self, params: Dict, input_path: str) -> Dict:
+        from audio_buffer import AudioBuffer
+
+        if input_path.endswith('.npz'):
+            with open(input_path, 'rb') as f:
+                audio = AudioBuffer.from_bytes(f.read())
+        else:
+            audio = AudioBuffer.from_file(input_path)
+        # Without frames the emotion stage reports 'unavailable'; frames are a separate job
+        return self.pipeline.analyze_response(audio, None, params.get('question') or {},
+                                              params.get('skills') or [],
+                                              transcription=params.get('transcription'))
+
+    def _run_frames(self, params: Dict, input_path: str) -> Dict:
+        from analysis_pipeline import _emotion_stage
+        from frame_store import decode_frames
+
+        with open(input_path, 'rb') as f:
+            frames = decode_frames(f.read())
+        return _emotion_stage(self.pipeline.facial_analyzer, frames)
+
+
+def _worker_main(db_path: str, worker_id: str, stop_event, poll_interval: float):
+    """Worker process: load the models once, then run queued jobs until stopped."""
+    # Ctrl-C reaches the whole process group; the service stops workers through stop_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    queue = JobQueue(db_path)
+    queue.register_worker(worker_id, os.getpid())
+    try:
+        from model_registry import registry
+        handler = JobHandler()
+        registry.warm_up()
+    except Exception as e:
+        print(f"Error starting analysis worker {worker_id}: {str(e)}")
+        queue.set_worker_status(worker_id, 'stopped')
+        raise
+    queue.set_worker_status(worker_id, 'idle')
+    last_heartbeat = time.monotonic()
+
+    while not stop_event.is_set():
+        job = queue.claim(worker_id)
+        if job is None:
+            if time.monotonic() - last_heartbeat >= HEARTBEAT_SECONDS:
+                queue.set_worker_status(worker_id, 'idle')
+                last_heartbeat = time.monotonic()
+            stop_event.wait(poll_interval)
+            continue
+        try:
+            result = handler.run(job)
+            queue.finish(job['id'], worker_id, result=result)
+        except Exception as e:
+            print(f"Error running {job['kind']} job {job['id']}: {str(e)}")
+            queue.finish(job['id'], worker_id, error=str(e) or type(e).__name__)
+        finally:
+            if job['input_path']:
+                # The submitting process may prune the finished job's input at the same time
+                with suppress(FileNotFoundError):
+                    os.remove(job['input_path'])
+    queue.set_worker_status(worker_id, 'stopped')
+
+
+class AnalysisService:
+    def __init__(self, directory: str = DEFAULT_SERVICE_DIR, num_workers: int = 1,
+                 poll_interval: float = 0.2, retention_seconds: float = 24 * 3600):
+        """
+        Queue analysis jobs in SQLite and run them on long-lived worker processes, each
+        keeping SpeechToText, VoiceAnalyzer, FacialEmotionAnalyzer and ResumeParser loaded.
+        Args:
+            directory: Directory of the job database and uploaded inputs
+            num_workers: Worker processes
+            poll_interval: Seconds an idle worker waits before checking the queue again
+            retention_seconds: Finished jobs older than this are deleted
+        """
+        self.directory = directory
+        self.spool_dir = os.path.join(directory, 'inputs')
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self.queue = JobQueue(os.path.join(directory, 'jobs.sqlite3'))
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        # spawn: TensorFlow and CTranslate2 do not survive fork after initialization
+        self._context = multiprocessing.get_context('spawn')
+        self._stop_event = self._context.Event()
+        self._workers = {}
+        self._monitor = None
+
+    def start(self):
+        """Requeue interrupted jobs and start the workers and their monitor."""
+        recovered = self.queue.recover()
+        if recovered:
+            print(f"Requeued {recovered} interrupted jobs")
+        self._stop_event.clear()
+        for i in range(self.num_workers):
+            self._start_worker(f"worker-{i}")
+        self._monitor = threading.Thread(target=self._monitor_loop, name="service-monitor", daemon=True)
+        self._monitor.start()
+
+    def stop(self, timeout: float = 30.0):
+        """Let workers finish their current job, then stop them."""
+        self._stop_event.set()
+        for process in self._workers.values():
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._workers = {}
+
+    def submit(self, kind: str, data: bytes, suffix: str, params: Optional[Dict] = None) -> str:
+        """
+        Store an uploaded input and queue a job for it.
+        Args:
+            kind: One of JOB_KINDS
+            data: Uploaded file contents
+            suffix: File extension of the upload (tells audio archives from audio files)
+            params: Job parameters
+        Returns:
+            Job id
+        """
+        for path in self.queue.prune(self.retention_seconds):
+            # A worker removes its input when the job finishes and may get there first
+            with suppress(FileNotFoundError):
+                os.remove(path)
+        input_path = os.path.join(self.spool_dir, f"{uuid.uuid4().hex}{suffix}")
+        with open(input_path, 'wb') as f:
+            f.write(data)
+        return self.queue.submit(kind, params or {}, input_path)
+
+    def wait(self, job_id: str, timeout: float) -> Optional[Dict]:
+        """Poll a job until it finishes or the timeout elapses; returns its latest state."""
+        deadline = time.monotonic() + timeout
+        job = self.queue.get(job_id)
+        while job is not None and job['status'] in ('queued', 'running') and time.monotonic() < deadline:
+            time.sleep(min(self.poll_interval, max(0.0, deadline - time.monotonic())))
+            job = self.queue.get(job_id)
+        return job
+
+    def _start_worker(self, worker_id: str):
+        process = self._context.Process(
+            target=_worker_main,
+            args=(self.queue.path, worker_id, self._stop_event, self.poll_interval),
+            name=f"analysis-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        self._workers[worker_id] = process
+
+    def _monitor_loop(self):
+        """Restart crashed workers and fail the job they were running."""
+        while not self._stop_event.wait(1.0):
+            for worker_id, process in list(self._workers.items()):
+                if process.is_alive() or self._stop_event.is_set():
+                    continue
+                failed = self.queue.fail_worker_jobs(worker_id, f"worker exited with code {process.exitcode}")
+                print(f"Analysis {worker_id} exited with code {process.exitcode} ({failed} jobs failed), restarting")
+                self._start_worker(worker_id)
+
+
+def render_metrics(stats: Dict, prefix: str = "interview") -> str:
+    """Queue and worker statistics in the Prometheus text exposition format."""
+    p = prefix
+    lines = [
+        f"# HELP {p}_service_jobs Jobs in the analysis queue by status.",
+        f"# TYPE {p}_service_jobs gauge",
+    ]
+    lines += [f'{p}_service_jobs{{status="{status}"}} {count}' for status, count in stats['queue'].items()]
+    lines += [
+        f"# HELP {p}_service_queue_depth Jobs waiting for a worker.",
+        f"# TYPE {p}_service_queue_depth gauge",
+        f"{p}_service_queue_depth {stats['queue_depth']}",
+        f"# HELP {p}_service_oldest_queued_seconds Age of the oldest queued job.",
+        f"# TYPE {p}_service_oldest_queued_seconds gauge",
+        f"{p}_service_oldest_queued_seconds {stats['oldest_queued_seconds']:.3f}",
+        f"# HELP {p}_service_worker_utilization Busy fraction of each worker's uptime.",
+        f"# TYPE {p}_service_worker_utilization gauge",
+    ]
+    lines += [f'{p}_service_worker_utilization{{worker="{w["id"]}"}} {w["utilization"]:.6f}' for w in stats['workers']]
+    lines += [
+        f"# HELP {p}_service_worker_jobs_total Jobs finished by each worker.",
+        f"# TYPE {p}_service_worker_jobs_total counter",
+    ]
+    lines += [f'{p}_service_worker_jobs_total{{worker="{w["id"]}"}} {w["jobs_done"]}' for w in stats['workers']]
+    return "\n".join(lines) + "\n"
+
+
+def create_app(service: AnalysisService) -> Flask:
+    """Flask app exposing the job queue of a started AnalysisService."""
+    app = Flask(__name__)
+
+    def submit(kind: str, params: Optional[Dict] = None):
+        upload = request.files.get('file')
+        if upload is None:
+            return jsonify({'error': "Missing 'file' upload"}), 400
+        suffix = os.path.splitext(upload.filename or '')[1].lower()
+        job_id = service.submit(kind, upload.read(), suffix, params)
+        return jsonify({'id': job_id, 'status': 'queued'}), 202
+
+    def form_json(name: str, default):
+        value = request.form.get(name)
+        return json.loads(value) if value else default
+
+    @app.post('/jobs/resume')
+    def submit_resume():
+        return submit('resume')
+
+    @app.post('/jobs/audio')
+    def submit_audio():
+        try:
+            params = {
+                'question': form_json('question', {}),
+                'skills': form_json('skills', []),
+                'transcription': form_json('transcription', None)
+            }
+        except ValueError as e:
+            return jsonify({'error': f"Invalid JSON field: {str(e)}"}), 400
+        return submit('audio', params)
+
+    @app.post('/jobs/frames')
+    def submit_frames():
+        return submit('frames')
+
+    @app.get('/jobs/<job_id>')
+    def get_job(job_id):
+        # ?wait=N long-polls for up to N seconds
+        wait = min(float(request.args.get('wait', 0)), 60.0)
+        job = service.wait(job_id, wait) if wait > 0 else service.queue.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Unknown job'}), 404
+        return jsonify(job)
+
+    @app.get('/jobs/<job_id>/stream')
+    def stream_job(job_id):
+        if service.queue.get(job_id) is None:
+            return jsonify({'error': 'Unknown job'}), 404
+
+        def events():
+            # Server-sent events: one 'status' event per change, then the finished job
+            last_status = None
+            while True:
+                job = service.queue.get(job_id)
+                if job is None:
+                    return
+                if job['status'] in ('done', 'error'):
+                    yield f"event: result\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+                    return
+                if job['status'] != last_status:
+                    last_status = job['status']
+                    yield f"event: status\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+                time.sleep(service.poll_interval)
+
+        return Response(events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+    @app.get('/stats')
+    def stats():
+        return jsonify(service.queue.stats())
+
+    @app.get('/metrics')
+    def metrics():
+        return Response(render_metrics(service.queue.stats()),
+                        mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+    @app.get('/health')
+    def health():
+        return jsonify({'status': 'ok'})
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analysis service with a job queue and warm worker processes")
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to listen on")
+    parser.add_argument('--port', type=int, default=8765, help="Port to listen on")
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('INTERVIEW_SERVICE_WORKERS', 1)),
+                        help="Worker processes (each loads every model)")
+    parser.add_argument('--dir', default=os.environ.get('INTERVIEW_SERVICE_DIR', DEFAULT_SERVICE_DIR),
+                        help="Directory of the job database and uploaded inputs")
+    parser.add_argument('--retention-hours', type=float, default=24.0, help="Hours finished jobs are kept")
+    args = parser.parse_args()
+
+    service = AnalysisService(args.dir, num_workers=args.workers, retention_seconds=args.retention_hours * 3600)
+    service.start()
+    try:
+        # One web process: the workers, not the HTTP threads, do the analysis
+        create_app(service).run(host=args.host, port=args.port, threaded=True)
+    finally:
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
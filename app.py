@@ -4,43 +4,86 @@ from resume_parser import ResumeParser
 
 # Try to import optional modules
 try:
-    from facial_emotion import FacialEmotionAnalyzer
+    from facial_emotion import FacialEmotionAnalyzer, FaceTracker
     FACIAL_EMOTION_AVAILABLE = True
 except Exception as e:
     st.warning(f"Analsis facial no disponible: {str(e)}")
     FACIAL_EMOTION_AVAILABLE = False
     FacialEmotionAnalyzer = None
+    FaceTracker = None
 
 from voice_analysis import VoiceAnalyzer
 from speech_to_text import SpeechToText
 from content_matcher import ContentMatcher
 from interview_bot import InterviewBot
+from frame_analysis_pool import FrameAnalysisPool
+from capture import CaptureSession
+from frame_store import FrameStore
+from emotion_aggregator import EmotionAggregator
+from model_registry import registry
+from audio_buffer import AudioBuffer
+from result_cache import default_cache
+from analysis_pipeline import AnalysisPipeline
+from whisper_tuning import whisper_config_from_env
+from analysis_client import default_client
+from history_store import default_history
 import tempfile
 import time
-import cv2
-import numpy as np
-import threading
-import queue
-import sounddevice as sd
-import wave
 import json
-from datetime import datetime
+import pandas as pd
 
-# Initialize components
-resume_parser = ResumeParser()
-facial_analyzer = FacialEmotionAnalyzer() if FACIAL_EMOTION_AVAILABLE else None
-voice_analyzer = VoiceAnalyzer()
-speech_to_text = SpeechToText()
+# With INTERVIEW_SERVICE_URL set, resumes and answers are analyzed by the analysis service
+# (analysis_service.py) and this process loads no models
+analysis_client = default_client()
+
+# Initialize components (cheap: heavy models are loaded once per process by the registry)
+result_cache = default_cache()
+history = default_history()
+resume_parser = ResumeParser(cache=result_cache)
+if analysis_client is None:
+    facial_analyzer = FacialEmotionAnalyzer() if FACIAL_EMOTION_AVAILABLE else None
+    voice_analyzer = VoiceAnalyzer()
+    speech_to_text = SpeechToText(config=whisper_config_from_env(result_cache), cache=result_cache)
+else:
+    facial_analyzer = voice_analyzer = speech_to_text = None
 content_matcher = ContentMatcher()
 interview_bot = InterviewBot()
 
+@st.cache_resource
+def get_analysis_pipeline():
+    """One pipeline per server process, so its stage worker pools survive reruns."""
+    return AnalysisPipeline(
+        facial_analyzer=facial_analyzer,
+        voice_analyzer=voice_analyzer,
+        speech_to_text=speech_to_text,
+        content_matcher=content_matcher,
+        interview_bot=interview_bot
+    )
+
+analysis_pipeline = get_analysis_pipeline() if analysis_client is None else None
+
+@st.cache_resource
+def start_model_maintenance():
+    """Start model warm-up and idle eviction once per server process, not on every rerun."""
+    # Load models in the background so the first answer does not pay for it
+    if os.environ.get('INTERVIEW_WARM_START', '1') == '1':
+        registry.warm_up(background=True)
+    if os.environ.get('INTERVIEW_MODEL_IDLE_SECONDS'):
+        registry.start_eviction(float(os.environ['INTERVIEW_MODEL_IDLE_SECONDS']))
+    return registry
+
+if analysis_client is None:
+    start_model_maintenance()
+
 # Global variables for state management
 if 'current_question' not in st.session_state:
     st.session_state.current_question = None
 if 'is_recording' not in st.session_state:
     st.session_state.is_recording = False
-if 'analysis_results' not in st.session_state:
-    st.session_state.analysis_results = []
+if 'history_session_id' not in st.session_state:
+    st.session_state.history_session_id = None
+if 'history_page' not in st.session_state:
+    st.session_state.history_page = 0
 if 'skills' not in st.session_state:
     st.session_state.skills = []
 
@@ -50,120 +93,23 @@ def save_uploaded_file(uploaded_file):
         tmp_file.write(uploaded_file.getvalue())
         return tmp_file.name
 
-def process_frame(frame, emotion_queue):
+def process_frame(frame):
     """Process a single frame for emotion analysis."""
-    try:
-        if facial_analyzer:
-            analysis = facial_analyzer.analyze_frame(frame)
-            # Ensure the analysis has the required keys
-            if 'dominant_emotion' not in analysis:
-                analysis['dominant_emotion'] = 'neutral'
-            if 'emotions' not in analysis:
-                analysis['emotions'] = {}
-            emotion_queue.put(analysis)
-        else:
-            emotion_queue.put({'dominant_emotion': 'unavailable', 'emotions': {}})
-    except Exception as e:
-        print(f"Error processing frame: {str(e)}")
-        # Put a default emotion result even when there's an error
-        emotion_queue.put({'dominant_emotion': 'error', 'emotions': {}})
-
-def record_audio(duration, sample_rate=44100):
-    """Record audio for a specified duration."""
-    recording = sd.rec(int(duration * sample_rate), samplerate=sample_rate, channels=1)
-    sd.wait()
-    return recording
-
-def save_audio(recording, sample_rate=44100):
-    """Save recorded audio to a temporary WAV file."""
-    try:
-        # Create a temporary file with explicit close to avoid Windows file locking
-        import uuid
-        temp_filename = f"temp_audio_{uuid.uuid4().hex[:8]}.wav"
-        temp_path = os.path.join(tempfile.gettempdir(), temp_filename)
-        
-        # Ensure recording is not empty and has valid data
-        if len(recording) == 0:
-            print("Warning: Empty recording")
-            return None
-            
-        # Normalize audio data
-        audio_data = np.array(recording).flatten()
-        audio_data = np.clip(audio_data * 32767, -32768, 32767).astype(np.int16)
-        
-        # Save with explicit file handling
-        with wave.open(temp_path, 'wb') as wf:
-            wf.setnchannels(1)
-            wf.setsampwidth(2)
-            wf.setframerate(sample_rate)
-            wf.writeframes(audio_data.tobytes())
-        
-        # Verify file was created
-        if os.path.exists(temp_path) and os.path.getsize(temp_path) > 44:  # More than just header
-            return temp_path
-        else:
-            print(f"Error: Audio file not created properly: {temp_path}")
-            return None
-            
-    except Exception as e:
-        print(f"Error saving audio: {str(e)}")
-        return None
+    if not facial_analyzer:
+        return {'dominant_emotion': 'unavailable', 'emotions': {}}
+    analysis = facial_analyzer.analyze_frame_tracked(frame)
+    # Ensure the analysis has the required keys
+    if 'dominant_emotion' not in analysis:
+        analysis['dominant_emotion'] = analysis.get('emotion', 'neutral')
+    if 'emotions' not in analysis:
+        analysis['emotions'] = {}
+    return analysis
 
-def analyze_response(audio_path, video_frames, question, skills):
+def analyze_response(audio, video_frames, question, skills, transcription=None):
     """Analyze the user's response comprehensively."""
-    # Initialize default results
-    transcription = {'text': '', 'segments': [], 'language': 'es'}
-    voice_analysis = {}
-    
-    # Check if audio file exists and is valid
-    if audio_path and os.path.exists(audio_path):
-        try:
-            # Transcribe speech
-            transcription = speech_to_text.transcribe(audio_path)
-            
-            # Analyze voice characteristics
-            voice_features = voice_analyzer.extract_features(audio_path)
-            voice_analysis = voice_analyzer.analyze_voice_characteristics(voice_features)
-        except Exception as e:
-            print(f"Error in audio analysis: {str(e)}")
-            transcription = {'text': 'Error processing audio', 'segments': [], 'language': 'en'}
-            voice_analysis = {'error': 'Audio analysis failed'}
-    else:
-        print(f"Audio file not available: {audio_path}")
-        transcription = {'text': 'Audio recording failed', 'segments': [], 'language': 'en'}
-        voice_analysis = {'error': 'No audio file'}
-    
-    # Analyze facial emotions
-    if facial_analyzer and video_frames:
-        try:
-            emotion_analysis = facial_analyzer.analyze_frames(video_frames)
-            # Ensure the analysis has the required keys
-            if not isinstance(emotion_analysis, dict):
-                emotion_analysis = {'dominant_emotion': 'error', 'emotions': {}}
-            if 'dominant_emotion' not in emotion_analysis:
-                emotion_analysis['dominant_emotion'] = 'neutral'
-            if 'emotions' not in emotion_analysis:
-                emotion_analysis['emotions'] = {}
-        except Exception as e:
-            print(f"Error in emotion analysis: {str(e)}")
-            emotion_analysis = {'dominant_emotion': 'error', 'emotions': {}}
-    else:
-        emotion_analysis = {'dominant_emotion': 'unavailable', 'emotions': {}}
-    
-    # Match content with resume
-    content_analysis = content_matcher.analyze_content_match(skills, transcription['text'])
-    
-    # Evaluate answer
-    answer_evaluation = interview_bot.evaluate_answer(question, transcription['text'], skills)
-    
-    return {
-        'transcription': transcription['text'],
-        'voice_analysis': voice_analysis,
-        'emotion_analysis': emotion_analysis,
-        'content_analysis': content_analysis,
-        'answer_evaluation': answer_evaluation,
-        'timestamp': datetime.now().isoformat()
-    }
+    if analysis_client is not None:
+        return analysis_client.analyze_response(audio, video_frames, question, skills, transcription=transcription)
+    return analysis_pipeline.analyze_response(audio, video_frames, question, skills, transcription=transcription)
 
 def main():
     st.title("Sistema de analisis de entrevistas")
@@ -176,7 +122,10 @@ def main():
         # Process resume
         with st.spinner("Analizando CV..."):
             resume_path = save_uploaded_file(resume_file)
-            resume_analysis = resume_parser.analyze_resume(resume_path)
+            if analysis_client is not None:
+                resume_analysis = analysis_client.analyze_resume(resume_path)
+            else:
+                resume_analysis = resume_parser.analyze_resume(resume_path)
             if resume_analysis:
                 st.session_state.skills = resume_analysis['skills']
                 st.success("Analisis de CV completado!")
@@ -186,6 +135,41 @@ def main():
                 st.error("Error al analizar CV. Revisar formato.")
                 return
     
+    # Answers are stored under this name in the interview history
+    candidate = st.sidebar.text_input("Candidato", value="anonimo").strip() or "anonimo"
+    if st.session_state.get('candidate') != candidate:
+        st.session_state.candidate = candidate
+        st.session_state.history_session_id = None
+        st.session_state.history_page = 0
+    
+    # Live analysis settings
+    st.sidebar.header("Analisis en vivo")
+    analysis_workers = st.sidebar.number_input("Hilos de analisis", min_value=1, max_value=8, value=2)
+    analyze_every_nth = st.sidebar.number_input("Analizar cada N frames", min_value=1, max_value=30, value=5)
+    analysis_max_fps = st.sidebar.number_input("Max frames analizados/seg (0 = sin limite)", min_value=0.0, value=4.0)
+    
+    if result_cache:
+        with st.sidebar.expander("Cache de resultados"):
+            st.write(result_cache.stats())
+    
+    if analysis_client is not None:
+        with st.sidebar.expander("Servicio de analisis"):
+            try:
+                service_stats = analysis_client.stats()
+                st.write(f"Trabajos en cola: {service_stats['queue_depth']}")
+                for worker in service_stats['workers']:
+                    st.write(f"{worker['id']}: {worker['status']}, uso {worker['utilization']:.0%}, "
+                             f"{worker['jobs_done']} trabajos")
+            except Exception as e:
+                st.write(f"Servicio no disponible: {str(e)}")
+    else:
+        with st.sidebar.expander("Modelos cargados"):
+            for name, stats in registry.stats().items():
+                if stats['loaded']:
+                    st.write(f"{name}: {stats['load_seconds']:.1f}s, {stats['rss_bytes'] / 2**20:.0f} MB")
+                else:
+                    st.write(f"{name}: no cargado")
+    
     # Main interview interface
     st.header("Entrevista en vivo")
     
@@ -208,71 +192,134 @@ def main():
             # Create placeholders for live feedback
             emotion_placeholder = st.empty()
             voice_placeholder = st.empty()
+            stats_placeholder = st.empty()
+            
+            # Running emotion statistics of this answer, updated as live frames are analyzed
+            live_emotions = EmotionAggregator()
+            recording_start = time.monotonic()
             
-            # Initialize video capture
-            cap = cv2.VideoCapture(0)
-            video_frames = []
-            emotion_queue = queue.Queue()
+            def analyze_live_frame(frame):
+                analysis = process_frame(frame)
+                if facial_analyzer:
+                    live_emotions.update(analysis, time.monotonic() - recording_start)
+                return analysis
             
-            # Record for 30 seconds
-            start_time = time.time()
-            while time.time() - start_time < 30 and st.session_state.is_recording:
-                ret, frame = cap.read()
-                if ret:
-                    # Process frame in a separate thread
-                    threading.Thread(
-                        target=process_frame,
-                        args=(frame, emotion_queue)
-                    ).start()
-                    
-                    video_frames.append(frame)
-                    
-                    # Display live emotion analysis
-                    if not emotion_queue.empty():
-                        emotion = emotion_queue.get()
+            analysis_pool = FrameAnalysisPool(
+                analyze_live_frame,
+                num_workers=int(analysis_workers),
+                every_nth=int(analyze_every_nth),
+                max_fps=analysis_max_fps or None
+            )
+            analysis_pool.start()
+            
+            # Record audio and video at the same time for up to 30 seconds;
+            # frames are queued for the analysis pool and audio is transcribed as it arrives
+            sample_rate = 44100
+            transcriber = speech_to_text.stream(sample_rate) if speech_to_text and speech_to_text.model_available else None
+            # Frames are kept downscaled (or as face crops) in one preallocated shared ring,
+            # which the emotion worker process maps instead of receiving pickled copies
+            max_fps = 30
+            frame_store = FrameStore.from_env(
+                int(31 * max_fps),
+                face_crop=FaceTracker(facial_analyzer).update if facial_analyzer else None
+            )
+            capture_session = CaptureSession(
+                duration=30,
+                sample_rate=sample_rate,
+                max_fps=max_fps,
+                frame_store=frame_store,
+                on_frame=lambda frame, timestamp: analysis_pool.submit(frame),
+                on_audio=(lambda block, timestamp: transcriber.feed(block)) if transcriber else None
+            )
+            capture_session.start()
+            try:
+                while capture_session.is_running() and st.session_state.is_recording:
+                    # Display the newest finished emotion analysis
+                    emotion = analysis_pool.latest_result()
+                    if emotion is not None:
                         # Safely access dominant_emotion with a fallback
                         dominant_emotion = emotion.get('dominant_emotion', 'unknown')
-                        emotion_placeholder.write(f"Emocion Actual: {dominant_emotion}")
+                        stats = analysis_pool.get_stats()
+                        running = live_emotions.summary()
+                        overall = ""
+                        if running:
+                            overall = (f", predominante: {running['dominant_emotion']} "
+                                       f"({running['emotion_percentages'][running['dominant_emotion']]:.0f}%)")
+                        emotion_placeholder.write(
+                            f"Emocion Actual: {dominant_emotion}{overall} "
+                            f"(analizados: {stats['analyzed']}, descartados: {stats['dropped']})"
+                        )
+                    voice_placeholder.write(f"Grabando... {capture_session.elapsed():.0f}s / 30s")
+                    capture_session.wait(timeout=0.2)
+            finally:
+                capture_session.stop()
+                analysis_pool.stop()
+                if transcriber:
+                    transcriber.finish()
             
-            cap.release()
+            try:
+                capture = capture_session.result()
+                stats = analysis_pool.get_stats()
+                stats_placeholder.write(
+                    f"Frames analizados en vivo: {stats['analyzed']} de {stats['frames_seen']} "
+                    f"(descartados: {stats['dropped']}, omitidos por tasa: {stats['skipped']})"
+                )
             
-            # Record audio
-            audio_data = record_audio(30)
-            audio_path = save_audio(audio_data)
+                # Resample once into a read-only buffer shared by all audio stages
+                audio = AudioBuffer.from_recording(capture.audio, capture.sample_rate)
+                video_frames = capture.frames
             
-            # Analyze response
-            with st.spinner("Analizando tu respuesta..."):
-                analysis = analyze_response(
-                    audio_path,
-                    video_frames,
-                    st.session_state.current_question,
-                    st.session_state.skills
-                )
-                
-                st.session_state.analysis_results.append(analysis)
-                
-                # Display analysis results
-                st.write("### Resultado del analisis")
+                # Analyze response
+                with st.spinner("Analizando tu respuesta..."):
+                    analysis = analyze_response(
+                        audio,
+                        video_frames,
+                        st.session_state.current_question,
+                        st.session_state.skills,
+                        transcription=transcriber.result() if transcriber else None
+                    )
+            finally:
+                # Free the frame ring (and its shared-memory segment) as soon as the analysis is done,
+                # also when it fails
+                capture_session.close()
+            
+            if history is not None:
+                try:
+                    if st.session_state.history_session_id is None:
+                        st.session_state.history_session_id = history.start_session(
+                            candidate, st.session_state.skills
+                        )
+                    history.add_answer(st.session_state.history_session_id,
+                                       st.session_state.current_question, analysis)
+                except Exception as e:
+                    print(f"Error saving answer to history: {str(e)}")
+                    st.warning("No se pudo guardar la respuesta en el historial.")
+            
+            # Display analysis results
+            st.write("### Resultado del analisis")
 
-                st.write("#### Transcripcion")
-                print(f"🟡 Texto transcrito: '{analysis['transcription']}'")
-                if not analysis['transcription'].strip():
-                    st.warning("⚠️ No se obtuvo ninguna transcripción del audio.")
-                
-                st.write("#### Analisis de voz")
-                st.write(analysis['voice_analysis'])
-                
-                st.write("#### Analisis de emociones")
-                st.write(analysis['emotion_analysis'])
-                
-                st.write("#### Contenido similar")
-                st.write(analysis['content_analysis'])
-                
-                st.write("#### Evaluacion de la respuesta")
-                st.write(analysis['answer_evaluation'])
+            st.write("#### Transcripcion")
+            print(f"🟡 Texto transcrito: '{analysis['transcription']}'")
+            if not analysis['transcription'].strip():
+                st.warning("⚠️ No se obtuvo ninguna transcripción del audio.")
+            
+            st.write("#### Analisis de voz")
+            st.write(analysis['voice_analysis'])
+            
+            st.write("#### Analisis de emociones")
+            emotion_analysis = dict(analysis['emotion_analysis'])
+            timeline = emotion_analysis.pop('timeline', None)
+            st.write(emotion_analysis)
+            if timeline and timeline['times']:
+                # Per-second average scores, aligned with the recording clock
+                st.line_chart(pd.DataFrame(timeline['emotions'], index=timeline['times']))
+            
+            st.write("#### Contenido similar")
+            st.write(analysis['content_analysis'])
+            
+            st.write("#### Evaluacion de la respuesta")
+            st.write(analysis['answer_evaluation'])
             
-            # Clean up
-            os.unlink(audio_path)
             st.session_state.is_recording = False
             
             # Generate next question
@@ -281,14 +328,31 @@ def main():
                 num_questions=1
             )[0]
     
-    # Display interview history
-    if st.session_state.analysis_results:
-        st.header("Historial de entrevista")
-        for i, result in enumerate(st.session_state.analysis_results):
-            with st.expander(f"Response {i+1}"):
-                st.write("Pregunta:", st.session_state.current_question['question'])
-                st.write("Transcripcion:", result['transcription'])
-                st.write("Evaluaacion:", result['answer_evaluation'])
+    # Display interview history, one page at a time; full results load on demand
+    if history is not None:
+        total = history.count_answers(candidate)
+        if total:
+            st.header("Historial de entrevista")
+            page_size = 10
+            pages = (total + page_size - 1) // page_size
+            page = min(st.session_state.history_page, pages - 1)
+            previous_col, info_col, next_col = st.columns([1, 2, 1])
+            if previous_col.button("Anterior", disabled=page == 0):
+                page -= 1
+            if next_col.button("Siguiente", disabled=page >= pages - 1):
+                page += 1
+            st.session_state.history_page = page
+            info_col.write(f"Pagina {page + 1} de {pages} ({total} respuestas)")
+            for answer in history.list_answers(candidate, page=page, page_size=page_size):
+                with st.expander(f"{answer['created_at']:%Y-%m-%d %H:%M} - {answer['question'][:80]}"):
+                    st.write("Pregunta:", answer['question'])
+                    st.write("Transcripcion:", answer['transcript'])
+                    st.write(f"Emocion predominante: {answer['dominant_emotion']}, "
+                             f"cobertura de habilidades: {answer['skill_coverage']}")
+                    if st.checkbox("Ver analisis completo", key=f"history-details-{answer['id']}"):
+                        details = history.get_stage_results(answer['id'])
+                        details.get('emotion_analysis', {}).pop('timeline', None)
+                        st.write(details)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,96 @@
+import io
+from math import gcd
+from typing import Union
+
+import numpy as np
+from scipy.signal import resample_poly
+
+# Whisper works at 16 kHz, so that is the rate the shared buffer is decoded to
+ANALYSIS_SAMPLE_RATE = 16000
+
+
+def resample_to(audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """Resample mono audio with a polyphase filter."""
+    audio = np.asarray(audio, dtype=np.float32)
+    if orig_sr == target_sr:
+        return audio
+    factor = gcd(int(orig_sr), int(target_sr))
+    return resample_poly(audio, target_sr // factor, orig_sr // factor).astype(np.float32)
+
+
+class AudioBuffer:
+    def __init__(self, samples: np.ndarray, sample_rate: int):
+        """
+        Read-only mono float32 audio shared by the analysis stages.
+        Args:
+            samples: Mono samples in [-1, 1]; contiguous float32 arrays are used without
+                a copy, so the caller should not modify them afterwards
+            sample_rate: Sample rate of the samples
+        """
+        samples = np.ascontiguousarray(samples, dtype=np.float32)
+        if samples.ndim > 1:
+            samples = np.ascontiguousarray(samples.mean(axis=1), dtype=np.float32)
+        # Consumers get views of the same memory, so nobody may modify it; the flag goes on
+        # a view so a caller's array that was not copied stays writable for the caller
+        samples = samples.view()
+        samples.setflags(write=False)
+        self.samples = samples
+        self.sample_rate = sample_rate
+
+    @classmethod
+    def from_recording(cls, recording: np.ndarray, recording_rate: int,
+                       sample_rate: int = ANALYSIS_SAMPLE_RATE) -> 'AudioBuffer':
+        """
+        Build a buffer from a microphone recording, resampling it once.
+        Args:
+            recording: Samples (frames x channels or 1-D) in [-1, 1]
+            recording_rate: Sample rate of the recording
+            sample_rate: Sample rate of the buffer
+        Returns:
+            AudioBuffer at sample_rate
+        """
+        recording = np.asarray(recording, dtype=np.float32)
+        if recording.ndim > 1:
+            recording = recording.mean(axis=1)
+        return cls(resample_to(recording, recording_rate, sample_rate), sample_rate)
+
+    @classmethod
+    def from_file(cls, audio_path: str, sample_rate: int = ANALYSIS_SAMPLE_RATE) -> 'AudioBuffer':
+        """
+        Decode and resample an audio file once.
+        Args:
+            audio_path: Path to the audio file
+            sample_rate: Sample rate of the buffer
+        Returns:
+            AudioBuffer at sample_rate
+        """
+        import librosa
+        samples, _ = librosa.load(audio_path, sr=sample_rate, mono=True)
+        return cls(samples, sample_rate)
+
+    @classmethod
+    def load(cls, audio: Union[str, 'AudioBuffer'], sample_rate: int = ANALYSIS_SAMPLE_RATE) -> 'AudioBuffer':
+        """Return the buffer itself, or decode a file path into a buffer."""
+        if isinstance(audio, AudioBuffer):
+            return audio
+        return cls.from_file(audio, sample_rate)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the samples and sample rate losslessly (npz) for sending to another process."""
+        out = io.BytesIO()
+        np.savez(out, samples=self.samples, sample_rate=np.int64(self.sample_rate))
+        return out.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'AudioBuffer':
+        """Rebuild a buffer serialized with to_bytes()."""
+        with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+            return cls(archive['samples'], int(archive['sample_rate']))
+
+    @property
+    def duration(self) -> float:
+        """Length in seconds."""
+        return len(self.samples) / self.sample_rate if self.sample_rate else 0.0
+
+    def __len__(self) -> int:
+        return len(self.samples)
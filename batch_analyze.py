@@ -0,0 +1,220 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from audio_buffer import ANALYSIS_SAMPLE_RATE, AudioBuffer
+from frame_store import FrameView
+from result_cache import json_default
+
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.mov', '.avi', '.webm', '.m4v')
+
+# Per-worker pipeline, built once by the pool initializer so models stay loaded between files
+_pipeline = None
+
+
+def iter_video_paths(source: str) -> Iterator[str]:
+    """Yield the recorded interview files in a directory (or the file itself), sorted by name."""
+    if os.path.isfile(source):
+        yield source
+        return
+    for name in sorted(os.listdir(source)):
+        path = os.path.join(source, name)
+        if os.path.isfile(path) and name.lower().endswith(VIDEO_EXTENSIONS):
+            yield path
+
+
+def demux_media(path: str, sample_rate: int = ANALYSIS_SAMPLE_RATE, fps: float = 2.0,
+                max_frames: Optional[int] = None) -> Tuple[Optional[AudioBuffer], List[np.ndarray], List[float]]:
+    """
+    Decode a recorded interview in a single demux pass: the audio track is resampled
+    to mono float32 at sample_rate and video frames are sampled at a fixed rate.
+    Args:
+        path: Video file with an audio track
+        sample_rate: Sample rate of the returned audio
+        fps: Frames per second to keep for emotion analysis
+        max_frames: Maximum number of frames to keep (None for no limit)
+    Returns:
+        (audio buffer or None without an audio track, BGR frames, frame timestamps in seconds)
+    """
+    import av
+
+    frames, timestamps, chunks = [], [], []
+    with av.open(path) as container:
+        audio_stream = container.streams.audio[0] if container.streams.audio else None
+        video_stream = container.streams.video[0] if container.streams.video else None
+        streams = [stream for stream in (audio_stream, video_stream) if stream is not None]
+        if not streams:
+            raise ValueError(f"No audio or video stream in {path}")
+        if video_stream is not None:
+            video_stream.thread_type = 'AUTO'
+
+        resampler = av.AudioResampler(format='flt', layout='mono', rate=sample_rate)
+        interval = 1.0 / fps if fps > 0 else 0.0
+        next_time = 0.0
+
+        for packet in container.demux(*streams):
+            if packet.stream is audio_stream:
+                for frame in packet.decode():
+                    for resampled in resampler.resample(frame):
+                        chunks.append(resampled.to_ndarray().reshape(-1))
+            elif packet.stream is video_stream:
+                if max_frames is not None and len(frames) >= max_frames:
+                    continue
+                for frame in packet.decode():
+                    frame_time = float(frame.time) if frame.time is not None else next_time
+                    if frame_time + 1e-6 < next_time:
+                        continue
+                    frames.append(frame.to_ndarray(format='bgr24'))
+                    timestamps.append(frame_time)
+                    next_time = frame_time + interval
+                    if max_frames is not None and len(frames) >= max_frames:
+                        break
+
+        if audio_stream is not None:
+            for resampled in resampler.resample(None):
+                chunks.append(resampled.to_ndarray().reshape(-1))
+
+    audio = None
+    if audio_stream is not None:
+        samples = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+        audio = AudioBuffer(samples, sample_rate)
+    return audio, frames, timestamps
+
+
+def _init_worker():
+    """Build this worker's analysis pipeline and load its models before the first file."""
+    global _pipeline
+    from analysis_pipeline import AnalysisPipeline
+    from model_registry import registry
+    from result_cache import default_cache
+
+    # Files are already spread over processes, so every stage runs in this worker's threads
+    _pipeline = AnalysisPipeline(cache=default_cache(), process_stages=())
+    registry.warm_up()
+
+
+def _analyze_file(path: str, question: Dict, skills: List[str], fps: float,
+                  max_frames: Optional[int]) -> Dict:
+    """Demux and analyze one recording in a worker process."""
+    start = time.perf_counter()
+    try:
+        audio, frames, timestamps = demux_media(path, fps=fps, max_frames=max_frames)
+        # Timestamped frames give the emotion summary its per-second timeline
+        frames = FrameView.from_frames(frames, timestamps)
+        demux_seconds = time.perf_counter() - start
+        analysis = _pipeline.analyze_response(audio, frames, question, skills)
+        total_seconds = time.perf_counter() - start
+        return {
+            'path': path,
+            'duration': audio.duration if audio is not None else None,
+            'frames': len(frames),
+            'timings': {
+                'demux': demux_seconds,
+                'analysis': total_seconds - demux_seconds,
+                'total': total_seconds
+            },
+            'analysis': analysis
+        }
+    except Exception as e:
+        print(f"Error analyzing {path}: {str(e)}")
+        return {
+            'path': path,
+            'timings': {'total': time.perf_counter() - start},
+            'error': str(e)
+        }
+
+
+def run_batch(paths: List[str], question: Dict, skills: List[str], output_path: str,
+              workers: int = 1, fps: float = 2.0, max_frames: Optional[int] = None) -> List[Dict]:
+    """
+    Analyze recordings in a process pool and append one JSON line per file as results arrive.
+    Args:
+        paths: Recorded interview files
+        question: Question dictionary the answers are evaluated against
+        skills: Skills from the candidate's resume
+        output_path: JSONL file to write
+        workers: Worker processes, each with its own warm models
+        fps: Frames per second sampled for emotion analysis
+        max_frames: Maximum frames per file
+    Returns:
+        Per-file records without the analysis payload (path, duration, timings, error)
+    """
+    # spawn: TensorFlow and CTranslate2 do not survive fork after initialization
+    context = multiprocessing.get_context('spawn')
+    records = []
+    with open(output_path, 'w', encoding='utf-8') as out, \
+            ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as pool:
+        futures = [pool.submit(_analyze_file, path, question, skills, fps, max_frames) for path in paths]
+        for future in as_completed(futures):
+            result = future.result()
+            out.write(json.dumps(result, ensure_ascii=False, default=json_default) + '\n')
+            out.flush()
+            records.append({key: value for key, value in result.items() if key != 'analysis'})
+            status = result.get('error') or f"{result['timings']['total']:.1f}s"
+            print(f"[{len(records)}/{len(paths)}] {os.path.basename(result['path'])}: {status}")
+    return records
+
+
+def print_summary(records: List[Dict], wall_seconds: float):
+    """Print per-file timings and overall throughput."""
+    print(f"{'file':<40} {'media':>8} {'demux':>8} {'analysis':>9} {'total':>8}")
+    for record in sorted(records, key=lambda r: r['path']):
+        timings = record['timings']
+        if 'error' in record:
+            print(f"{os.path.basename(record['path']):<40} {'error':>8} {'':>8} {'':>9} {timings['total']:>7.1f}s")
+            continue
+        duration = record['duration'] or 0.0
+        print(f"{os.path.basename(record['path']):<40} {duration:>7.1f}s {timings['demux']:>7.1f}s "
+              f"{timings['analysis']:>8.1f}s {timings['total']:>7.1f}s")
+
+    succeeded = [record for record in records if 'error' not in record]
+    media_seconds = sum(record['duration'] or 0.0 for record in succeeded)
+    print(f"{len(succeeded)}/{len(records)} files in {wall_seconds:.1f}s "
+          f"({len(records) / wall_seconds if wall_seconds > 0 else 0.0:.2f} files/s, "
+          f"{media_seconds / wall_seconds if wall_seconds > 0 else 0.0:.1f}x realtime)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze recorded interview videos without the web app")
+    parser.add_argument('input', help="Directory of recorded interviews (or a single video file)")
+    parser.add_argument('--resume', help="Candidate resume (PDF) providing the skills to match against")
+    parser.add_argument('--skills', nargs='*', default=[], help="Skills to use in addition to (or instead of) the resume")
+    parser.add_argument('--question', default="Describe tu experiencia profesional mas relevante.",
+                        help="Question the recorded answers respond to")
+    parser.add_argument('--output', default='analysis_results.jsonl', help="JSONL file to write")
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Worker processes (each loads its own models)")
+    parser.add_argument('--fps', type=float, default=2.0, help="Frames per second sampled for emotion analysis")
+    parser.add_argument('--max-frames', type=int, help="Maximum frames analyzed per file")
+    args = parser.parse_args()
+
+    paths = list(iter_video_paths(args.input))
+    if not paths:
+        parser.error(f"No video files found in {args.input}")
+
+    skills = list(args.skills)
+    if args.resume:
+        from resume_parser import ResumeParser
+        from result_cache import default_cache
+
+        resume_analysis = ResumeParser(cache=default_cache()).analyze_resume(args.resume)
+        if resume_analysis is None:
+            parser.error(f"Could not parse resume {args.resume}")
+        skills += [skill for skill in resume_analysis['skills'] if skill not in skills]
+    question = {'question': args.question, 'category': 'general', 'context': ''}
+
+    start = time.perf_counter()
+    records = run_batch(paths, question, skills, args.output, workers=min(args.workers, len(paths)),
+                        fps=args.fps, max_frames=args.max_frames)
+    print_summary(records, time.perf_counter() - start)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import argparse
+import time
+from typing import Callable, Dict, List
+
+import cv2
+import numpy as np
+
+from sample_media import synthetic_frames, synthetic_speech
+
+
+def load_video_frames(video_path: str, max_frames: int = 300) -> List[np.ndarray]:
+    """
+    Read BGR frames from a recorded video.
+    Args:
+        video_path: Path to the video file
+        max_frames: Maximum number of frames to read
+    Returns:
+        List of BGR frames
+    """
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def measure_throughput(func: Callable, items: List, repeats: int = 1) -> Dict:
+    """
+    Time a callable that processes a list of items.
+    Args:
+        func: Callable taking the full list of items
+        items: Items to process
+        repeats: Number of timed runs; the fastest one is reported
+    Returns:
+        Dictionary with the best time in seconds and items per second
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(items)
+        best = min(best, time.perf_counter() - start)
+    return {
+        'seconds': best,
+        'items_per_second': len(items) / best if best > 0 else 0.0
+    }
+
+
+def benchmark_facial_emotion(frames: List[np.ndarray], batch_sizes: List[int], repeats: int = 1) -> Dict:
+    """
+    Compare the per-frame DeepFace loop against the tracked live path and the batched inference path.
+    Args:
+        frames: BGR frames to analyze
+        batch_sizes: Batch sizes to try for the batched path
+        repeats: Timed runs per configuration
+    Returns:
+        Dictionary mapping configuration names to throughput results
+    """
+    from facial_emotion import FacialEmotionAnalyzer
+
+    analyzer = FacialEmotionAnalyzer()
+
+    # Warm up every path so model loading is not part of the measurement
+    analyzer.analyze_frame(frames[0])
+    analyzer.analyze_frames_batched(frames[:1])
+    analyzer.analyze_frame_tracked(frames[0])
+
+    results = {
+        'per_frame_loop': measure_throughput(
+            lambda items: [analyzer.analyze_frame(frame) for frame in items], frames, repeats
+        ),
+        'tracked_per_frame': measure_throughput(
+            lambda items: [analyzer.analyze_frame_tracked(frame) for frame in items], frames, repeats
+        )
+    }
+    for batch_size in batch_sizes:
+        results[f'batched_{batch_size}'] = measure_throughput(
+            lambda items: analyzer.analyze_frames_batched(items, batch_size=batch_size), frames, repeats
+        )
+    return results
+
+
+def legacy_voice_features(y: np.ndarray, sr: int, n_mfcc: int = 13) -> Dict:
+    """Previous VoiceAnalyzer feature path: one spectrogram per librosa feature call."""
+    import librosa
+
+    pitches, magnitudes = librosa.piptrack(y=y, sr=sr)
+    onset_env = librosa.onset.onset_strength(y=y, sr=sr)
+    return {
+        'mfcc': np.mean(librosa.feature.mfcc(y=y, sr=sr, n_mfcc=n_mfcc), axis=1),
+        'pitch': float(np.mean(pitches[magnitudes > np.median(magnitudes)])),
+        'energy': float(np.mean(librosa.feature.rms(y=y))),
+        'tempo': float(librosa.feature.tempo(onset_envelope=onset_env, sr=sr)[0]),
+        'duration': librosa.get_duration(y=y, sr=sr)
+    }
+
+
+def benchmark_voice_features(durations: List[float], sample_rate: int = 16000, repeats: int = 1) -> Dict:
+    """
+    Compare the per-feature librosa calls against the single-STFT feature engine.
+    Args:
+        durations: Recording lengths in seconds
+        sample_rate: Sample rate of the synthetic recordings
+        repeats: Timed runs per configuration
+    Returns:
+        Dictionary mapping duration to throughput results (items are seconds of audio)
+    """
+    from audio_buffer import AudioBuffer
+    from voice_analysis import VoiceAnalyzer
+
+    analyzer = VoiceAnalyzer()
+    results = {}
+    for duration in durations:
+        y = synthetic_speech(duration, sample_rate)
+        buffer = AudioBuffer(y, sample_rate)
+        legacy = measure_throughput(lambda items: legacy_voice_features(y, sample_rate), [None], repeats)
+        engine = measure_throughput(lambda items: analyzer.extract_features(buffer), [None], repeats)
+        for result in (legacy, engine):
+            result['items_per_second'] = duration / result['seconds'] if result['seconds'] > 0 else 0.0
+        results[duration] = {'legacy_per_feature': legacy, 'single_stft': engine}
+    return results
+
+
+def print_results(title: str, results: Dict, reference: str):
+    """Print a throughput table with speedups relative to the reference entry."""
+    print(title)
+    base = results[reference]['items_per_second']
+    for name, result in results.items():
+        speedup = result['items_per_second'] / base if base else 0.0
+        print(f"  {name:<20} {result['items_per_second']:>10.1f} items/s  {result['seconds']:>8.2f}s  x{speedup:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput benchmarks for the analysis stages")
+    parser.add_argument('--stages', nargs='+', choices=['emotion', 'voice'], default=['emotion', 'voice'])
+    parser.add_argument('--video', help="Recorded interview video to take frames from (synthetic frames if omitted)")
+    parser.add_argument('--frames', type=int, default=120, help="Number of frames to analyze")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[8, 32, 64])
+    parser.add_argument('--durations', type=float, nargs='+', default=[30, 300, 1800],
+                        help="Recording lengths in seconds for the voice benchmark")
+    parser.add_argument('--repeats', type=int, default=1)
+    args = parser.parse_args()
+
+    if 'emotion' in args.stages:
+        frames = load_video_frames(args.video, args.frames) if args.video else synthetic_frames(args.frames)
+        if not frames:
+            parser.error("No frames could be read")
+        results = benchmark_facial_emotion(frames, args.batch_sizes, args.repeats)
+        print_results(f"Facial emotion analysis ({len(frames)} frames)", results, 'per_frame_loop')
+
+    if 'voice' in args.stages:
+        for duration, results in benchmark_voice_features(args.durations, repeats=args.repeats).items():
+            print_results(f"Voice features ({duration:.0f}s recording, items = audio seconds)",
+                          results, 'legacy_per_feature')
+
+
+if __name__ == "__main__":
+    main()
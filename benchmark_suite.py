@@ -0,0 +1,361 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+import wave
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from sample_media import synthetic_frames, synthetic_speech
+
+STAGES = ['resume', 'voice', 'transcribe', 'emotion', 'content', 'questions', 'evaluate']
+
+FIXTURE_SAMPLE_RATE = 16000
+SPEECH_DURATIONS = (5, 30, 120)
+RESUME_PAGES = (1, 3, 10)
+TRANSCRIPT_WORDS = (50, 500, 5000)
+FRAME_COUNTS = (30, 120)
+
+# Skills that map to every InterviewBot category, so question generation always terminates
+QUESTION_SKILLS = ['team leadership', 'debugging', 'technical writing', 'presentations', 'software design']
+
+FILLER_SENTENCES = [
+    "Worked with cross-functional teams to deliver features on schedule.",
+    "Maintained internal tooling and improved the release process.",
+    "Mentored junior engineers and reviewed code daily.",
+    "Reduced infrastructure costs by consolidating services.",
+    "Wrote technical documentation and onboarding guides.",
+    "Participated in on-call rotations and incident reviews.",
+]
+
+
+def load_taxonomy_names(limit: int = 120) -> List[str]:
+    """Canonical skill names from the bundled taxonomy (ASCII only, for the PDF fixtures)."""
+    from resume_parser import DEFAULT_TAXONOMY_PATH
+
+    with open(DEFAULT_TAXONOMY_PATH, encoding='utf-8') as f:
+        names = [entry['name'] for entry in json.load(f)['skills']]
+    return [name for name in names if name.isascii()][:limit]
+
+
+def write_wav(path: str, samples: np.ndarray, sample_rate: int):
+    """Write mono float samples in [-1, 1] as a 16-bit PCM WAV file."""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2')
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+
+
+def synthetic_resume_lines(pages: int, skills: List[str], seed: int = 0, lines_per_page: int = 50) -> List[str]:
+    """
+    Generate deterministic resume text: a header, then experience bullets mentioning skills.
+    Args:
+        pages: Number of pages of text
+        skills: Skill names to mention
+        seed: Random seed
+        lines_per_page: Lines per page
+    Returns:
+        List of text lines
+    """
+    rng = np.random.default_rng(seed)
+    lines = ["Jane Doe - Software Engineer", "jane.doe@example.com", "", "Experience"]
+    while len(lines) < pages * lines_per_page:
+        picked = ", ".join(rng.choice(skills, size=3, replace=False))
+        lines.append(f"- {FILLER_SENTENCES[int(rng.integers(len(FILLER_SENTENCES)))]} Used {picked}.")
+    return lines
+
+
+def write_pdf(path: str, lines: List[str], lines_per_page: int = 50):
+    """
+    Write text lines into a minimal multi-page PDF (Helvetica, one text object per page).
+    Args:
+        path: Output file
+        lines: ASCII text lines
+        lines_per_page: Lines per page
+    """
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_numbers = []
+    for page in pages:
+        escaped = [line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') for line in page]
+        content = "BT /F1 10 Tf 14 TL 50 760 Td " + " ".join(f"({line}) Tj T*" for line in escaped) + " ET"
+        content = content.encode('latin-1')
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects))
+        )
+        page_numbers.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % number for number in page_numbers)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_numbers))
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, 'wb') as f:
+        f.write(output)
+
+
+def synthetic_transcript(num_words: int, skills: List[str], seed: int = 0) -> str:
+    """Generate a deterministic answer transcript of about num_words words mentioning skills."""
+    rng = np.random.default_rng(seed)
+    words = []
+    while len(words) < num_words:
+        words.extend(FILLER_SENTENCES[int(rng.integers(len(FILLER_SENTENCES)))].lower().split())
+        words.extend(f"i used {rng.choice(skills)} there".split())
+    return " ".join(words[:num_words])
+
+
+def build_fixtures(directory: str) -> Dict:
+    """
+    Generate every fixture deterministically (reused if already present).
+    Args:
+        directory: Fixture directory
+    Returns:
+        Dictionary describing the fixtures per stage
+    """
+    os.makedirs(directory, exist_ok=True)
+    skills = load_taxonomy_names()
+
+    speech = []
+    for duration in SPEECH_DURATIONS:
+        path = os.path.join(directory, f"speech_{duration}s.wav")
+        if not os.path.exists(path):
+            write_wav(path, synthetic_speech(duration, FIXTURE_SAMPLE_RATE, seed=duration), FIXTURE_SAMPLE_RATE)
+        speech.append({'name': f"{duration}s", 'path': path, 'units': duration})
+
+    resumes = []
+    for pages in RESUME_PAGES:
+        path = os.path.join(directory, f"resume_{pages}p.pdf")
+        if not os.path.exists(path):
+            write_pdf(path, synthetic_resume_lines(pages, skills, seed=pages))
+        resumes.append({'name': f"{pages}p", 'path': path, 'units': 1})
+
+    frames = []
+    for count in FRAME_COUNTS:
+        path = os.path.join(directory, f"frames_{count}.npy")
+        if not os.path.exists(path):
+            np.save(path, np.stack(synthetic_frames(count, seed=count)))
+        frames.append({'name': f"{count}f", 'path': path, 'units': count})
+
+    transcripts = [
+        {'name': f"{words}w", 'text': synthetic_transcript(words, skills, seed=words), 'units': 1}
+        for words in TRANSCRIPT_WORDS
+    ]
+    return {'skills': skills[:40], 'speech': speech, 'resumes': resumes, 'frames': frames, 'transcripts': transcripts}
+
+
+def stage_cases(stage: str, fixtures: Dict) -> Tuple[Callable, List[Dict]]:
+    """
+    Build the analyzer call and the inputs for one stage (runs inside the stage's process).
+    Returns:
+        (callable taking one case, list of cases with 'name', 'units' and the input)
+    """
+    skills = fixtures['skills']
+    if stage == 'resume':
+        from resume_parser import ResumeParser
+        parser = ResumeParser()
+        return lambda case: parser.analyze_resume(case['path']), fixtures['resumes']
+    if stage == 'voice':
+        from voice_analysis import VoiceAnalyzer
+        analyzer = VoiceAnalyzer()
+        return lambda case: analyzer.extract_features(case['path']), fixtures['speech']
+    if stage == 'transcribe':
+        from speech_to_text import SpeechToText, WhisperConfig
+        stt = SpeechToText(config=WhisperConfig.from_env())
+        if not stt.model_available:
+            raise RuntimeError("Whisper model not available")
+        return lambda case: stt.transcribe(case['path']), fixtures['speech']
+    if stage == 'emotion':
+        from facial_emotion import FacialEmotionAnalyzer
+        analyzer = FacialEmotionAnalyzer()
+        cases = [dict(case, frames=list(np.load(case['path']))) for case in fixtures['frames']]
+        return lambda case: analyzer.analyze_frames(case['frames']), cases
+    if stage == 'content':
+        from content_matcher import ContentMatcher
+        matcher = ContentMatcher()
+        return lambda case: matcher.analyze_content_match(skills, case['text']), fixtures['transcripts']
+    if stage == 'questions':
+        from interview_bot import InterviewBot
+        bot = InterviewBot()
+        cases = [{'name': f"{n}q", 'count': n, 'units': n} for n in (1, 5)]
+        cases.append({'name': "1000x5q_batch", 'count': 5, 'candidates': 1000, 'units': 5000})
+
+        def run(case):
+            if 'candidates' in case:
+                return bot.generate_question_sets([QUESTION_SKILLS] * case['candidates'], case['count'])
+            return bot.generate_questions(QUESTION_SKILLS, num_questions=case['count'])
+        return run, cases
+    if stage == 'evaluate':
+        from interview_bot import InterviewBot
+        bot = InterviewBot()
+        question = {'question': "Explica tu experiencia con Python.", 'category': 'technical', 'context': ''}
+        return lambda case: bot.evaluate_answer(question, case['text'], skills), fixtures['transcripts']
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+def peak_rss() -> int:
+    """Peak resident set size of this process in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_stage(stage: str, fixtures: Dict, repeats: int, warmup: int) -> Dict:
+    """
+    Time every case of a stage; meant to run in a fresh process so peak RSS is per stage.
+    Args:
+        stage: Stage name
+        fixtures: Output of build_fixtures
+        repeats: Timed calls per case
+        warmup: Untimed calls per case before timing (model loading, caches)
+    Returns:
+        Dictionary mapping case names to latency statistics, plus the stage's peak RSS
+    """
+    func, cases = stage_cases(stage, fixtures)
+    results = {}
+    for case in cases:
+        for _ in range(warmup):
+            func(case)
+        latencies = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            func(case)
+            latencies.append(time.perf_counter() - start)
+        latencies = np.array(latencies)
+        results[case['name']] = {
+            'p50': float(np.percentile(latencies, 50)),
+            'p95': float(np.percentile(latencies, 95)),
+            'mean': float(latencies.mean()),
+            'runs': len(latencies),
+            'throughput': float(case['units'] / np.median(latencies)) if np.median(latencies) > 0 else 0.0
+        }
+    return {'cases': results, 'peak_rss_bytes': peak_rss()}
+
+
+def run_stage_isolated(stage: str, fixtures: Dict, repeats: int, warmup: int, timeout: Optional[float]) -> Dict:
+    """Run a stage in its own spawned process; errors are returned instead of raised."""
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        try:
+            return pool.apply_async(run_stage, (stage, fixtures, repeats, warmup)).get(timeout)
+        except multiprocessing.TimeoutError:
+            return {'error': f"timed out after {timeout}s"}
+        except Exception as e:
+            return {'error': str(e)}
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, max_regression: float) -> List[str]:
+    """
+    Compare p50 latencies and peak RSS against a baseline.
+    Args:
+        results: Current suite results
+        baseline: Stored suite results
+        max_regression: Allowed relative slowdown (0.2 = 20%)
+    Returns:
+        Descriptions of the regressions found
+    """
+    regressions = []
+    for stage, base in baseline.get('stages', {}).items():
+        current = results['stages'].get(stage)
+        if current is None or 'error' in base:
+            continue
+        if 'error' in current:
+            regressions.append(f"{stage}: failed ({current['error']})")
+            continue
+        for case, base_case in base['cases'].items():
+            case_result = current['cases'].get(case)
+            if case_result is None:
+                regressions.append(f"{stage}/{case}: missing")
+            elif case_result['p50'] > base_case['p50'] * (1 + max_regression):
+                regressions.append(f"{stage}/{case}: p50 {case_result['p50'] * 1000:.1f}ms "
+                                   f"vs {base_case['p50'] * 1000:.1f}ms baseline")
+        if current['peak_rss_bytes'] > base['peak_rss_bytes'] * (1 + max_regression):
+            regressions.append(f"{stage}: peak RSS {current['peak_rss_bytes'] / 2**20:.0f}MB "
+                               f"vs {base['peak_rss_bytes'] / 2**20:.0f}MB baseline")
+    return regressions
+
+
+def print_report(results: Dict):
+    """Print one line per stage case."""
+    print(f"{'stage/case':<24} {'p50 ms':>10} {'p95 ms':>10} {'throughput':>12} {'peak RSS':>10}")
+    for stage, result in results['stages'].items():
+        if 'error' in result:
+            print(f"{stage:<24} error: {result['error']}")
+            continue
+        for case, stats in result['cases'].items():
+            print(f"{stage + '/' + case:<24} {stats['p50'] * 1000:>10.1f} {stats['p95'] * 1000:>10.1f} "
+                  f"{stats['throughput']:>10.1f}/s {result['peak_rss_bytes'] / 2**20:>8.0f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency, throughput and memory benchmarks for every analysis stage")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--fixtures', default=os.path.join('.benchmark', 'fixtures'),
+                        help="Directory for the generated fixtures")
+    parser.add_argument('--repeats', type=int, default=5, help="Timed calls per case")
+    parser.add_argument('--warmup', type=int, default=1, help="Untimed calls per case")
+    parser.add_argument('--timeout', type=float, default=1800, help="Seconds allowed per stage")
+    parser.add_argument('--output', default=os.path.join('.benchmark', 'results.json'))
+    parser.add_argument('--baseline', help="Results file to compare against")
+    parser.add_argument('--update-baseline', action='store_true', help="Write these results to --baseline")
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help="Allowed relative slowdown before failing (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    fixtures = build_fixtures(args.fixtures)
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeats': args.repeats
+        },
+        'stages': {}
+    }
+    for stage in args.stages:
+        print(f"Running {stage}...")
+        results['stages'][stage] = run_stage_isolated(stage, fixtures, args.repeats, args.warmup, args.timeout)
+
+    print_report(results)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline and args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare_to_baseline(results, json.load(f), args.max_regression)
+        if regressions:
+            print("Regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+import threading
+import time
+import wave
+from typing import Callable, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+from frame_store import FrameStore, FrameView
+
+try:
+    import sounddevice as sd
+except Exception as e:  # PortAudio missing on headless machines
+    print(f"sounddevice not available: {str(e)}")
+    sd = None
+
+
+class CaptureClock:
+    def __init__(self):
+        """Monotonic clock shared by the audio and video readers."""
+        self._origin = time.monotonic()
+
+    def reset(self):
+        """Restart the clock at zero."""
+        self._origin = time.monotonic()
+
+    def now(self) -> float:
+        """Seconds since the clock was started."""
+        return time.monotonic() - self._origin
+
+
+class AudioRingBuffer:
+    def __init__(self, capacity_seconds: float, sample_rate: int):
+        """
+        Preallocated mono audio buffer keeping the most recent samples.
+        Args:
+            capacity_seconds: Seconds of audio to keep
+            sample_rate: Sample rate of the incoming audio
+        """
+        self.sample_rate = sample_rate
+        self._data = np.zeros(int(capacity_seconds * sample_rate), dtype=np.float32)
+        self._written = 0
+        self._start_time = None
+        self._lock = threading.Lock()
+
+    def write(self, samples: np.ndarray, timestamp: float):
+        """
+        Append a block of samples.
+        Args:
+            samples: Audio block (frames x channels or 1-D); channels are averaged to mono
+            timestamp: Clock time of the first sample in the block
+        """
+        samples = np.asarray(samples, dtype=np.float32)
+        if samples.ndim > 1:
+            samples = samples.mean(axis=1)
+        with self._lock:
+            if self._start_time is None:
+                # Later blocks are placed by sample count so the timeline stays gap-free
+                self._start_time = timestamp
+            capacity = len(self._data)
+            if len(samples) > capacity:
+                # Only the newest samples fit; account for the ones skipped
+                self._written += len(samples) - capacity
+                samples = samples[-capacity:]
+            pos = self._written % capacity
+            first = min(len(samples), capacity - pos)
+            self._data[pos:pos + first] = samples[:first]
+            self._data[:len(samples) - first] = samples[first:]
+            self._written += len(samples)
+
+    def snapshot(self) -> Tuple[np.ndarray, Optional[float]]:
+        """
+        Return the buffered samples in chronological order.
+        Returns:
+            Tuple of (samples, clock time of the first returned sample)
+        """
+        with self._lock:
+            capacity = len(self._data)
+            count = min(self._written, capacity)
+            if self._start_time is None or count == 0:
+                return np.zeros(0, dtype=np.float32), None
+            end = self._written % capacity
+            if count < capacity:
+                samples = self._data[:count].copy()
+            else:
+                samples = np.concatenate((self._data[end:], self._data[:end]))
+            first_index = self._written - count
+            return samples, self._start_time + first_index / self.sample_rate
+
+
+class CaptureResult:
+    def __init__(self, audio: np.ndarray, sample_rate: int, audio_start: Optional[float],
+                 frames: FrameView, frame_timestamps: np.ndarray):
+        """
+        Aligned audio and video from a capture session.
+        Args:
+            audio: Mono float32 samples in [-1, 1]
+            sample_rate: Audio sample rate
+            audio_start: Clock time of the first audio sample
+            frames: BGR frames (a list-like view into the session's frame store)
+            frame_timestamps: Clock time of each frame
+        """
+        self.audio = audio
+        self.sample_rate = sample_rate
+        self.audio_start = audio_start
+        self.frames = frames
+        self.frame_timestamps = frame_timestamps
+
+    @property
+    def duration(self) -> float:
+        """Length of the audio in seconds."""
+        return len(self.audio) / self.sample_rate if self.sample_rate else 0.0
+
+
+class FileAudioStream:
+    def __init__(self, path: str, samplerate: int, channels: int = 1,
+                 callback: Callable = None, blocksize: int = 1024, realtime: bool = True):
+        """
+        File-backed stand-in for sounddevice.InputStream.
+        Args:
+            path: Path to a 16-bit PCM WAV file
+            samplerate: Sample rate delivered to the callback (the file is resampled if needed)
+            channels: Number of channels delivered to the callback
+            callback: Function called as callback(indata, frames, time_info, status)
+            blocksize: Frames per callback block
+            realtime: Pace the blocks at the audio rate instead of delivering them at once
+        """
+        self.path = path
+        self.samplerate = samplerate
+        self.channels = channels
+        self.callback = callback
+        self.blocksize = blocksize
+        self.realtime = realtime
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _load(self) -> np.ndarray:
+        """Read the WAV file as float32 frames x channels at the requested rate."""
+        with wave.open(self.path, 'rb') as wf:
+            file_rate = wf.getframerate()
+            file_channels = wf.getnchannels()
+            data = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        audio = data.reshape(-1, file_channels).mean(axis=1).astype(np.float32) / 32768.0
+        if file_rate != self.samplerate and len(audio) > 0:
+            positions = np.arange(int(len(audio) * self.samplerate / file_rate)) * file_rate / self.samplerate
+            audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+        return np.repeat(audio[:, None], self.channels, axis=1)
+
+    def _run(self):
+        audio = self._load()
+        block_seconds = self.blocksize / self.samplerate
+        next_time = time.monotonic()
+        for start in range(0, len(audio), self.blocksize):
+            if self._stop_event.is_set():
+                break
+            block = audio[start:start + self.blocksize]
+            self.callback(block, len(block), None, None)
+            if self.realtime:
+                next_time += block_seconds
+                self._stop_event.wait(max(0.0, next_time - time.monotonic()))
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def close(self):
+        self.stop()
+
+
+class FileVideoCapture:
+    def __init__(self, source: Union[str, Sequence[np.ndarray]], fps: Optional[float] = None, realtime: bool = True):
+        """
+        File-backed stand-in for cv2.VideoCapture.
+        Args:
+            source: Path to a video file or a sequence of BGR frames
+            fps: Frame rate to pace reads at (defaults to the file's rate, or 30)
+            realtime: Pace reads at the frame rate instead of returning frames immediately
+        """
+        self._cap = None
+        self._frames = None
+        if isinstance(source, str):
+            self._cap = cv2.VideoCapture(source)
+            fps = fps or self._cap.get(cv2.CAP_PROP_FPS) or 30.0
+        else:
+            self._frames = iter(source)
+        self.interval = 1.0 / (fps or 30.0)
+        self.realtime = realtime
+        self._next_time = None
+
+    def isOpened(self) -> bool:
+        return self._frames is not None or (self._cap is not None and self._cap.isOpened())
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if self.realtime:
+            now = time.monotonic()
+            if self._next_time is None:
+                self._next_time = now
+            elif self._next_time > now:
+                time.sleep(self._next_time - now)
+            self._next_time += self.interval
+        if self._cap is not None:
+            return self._cap.read()
+        frame = next(self._frames, None)
+        return frame is not None, frame
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+        self._frames = None
+
+
+def default_audio_stream_factory(samplerate: int, channels: int, callback: Callable):
+    """Open the default microphone as a sounddevice input stream."""
+    if sd is None:
+        raise RuntimeError("sounddevice is not available")
+    return sd.InputStream(samplerate=samplerate, channels=channels, dtype='float32', callback=callback)
+
+
+def default_video_capture_factory(camera_index: int = 0):
+    """Open a webcam with OpenCV."""
+    return cv2.VideoCapture(camera_index)
+
+
+class CaptureSession:
+    def __init__(self, duration: float = 30, sample_rate: int = 44100, camera_index: int = 0,
+                 audio_stream_factory: Optional[Callable] = None,
+                 video_capture_factory: Optional[Callable] = None,
+                 on_frame: Optional[Callable[[np.ndarray, float], None]] = None,
+                 on_audio: Optional[Callable[[np.ndarray, float], None]] = None,
+                 max_fps: float = 60.0, frame_store: Optional[FrameStore] = None):
+        """
+        Record audio and video concurrently against a shared clock.
+        Args:
+            duration: Maximum recording length in seconds
+            sample_rate: Audio sample rate
+            camera_index: Webcam index passed to the video capture factory
+            audio_stream_factory: Callable(samplerate, channels, callback) returning a started-on-demand
+                input stream (sounddevice.InputStream by default)
+            video_capture_factory: Callable(camera_index) returning a cv2.VideoCapture-like object
+            on_frame: Optional callback invoked with (frame, timestamp) for every captured frame
+            on_audio: Optional callback invoked with (block, timestamp) for every audio block
+            max_fps: Upper bound on the frame rate used to size the frame store
+            frame_store: Store keeping the frames (an in-memory FrameStore sized from
+                duration and max_fps by default); close() releases it
+        """
+        self.duration = duration
+        self.sample_rate = sample_rate
+        self.camera_index = camera_index
+        self.audio_stream_factory = audio_stream_factory or default_audio_stream_factory
+        self.video_capture_factory = video_capture_factory or default_video_capture_factory
+        self.on_frame = on_frame
+        self.on_audio = on_audio
+
+        self.clock = CaptureClock()
+        self.audio_buffer = AudioRingBuffer(duration + 1, sample_rate)
+        self.frame_store = frame_store if frame_store is not None else FrameStore(int((duration + 1) * max_fps))
+
+        self._stop_event = threading.Event()
+        self._audio_stream = None
+        self._video_thread = None
+        self._audio_samples = 0
+        self._audio_origin = None
+
+    def start(self):
+        """Open both devices and start recording."""
+        self._stop_event.clear()
+        self._audio_samples = 0
+        self._audio_origin = None
+        self.clock.reset()
+
+        try:
+            self._audio_stream = self.audio_stream_factory(self.sample_rate, 1, self._audio_callback)
+            self._audio_stream.start()
+        except Exception as e:
+            print(f"Error starting audio capture: {str(e)}")
+            self._audio_stream = None
+
+        self._video_thread = threading.Thread(target=self._video_loop, name="video-capture", daemon=True)
+        self._video_thread.start()
+
+    def stop(self):
+        """Stop recording early (or after the duration elapsed) and release the devices."""
+        self._stop_event.set()
+        if self._video_thread is not None:
+            self._video_thread.join()
+            self._video_thread = None
+        if self._audio_stream is not None:
+            try:
+                self._audio_stream.stop()
+                self._audio_stream.close()
+            except Exception as e:
+                print(f"Error stopping audio capture: {str(e)}")
+            self._audio_stream = None
+
+    def is_running(self) -> bool:
+        """True while the session is recording."""
+        return not self._stop_event.is_set() and self.clock.now() < self.duration
+
+    def elapsed(self) -> float:
+        """Seconds since recording started."""
+        return self.clock.now()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the duration elapses or the session is stopped.
+        Returns:
+            True if recording finished within the timeout
+        """
+        remaining = max(0.0, self.duration - self.clock.now())
+        if timeout is not None:
+            remaining = min(remaining, timeout)
+        self._stop_event.wait(remaining)
+        return not self.is_running()
+
+    def result(self) -> CaptureResult:
+        """
+        Return audio and frames trimmed to the window both streams cover.
+        """
+        audio, audio_start = self.audio_buffer.snapshot()
+        frames, timestamps = self.frame_store.snapshot()
+
+        if audio_start is None or len(timestamps) == 0:
+            return CaptureResult(audio, self.sample_rate, audio_start, frames, timestamps)
+
+        audio_end = audio_start + len(audio) / self.sample_rate
+        window_start = max(audio_start, timestamps[0])
+        window_end = min(audio_end, timestamps[-1])
+        if window_end <= window_start:
+            return CaptureResult(audio, self.sample_rate, audio_start, frames, timestamps)
+
+        first_sample = int(round((window_start - audio_start) * self.sample_rate))
+        last_sample = int(round((window_end - audio_start) * self.sample_rate))
+        keep = np.flatnonzero((timestamps >= window_start) & (timestamps <= window_end))
+        return CaptureResult(
+            audio[first_sample:last_sample],
+            self.sample_rate,
+            audio_start + first_sample / self.sample_rate,
+            frames[keep],
+            timestamps[keep]
+        )
+
+    def close(self):
+        """Stop recording and release the frame store (frames returned by result() become invalid)."""
+        self.stop()
+        self.frame_store.close()
+
+    def _audio_callback(self, indata, frames, time_info, status):
+        """sounddevice callback: copy the block into the ring buffer."""
+        if status:
+            print(f"Audio capture status: {status}")
+        if self._stop_event.is_set():
+            return
+        if self._audio_origin is None:
+            # The first block was captured `frames` samples before the callback fired
+            self._audio_origin = self.clock.now() - frames / self.sample_rate
+        timestamp = self._audio_origin + self._audio_samples / self.sample_rate
+        self._audio_samples += frames
+        block = indata.copy()
+        self.audio_buffer.write(block, timestamp)
+        if self.on_audio is not None:
+            self.on_audio(block, timestamp)
+
+    def _video_loop(self):
+        """Read frames until stopped or the duration elapses."""
+        try:
+            cap = self.video_capture_factory(self.camera_index)
+        except Exception as e:
+            print(f"Error opening video capture: {str(e)}")
+            return
+        try:
+            while not self._stop_event.is_set() and self.clock.now() < self.duration:
+                ret, frame = cap.read()
+                if not ret:
+                    if isinstance(cap, FileVideoCapture):
+                        break
+                    time.sleep(0.005)
+                    continue
+                timestamp = self.clock.now()
+                self.frame_store.write(frame, timestamp)
+                if self.on_frame is not None:
+                    self.on_frame(frame, timestamp)
+        finally:
+            cap.release()
@@ -1,62 +1,180 @@
-from fuzzywuzzy import fuzz
-from typing import Dict, List, Tuple
+from rapidfuzz import fuzz, process
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
 import re
 
+def normalize_text(text: str) -> str:
+    """Lowercase, strip special characters and collapse whitespace."""
+    # Convert to lowercase
+    text = text.lower()
+    # Remove special characters
+    text = re.sub(r'[^\w\s]', '', text)
+    # Remove extra whitespace
+    text = ' '.join(text.split())
+    return text
+
+class PhraseAutomaton:
+    def __init__(self, phrases: Sequence[str]):
+        """
+        Aho-Corasick automaton finding whole-word occurrences of many phrases in one pass.
+        Args:
+            phrases: Normalized phrases (see normalize_text); empty phrases are ignored
+        """
+        self.phrases = list(phrases)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        # Build the trie
+        for index, phrase in enumerate(self.phrases):
+            if not phrase:
+                continue
+            state = 0
+            for char in phrase:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(index)
+
+        # Breadth-first pass computing failure links and merged outputs
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for char, next_state in self._goto[state].items():
+                pending.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find_all(self, text: str) -> List[Tuple[str, int]]:
+        """
+        Find every non-overlapping, word-bounded occurrence of every phrase.
+        Args:
+            text: Normalized text
+        Returns:
+            (phrase, position) tuples sorted by position
+        """
+        matches = []
+        last_end = [0] * len(self.phrases)
+        state = 0
+        length = len(text)
+        for position, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            if not self._output[state]:
+                continue
+            end = position + 1
+            if end < length and not text[end].isspace():
+                continue
+            for index in self._output[state]:
+                start = end - len(self.phrases[index])
+                if start < last_end[index] or (start > 0 and not text[start - 1].isspace()):
+                    continue
+                last_end[index] = end
+                matches.append((start, index))
+        
+        matches.sort()
+        return [(self.phrases[index], start) for start, index in matches]
+
+@lru_cache(maxsize=128)
+def compile_phrases(phrases: Tuple[str, ...]) -> PhraseAutomaton:
+    """Normalize and compile a phrase list; cached by the phrase tuple."""
+    return PhraseAutomaton([normalize_text(phrase) for phrase in phrases])
+
 class ContentMatcher:
-    def __init__(self, threshold: int = 70):
+    def __init__(self, threshold: int = 70, token_cutoff: int = 60):
         """
         Initialize the content matcher.
         Args:
             threshold: Minimum similarity score (0-100) to consider a match
+            token_cutoff: Minimum token similarity for a skill to be scored at all;
+                skills with no token this close to a transcript token score 0
         """
         self.threshold = threshold
+        self.token_cutoff = token_cutoff
 
     def preprocess_text(self, text: str) -> str:
         """Clean and normalize text for comparison."""
-        # Convert to lowercase
-        text = text.lower()
-        # Remove special characters
-        text = re.sub(r'[^\w\s]', '', text)
-        # Remove extra whitespace
-        text = ' '.join(text.split())
-        return text
+        return normalize_text(text)
 
     def match_skills(self, resume_skills: List[str], transcript: str) -> Dict[str, int]:
         """
         Match skills from resume against transcript.
+        The transcript is indexed into word n-grams once and all candidate skills
+        are scored against it in one vectorized batch. Each skill gets the best fuzz.ratio
+        against n-grams of about its own word count, which approximates the former
+        fuzz.partial_ratio against the whole transcript; scores differ slightly from it
+        (e.g. partial matches inside longer words score lower).
         Returns a dictionary of skills and their match scores.
         """
-        transcript = self.preprocess_text(transcript)
-        results = {}
+        transcript_tokens = self.preprocess_text(transcript).split()
+        skills = [self.preprocess_text(skill) for skill in resume_skills]
+        results = {skill: 0 for skill in skills}
         
-        for skill in resume_skills:
-            skill = self.preprocess_text(skill)
-            # Use partial ratio to catch partial matches
-            score = fuzz.partial_ratio(skill, transcript)
-            results[skill] = score
+        skills = [skill for skill in results if skill]
+        if not skills or not transcript_tokens:
+            return results
+
+        # Candidate pruning: only skills sharing a (fuzzy) token with the transcript are scored
+        vocabulary = list(dict.fromkeys(transcript_tokens))
+        skill_vocabulary = list(dict.fromkeys(token for skill in skills for token in skill.split()))
+        token_scores = process.cdist(
+            skill_vocabulary, vocabulary, scorer=fuzz.ratio,
+            score_cutoff=self.token_cutoff, dtype=np.uint8
+        )
+        overlapping = {
+            token for token, best in zip(skill_vocabulary, token_scores.max(axis=1)) if best > 0
+        }
+
+        # Group candidates by word count; each group is scored against n-grams of similar length
+        candidates_by_length = {}
+        for skill in skills:
+            words = skill.split()
+            if any(word in overlapping for word in words):
+                candidates_by_length.setdefault(len(words), []).append(skill)
+
+        ngram_index = self._build_ngram_index(transcript_tokens, max(candidates_by_length, default=0) + 1)
+        for length, candidates in candidates_by_length.items():
+            ngrams = [
+                ngram for n in range(max(1, length - 1), length + 2)
+                for ngram in ngram_index.get(n, [])
+            ]
+            if not ngrams:
+                # Skill longer than the transcript: compare it with the longest n-grams there are
+                ngrams = ngram_index[max(ngram_index)]
+            scores = process.cdist(candidates, ngrams, scorer=fuzz.ratio, dtype=np.uint8)
+            for skill, score in zip(candidates, scores.max(axis=1)):
+                results[skill] = int(score)
         
         return results
 
+    def _build_ngram_index(self, tokens: List[str], max_n: int) -> Dict[int, List[str]]:
+        """Index the distinct word n-grams of a token list by n."""
+        index = {}
+        for n in range(1, min(max_n, len(tokens)) + 1):
+            index[n] = list(dict.fromkeys(
+                ' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1)
+            ))
+        return index
+
     def find_key_phrases(self, text: str, phrases: List[str]) -> List[Tuple[str, int]]:
         """
         Find key phrases in text and their positions.
+        Phrases are compiled once into a cached automaton and matched on word
+        boundaries in a single pass over the text.
         Returns list of (phrase, position) tuples.
         """
-        text = self.preprocess_text(text)
-        matches = []
-        
-        for phrase in phrases:
-            phrase = self.preprocess_text(phrase)
-            # Find all occurrences of the phrase
-            start = 0
-            while True:
-                start = text.find(phrase, start)
-                if start == -1:
-                    break
-                matches.append((phrase, start))
-                start += len(phrase)
-        
-        return sorted(matches, key=lambda x: x[1])
+        return compile_phrases(tuple(phrases)).find_all(self.preprocess_text(text))
 
     def analyze_content_match(self, resume_skills: List[str], transcript: str) -> Dict:
         """
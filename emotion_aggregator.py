@@ -0,0 +1,127 @@
+import threading
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+# Emotion classes of the DeepFace emotion model, in its output order
+EMOTIONS = ('angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral')
+
+
+class EmotionAggregator:
+    def __init__(self, emotions: Sequence[str] = EMOTIONS, window_seconds: float = 1.0,
+                 max_windows: int = 3600):
+        """
+        Running emotion statistics updated in O(1) per frame result, with a timeline of
+        per-window average scores. Memory is fixed: when the timeline reaches max_windows,
+        neighbouring windows are merged and the window length doubles.
+        Args:
+            emotions: Emotion names, in the order scores are stored
+            window_seconds: Initial timeline window length
+            max_windows: Maximum number of timeline windows (rounded up to an even number)
+        """
+        self.emotions = list(emotions)
+        self.initial_window_seconds = window_seconds
+        self.max_windows = max_windows + max_windows % 2
+        self._index = {emotion: i for i, emotion in enumerate(self.emotions)}
+        self._counts = np.zeros(len(self.emotions), dtype=np.int64)
+        self._score_sums = np.zeros(len(self.emotions), dtype=np.float64)
+        self._window_sums = np.zeros((self.max_windows, len(self.emotions)), dtype=np.float64)
+        self._window_counts = np.zeros(self.max_windows, dtype=np.int64)
+        self._scores = np.zeros(len(self.emotions), dtype=np.float64)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget every result."""
+        with self._lock:
+            self._counts[:] = 0
+            self._score_sums[:] = 0.0
+            self._window_sums[:] = 0.0
+            self._window_counts[:] = 0
+            self._total = 0
+            self._origin = None
+            self.window_seconds = self.initial_window_seconds
+
+    @property
+    def total(self) -> int:
+        """Number of results added."""
+        return self._total
+
+    def update(self, result: Dict, timestamp: Optional[float] = None):
+        """
+        Add one frame result.
+        Args:
+            result: Result with 'emotion' (or 'dominant_emotion') and an 'emotions' score dictionary
+            timestamp: Capture time in seconds; results without one only count towards the totals
+        """
+        with self._lock:
+            self._scores[:] = 0.0
+            for emotion, value in (result.get('emotions') or {}).items():
+                i = self._index.get(emotion)
+                if i is not None:
+                    self._scores[i] = value
+            dominant = self._index.get(result.get('emotion', result.get('dominant_emotion')))
+            if dominant is not None:
+                self._counts[dominant] += 1
+            self._score_sums += self._scores
+            self._total += 1
+
+            if timestamp is None:
+                return
+            if self._origin is None:
+                self._origin = timestamp
+            window = int(max(0.0, timestamp - self._origin) // self.window_seconds)
+            while window >= self.max_windows:
+                self._coarsen()
+                window = int(max(0.0, timestamp - self._origin) // self.window_seconds)
+            self._window_sums[window] += self._scores
+            self._window_counts[window] += 1
+
+    def _coarsen(self):
+        """Merge pairs of windows, doubling the window length; caller holds the lock."""
+        half = self.max_windows // 2
+        self._window_sums[:half] = self._window_sums.reshape(half, 2, -1).sum(axis=1)
+        self._window_counts[:half] = self._window_counts.reshape(half, 2).sum(axis=1)
+        self._window_sums[half:] = 0.0
+        self._window_counts[half:] = 0
+        self.window_seconds *= 2
+
+    def summary(self) -> Dict:
+        """
+        Statistics of the results so far.
+        Returns:
+            Dictionary with emotion_percentages, average_emotions, dominant_emotion and
+            total_frames_analyzed (empty before the first result)
+        """
+        with self._lock:
+            if self._total == 0:
+                return {}
+            percentages = 100.0 * self._counts / self._total
+            averages = self._score_sums / self._total
+            return {
+                'emotion_percentages': dict(zip(self.emotions, percentages.tolist())),
+                'average_emotions': dict(zip(self.emotions, averages.tolist())),
+                'dominant_emotion': self.emotions[int(np.argmax(self._counts))],
+                'total_frames_analyzed': self._total
+            }
+
+    def timeline(self) -> Dict:
+        """
+        Average scores per time window, for plotting next to the transcript. Windows
+        without results are left out.
+        Returns:
+            Dictionary with window_seconds, the start time of each window ('times'), its
+            frame count, dominant emotion and average score per emotion
+        """
+        with self._lock:
+            windows = np.flatnonzero(self._window_counts)
+            counts = self._window_counts[windows]
+            averages = self._window_sums[windows] / counts[:, None] if len(windows) else np.zeros((0, len(self.emotions)))
+            origin = self._origin or 0.0
+            return {
+                'window_seconds': self.window_seconds,
+                'times': (origin + windows * self.window_seconds).tolist(),
+                'frames': counts.tolist(),
+                'dominant': [self.emotions[i] for i in np.argmax(averages, axis=1)] if len(windows) else [],
+                'emotions': {emotion: averages[:, i].tolist() for i, emotion in enumerate(self.emotions)}
+            }
@@ -1,12 +1,139 @@
 from deepface import DeepFace
 import cv2
 import numpy as np
-from typing import List, Dict
+from typing import Iterator, List, Dict, Optional, Sequence, Tuple
 import os
+import threading
+from model_registry import registry
+from emotion_aggregator import EMOTIONS, EmotionAggregator
+from frame_selector import FrameSelector, sampling_saved_percent
+
+def load_emotion_model():
+    """Build DeepFace's emotion model and return the underlying Keras model."""
+    try:
+        client = DeepFace.build_model(model_name='Emotion', task='facial_attribute')
+    except TypeError:
+        # Older DeepFace releases take only the model name
+        client = DeepFace.build_model('Emotion')
+    return getattr(client, 'model', client)
+
+def _scale_box(box: Tuple[int, int, int, int], factor: float) -> Tuple[int, int, int, int]:
+    """Scale an (x, y, w, h) box between detection and frame coordinates."""
+    return tuple(int(round(v * factor)) for v in box)
+
+class FaceTracker:
+    def __init__(self, analyzer: 'FacialEmotionAnalyzer', detect_every: int = 10,
+                 min_confidence: float = 0.6, search_margin: float = 0.5):
+        """
+        Follow one face across frames: full detection every detect_every frames or when
+        the match is lost, normalized template matching around the last box otherwise.
+        Args:
+            analyzer: Analyzer providing the detection image and face detector
+            detect_every: Frames between full detections
+            min_confidence: Template match score (TM_CCOEFF_NORMED) below which the face is detected again
+            search_margin: Search window around the last box, as a fraction of the box size
+        """
+        self.analyzer = analyzer
+        self.detect_every = detect_every
+        self.min_confidence = min_confidence
+        self.search_margin = search_margin
+        self.stats = {'detections': 0, 'tracked': 0, 'lost': 0}
+        self._lock = threading.Lock()
+        self._box = None
+        self._template = None
+        self._since_detection = 0
+
+    def update(self, frame: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Locate the face in the next frame.
+        Args:
+            frame: BGR image frame
+        Returns:
+            (x, y, w, h) box in frame coordinates, or None if no face was found
+        """
+        gray, scale = self.analyzer._detection_image(frame)
+        with self._lock:
+            box = None
+            if self._box is not None and self._since_detection < self.detect_every:
+                box = self._track(gray)
+                if box is None:
+                    self.stats['lost'] += 1
+            if box is None:
+                box = self._detect(gray)
+            else:
+                self._box = box
+                self._since_detection += 1
+                self.stats['tracked'] += 1
+        return _scale_box(box, 1 / scale) if box is not None else None
+
+    def reset(self):
+        """Forget the tracked face; the next frame runs full detection."""
+        with self._lock:
+            self._box = None
+            self._template = None
+
+    def _detect(self, gray: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        """Run full detection and start tracking the face found; caller holds the lock."""
+        self.stats['detections'] += 1
+        box = self.analyzer._detect_largest_face(gray)
+        self._box = box
+        self._since_detection = 0
+        if box is not None:
+            x, y, w, h = box
+            self._template = gray[y:y + h, x:x + w].copy()
+        return box
+
+    def _track(self, gray: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        """Find the face template near its last position; caller holds the lock."""
+        x, y, w, h = self._box
+        if self._template is None or self._template.shape != (h, w):
+            return None
+        dx, dy = int(w * self.search_margin), int(h * self.search_margin)
+        x0, y0 = max(x - dx, 0), max(y - dy, 0)
+        region = gray[y0:min(y + h + dy, gray.shape[0]), x0:min(x + w + dx, gray.shape[1])]
+        if region.shape[0] < h or region.shape[1] < w:
+            return None
+        scores = cv2.matchTemplate(region, self._template, cv2.TM_CCOEFF_NORMED)
+        _, confidence, _, location = cv2.minMaxLoc(scores)
+        if confidence < self.min_confidence:
+            return None
+        return (x0 + location[0], y0 + location[1], w, h)
 
 class FacialEmotionAnalyzer:
-    def __init__(self):
-        self.emotions = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+    def __init__(self, batch_size: int = 32, detection_width: int = 320,
+                 frame_selector: Optional[FrameSelector] = None, detect_every: int = 10,
+                 track_confidence: float = 0.6):
+        """
+        Initialize the facial emotion analyzer.
+        Args:
+            batch_size: Number of face crops sent to the emotion model per forward pass
+            detection_width: Width frames are downscaled to before face detection
+            frame_selector: Selector skipping near-duplicate frames in analyze_frames
+            detect_every: Run full face detection every this many frames and track the face in between
+            track_confidence: Template match score below which the face is detected again
+        """
+        self.emotions = list(EMOTIONS)
+        self.batch_size = batch_size
+        self.detection_width = detection_width
+        self.input_size = (48, 48)  # Input size of the DeepFace emotion model
+        self.frame_selector = frame_selector or FrameSelector()
+        self.detect_every = detect_every
+        self.track_confidence = track_confidence
+        self._face_detector = None
+        # Tracks the face across live frames for analyze_frame_tracked
+        self.face_tracker = FaceTracker(self, detect_every, track_confidence)
+        registry.register('deepface:emotion', load_emotion_model)
+
+    def __getstate__(self) -> Dict:
+        # The cascade and the tracker's lock cannot be pickled; process workers rebuild them
+        state = dict(self.__dict__)
+        state['_face_detector'] = None
+        state['face_tracker'] = None
+        return state
+
+    def __setstate__(self, state: Dict):
+        self.__dict__.update(state)
+        self.face_tracker = FaceTracker(self, self.detect_every, self.track_confidence)
 
     def analyze_frame(self, frame: np.ndarray) -> Dict:
         """
@@ -38,58 +165,224 @@ class FacialEmotionAnalyzer:
             
         except Exception as e:
             print(f"Error analyzing frame: {str(e)}")
-            return {
-                'emotion': 'neutral',
-                'emotions': {emotion: 0.0 for emotion in self.emotions}
-            }
+            return self._default_result()
+
+    def analyze_frame_tracked(self, frame: np.ndarray) -> Dict:
+        """
+        Analyze emotions in a live frame using the tracked face box: the emotion model only
+        sees the cropped face, and full detection runs every detect_every frames.
+        Safe to call from several threads.
+        Args:
+            frame: BGR image frame from webcam
+        Returns:
+            Dictionary with emotion analysis results
+        """
+        try:
+            box = self.face_tracker.update(frame)
+            return self.classify_faces([self._crop_face(frame, box)], batch_size=1)[0]
+        except Exception as e:
+            print(f"Error analyzing tracked frame: {str(e)}")
+            return self.analyze_frame(frame)
 
-    def analyze_frames(self, frames: List[np.ndarray]) -> Dict:
+    def analyze_frames(self, frames: List[np.ndarray], batched: bool = True,
+                       skip_similar: bool = True, timestamps: Optional[List[float]] = None) -> Dict:
         """
         Analyze emotions across multiple frames.
         Args:
             frames: List of BGR image frames
+            batched: Use the batched inference path instead of one DeepFace call per frame
+            skip_similar: Only analyze frames that differ from the last analyzed one and
+                reuse its result for the skipped frames
+            timestamps: Capture times of the frames, used for the selector's maximum gap
         Returns:
             Dictionary with emotion analysis summary
         """
-        results = []
+        # Every frame points at the analyzed frame whose result it uses
+        if skip_similar and self.frame_selector is not None:
+            sources = self.frame_selector.select(frames, timestamps)
+        else:
+            sources = list(range(len(frames)))
+        analyzed = sorted(set(sources))
+
+        if batched:
+            batches = self.iter_frames_batched([frames[i] for i in analyzed])
+        else:
+            batches = ([self.analyze_frame(frames[i])] for i in analyzed)
+
+        # Aggregate each batch as soon as it is classified. A skipped frame uses the result of
+        # the last analyzed frame before it, so every frame is added once its source is done
+        aggregator = EmotionAggregator(self.emotions)
+        frame = 0
+        results = (result for batch in batches for result in batch)
+        for source, result in zip(analyzed, results):
+            while frame < len(sources) and sources[frame] == source:
+                aggregator.update(result, timestamps[frame] if timestamps is not None else None)
+                frame += 1
+
+        summary = aggregator.summary()
+        if summary and timestamps is not None:
+            summary['timeline'] = aggregator.timeline()
+        if summary:
+            summary['sampling'] = {
+                'total_frames': len(frames),
+                'analyzed_frames': len(analyzed),
+                'skipped_frames': len(frames) - len(analyzed),
+                'inference_saved_percent': sampling_saved_percent(len(frames), len(analyzed))
+            }
+        return summary
+
+    def analyze_frames_batched(self, frames: List[np.ndarray], batch_size: Optional[int] = None) -> List[Dict]:
+        """
+        Analyze emotions for many frames with tracked face boxes and batched inference.
+        Args:
+            frames: List of BGR image frames
+            batch_size: Crops per forward pass (defaults to self.batch_size)
+        Returns:
+            List of per-frame results with 'emotion' and 'emotions' keys
+        """
+        return [result for batch in self.iter_frames_batched(frames, batch_size) for result in batch]
+
+    def iter_frames_batched(self, frames: Sequence[np.ndarray], batch_size: Optional[int] = None) -> Iterator[List[Dict]]:
+        """
+        Analyze the frames of one recording batch_size frames at a time, tracking the face
+        across batches, so callers can consume results while later batches are pending.
+        Args:
+            frames: BGR image frames in capture order
+            batch_size: Frames per batch and forward pass (defaults to self.batch_size)
+        Yields:
+            Per-frame results of each batch, with 'emotion' and 'emotions' keys
+        """
+        batch_size = batch_size or self.batch_size
+        tracker = FaceTracker(self, self.detect_every, self.track_confidence)
+        for start in range(0, len(frames), batch_size):
+            chunk = frames[start:start + batch_size]
+            try:
+                crops = [self._crop_face(frame, tracker.update(frame)) for frame in chunk]
+                results = self.classify_faces(crops, batch_size=batch_size)
+            except Exception as e:
+                # Fall back to the per-frame DeepFace path
+                print(f"Error in batched emotion analysis, falling back to per-frame: {str(e)}")
+                results = [self.analyze_frame(frame) for frame in chunk]
+            yield results
+
+    def detect_faces(self, frames: List[np.ndarray]) -> List[Optional[Tuple[int, int, int, int]]]:
+        """
+        Detect the largest face in each frame.
+        Args:
+            frames: List of BGR image frames
+        Returns:
+            List of (x, y, w, h) boxes in frame coordinates, None where no face was found
+        """
+        boxes = []
         for frame in frames:
-            result = self.analyze_frame(frame)
-            results.append(result)
-        
-        return self.get_emotion_summary(results)
+            gray, scale = self._detection_image(frame)
+            box = self._detect_largest_face(gray)
+            boxes.append(_scale_box(box, 1 / scale) if box is not None else None)
+        return boxes
+
+    def track_faces(self, frames: List[np.ndarray]) -> List[Optional[Tuple[int, int, int, int]]]:
+        """
+        Locate the face in consecutive frames of one recording, running full detection
+        only every detect_every frames and tracking the box in between.
+        Args:
+            frames: List of BGR image frames in capture order
+        Returns:
+            List of (x, y, w, h) boxes in frame coordinates, None where no face was found
+        """
+        tracker = FaceTracker(self, self.detect_every, self.track_confidence)
+        return [tracker.update(frame) for frame in frames]
 
-    def get_emotion_summary(self, results: List[Dict]) -> Dict:
+    def classify_faces(self, faces: List[np.ndarray], batch_size: Optional[int] = None) -> List[Dict]:
+        """
+        Run the emotion model over face crops in batches, skipping face detection.
+        Args:
+            faces: List of BGR (or grayscale) face crops
+            batch_size: Crops per forward pass (defaults to self.batch_size)
+        Returns:
+            List of per-crop results with 'emotion' and 'emotions' keys
+        """
+        if not faces:
+            return []
+
+        batch_size = batch_size or self.batch_size
+        model = self._get_emotion_model()
+
+        # Stack all crops into a single (N, 48, 48, 1) tensor
+        batch = np.empty((len(faces), self.input_size[1], self.input_size[0], 1), dtype=np.float32)
+        for i, face in enumerate(faces):
+            gray = cv2.cvtColor(face, cv2.COLOR_BGR2GRAY) if face.ndim == 3 else face
+            batch[i, :, :, 0] = cv2.resize(gray, self.input_size, interpolation=cv2.INTER_AREA)
+        batch /= 255.0
+
+        predictions = np.asarray(model.predict(batch, batch_size=batch_size, verbose=0), dtype=np.float64)
+
+        # Same normalisation DeepFace applies: percentages that sum to 100
+        totals = predictions.sum(axis=1, keepdims=True)
+        totals[totals == 0] = 1.0
+        percentages = 100 * predictions / totals
+
+        results = []
+        for scores in percentages:
+            results.append({
+                'emotion': self.emotions[int(np.argmax(scores))],
+                'emotions': {emotion: float(score) for emotion, score in zip(self.emotions, scores)}
+            })
+        return results
+
+    def _crop_face(self, frame: np.ndarray, box: Optional[Tuple[int, int, int, int]]) -> np.ndarray:
+        """Crop a face box from a frame, using the whole frame when no face was found."""
+        if box is None:
+            return frame
+        x, y, w, h = box
+        return frame[max(y, 0):y + h, max(x, 0):x + w]
+
+    def _detection_image(self, frame: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Grayscale frame downscaled to detection_width, and the scale applied."""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        scale = min(1.0, self.detection_width / gray.shape[1])
+        if scale < 1.0:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return gray, scale
+
+    def _detect_largest_face(self, gray: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        """Largest face box in a detection image, in that image's coordinates."""
+        faces = self._get_face_detector().detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(24, 24))
+        if len(faces) == 0:
+            return None
+        return tuple(int(v) for v in max(faces, key=lambda f: f[2] * f[3]))
+
+    def _get_face_detector(self):
+        """Load the OpenCV Haar cascade (DeepFace's default detector backend) once."""
+        if self._face_detector is None:
+            cascade_path = os.path.join(cv2.data.haarcascades, 'haarcascade_frontalface_default.xml')
+            self._face_detector = cv2.CascadeClassifier(cascade_path)
+        return self._face_detector
+
+    def _get_emotion_model(self):
+        """Return the Keras model behind DeepFace's emotion client from the model registry."""
+        return registry.get('deepface:emotion', load_emotion_model)
+
+    def _default_result(self) -> Dict:
+        """Neutral result used when a frame cannot be analyzed."""
+        return {
+            'emotion': 'neutral',
+            'emotions': {emotion: 0.0 for emotion in self.emotions}
+        }
+
+    def get_emotion_summary(self, results: List[Dict], timestamps: Optional[Sequence[float]] = None) -> Dict:
         """
         Summarize emotion analysis results.
         Args:
             results: List of emotion analysis results
+            timestamps: Capture time of each result; when given, the summary includes a
+                per-second 'timeline'
         Returns:
             Dictionary with emotion statistics
         """
-        emotion_counts = {emotion: 0 for emotion in self.emotions}
-        
-        for result in results:
-            dominant_emotion = result['emotion']
-            emotion_counts[dominant_emotion] += 1
-        
-        total_frames = len(results)
-        if total_frames == 0:
-            return {}
-            
-        emotion_percentages = {
-            emotion: (count / total_frames) * 100
-            for emotion, count in emotion_counts.items()
-        }
-        
-        # Calculate average emotion values
-        avg_emotions = {emotion: 0.0 for emotion in self.emotions}
-        for result in results:
-            for emotion, value in result['emotions'].items():
-                avg_emotions[emotion] += value / total_frames
-        
-        return {
-            'emotion_percentages': emotion_percentages,
-            'average_emotions': avg_emotions,
-            'dominant_emotion': max(emotion_counts.items(), key=lambda x: x[1])[0],
-            'total_frames_analyzed': total_frames
-        } 
\ No newline at end of file
+        aggregator = EmotionAggregator(self.emotions)
+        for i, result in enumerate(results):
+            aggregator.update(result, timestamps[i] if timestamps is not None else None)
+        summary = aggregator.summary()
+        if summary and timestamps is not None:
+            summary['timeline'] = aggregator.timeline()
+        return summary
@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+
+class FrameAnalysisPool:
+    def __init__(self, analyze_fn: Callable[[np.ndarray], Dict], num_workers: int = 2,
+                 max_queue_size: int = 4, every_nth: int = 1, max_fps: Optional[float] = None):
+        """
+        Fixed-size pool of worker threads analyzing live frames.
+        Args:
+            analyze_fn: Function analyzing a single BGR frame and returning a result dict
+            num_workers: Number of worker threads
+            max_queue_size: Maximum pending frames; the oldest frame is dropped when full
+            every_nth: Only submit every Nth frame for analysis
+            max_fps: Maximum frames per second submitted for analysis (None for no limit)
+        """
+        self.analyze_fn = analyze_fn
+        self.num_workers = num_workers
+        self.every_nth = max(1, every_nth)
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+
+        self._pending = deque(maxlen=max_queue_size)
+        self._condition = threading.Condition()
+        self._workers = []
+        self._running = False
+
+        self._frames_seen = 0
+        self._last_submit = 0.0
+        self._latest_result = None
+        self._latest_index = -1
+        self._stats = {'submitted': 0, 'skipped': 0, 'dropped': 0, 'analyzed': 0, 'errors': 0}
+
+    def start(self):
+        """Start the worker threads."""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        for i in range(self.num_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"frame-analysis-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self, wait: bool = True):
+        """
+        Stop the worker threads.
+        Args:
+            wait: Wait for in-flight analyses to finish; pending frames are discarded
+        """
+        with self._condition:
+            self._running = False
+            self._stats['dropped'] += len(self._pending)
+            self._pending.clear()
+            self._condition.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+        self._workers = []
+
+    def submit(self, frame: np.ndarray) -> bool:
+        """
+        Offer a frame for analysis, applying the rate limit and drop-oldest backpressure.
+        Args:
+            frame: BGR frame
+        Returns:
+            True if the frame was queued for analysis
+        """
+        now = time.monotonic()
+        with self._condition:
+            index = self._frames_seen
+            self._frames_seen += 1
+            if index % self.every_nth != 0 or now - self._last_submit < self.min_interval:
+                self._stats['skipped'] += 1
+                return False
+            self._last_submit = now
+
+            if len(self._pending) == self._pending.maxlen:
+                # deque(maxlen) evicts the oldest entry on append
+                self._stats['dropped'] += 1
+            self._pending.append((index, frame))
+            self._stats['submitted'] += 1
+            self._condition.notify()
+            return True
+
+    def latest_result(self) -> Optional[Dict]:
+        """Return the result of the newest analyzed frame, or None if nothing finished yet."""
+        with self._condition:
+            return self._latest_result
+
+    def get_stats(self) -> Dict:
+        """Return counters for seen, skipped, dropped and analyzed frames."""
+        with self._condition:
+            stats = dict(self._stats)
+            stats['frames_seen'] = self._frames_seen
+            stats['pending'] = len(self._pending)
+            return stats
+
+    def _worker_loop(self):
+        """Take frames from the queue until the pool is stopped."""
+        while True:
+            with self._condition:
+                while self._running and not self._pending:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                index, frame = self._pending.popleft()
+
+            try:
+                result = self.analyze_fn(frame)
+                error = False
+            except Exception as e:
+                print(f"Error processing frame: {str(e)}")
+                result = {'dominant_emotion': 'error', 'emotions': {}}
+                error = True
+
+            with self._condition:
+                self._stats['errors' if error else 'analyzed'] += 1
+                # Results can finish out of order; keep only the newest frame's result
+                if index > self._latest_index:
+                    self._latest_index = index
+                    self._latest_result = result
@@ -0,0 +1,97 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+
+class FrameSelector:
+    def __init__(self, diff_threshold: float = 4.0, max_gap: int = 10, max_gap_seconds: Optional[float] = None,
+                 signature_size: Tuple[int, int] = (32, 24)):
+        """
+        Pick the frames worth sending to the emotion model: a frame is analyzed when it
+        differs noticeably from the last analyzed frame, or when too many frames
+        (or seconds) have passed since then.
+        Args:
+            diff_threshold: Mean absolute difference (0-255) of the frame signatures that counts as a change
+            max_gap: Maximum number of consecutive frames skipped
+            max_gap_seconds: Maximum time between analyzed frames, when timestamps are given
+            signature_size: (width, height) of the grayscale signature
+        """
+        self.diff_threshold = diff_threshold
+        self.max_gap = max_gap
+        self.max_gap_seconds = max_gap_seconds
+        self.signature_size = signature_size
+        self.stats = {'frames_seen': 0, 'frames_analyzed': 0, 'frames_skipped': 0}
+        self.reset()
+
+    def reset(self):
+        """Forget the last analyzed frame (the next frame is always analyzed)."""
+        self._last_signature = None
+        self._last_time = None
+        self._skipped_in_row = 0
+
+    def signature(self, frame: np.ndarray) -> np.ndarray:
+        """Downscaled grayscale copy of a frame used to compare frames cheaply."""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        return cv2.resize(gray, self.signature_size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def accept(self, frame: np.ndarray, timestamp: Optional[float] = None) -> bool:
+        """
+        Decide whether a frame of a stream should be analyzed.
+        Args:
+            frame: BGR (or grayscale) frame
+            timestamp: Capture time in seconds, used with max_gap_seconds
+        Returns:
+            True if the frame should be analyzed, False if the previous result can be reused
+        """
+        signature = self.signature(frame)
+        self.stats['frames_seen'] += 1
+
+        analyze = (
+            self._last_signature is None
+            or self._skipped_in_row >= self.max_gap
+            or (self.max_gap_seconds is not None and timestamp is not None and self._last_time is not None
+                and timestamp - self._last_time >= self.max_gap_seconds)
+            or float(np.mean(np.abs(signature - self._last_signature))) >= self.diff_threshold
+        )
+
+        if analyze:
+            self._last_signature = signature
+            self._last_time = timestamp
+            self._skipped_in_row = 0
+            self.stats['frames_analyzed'] += 1
+        else:
+            self._skipped_in_row += 1
+            self.stats['frames_skipped'] += 1
+        return analyze
+
+    def select(self, frames: Sequence[np.ndarray], timestamps: Optional[Sequence[float]] = None) -> List[int]:
+        """
+        Select the frames of a recording to analyze.
+        Args:
+            frames: BGR frames in capture order
+            timestamps: Capture times in seconds (optional)
+        Returns:
+            For every frame, the index of the analyzed frame whose result it uses
+            (its own index when the frame itself is analyzed)
+        """
+        self.reset()
+        sources = []
+        for i, frame in enumerate(frames):
+            timestamp = timestamps[i] if timestamps is not None else None
+            if self.accept(frame, timestamp) or not sources:
+                sources.append(i)
+            else:
+                sources.append(sources[-1])
+        return sources
+
+    def get_stats(self) -> Dict:
+        """Return frame counters and the share of inference saved so far."""
+        stats = dict(self.stats)
+        stats['inference_saved_percent'] = sampling_saved_percent(stats['frames_seen'], stats['frames_analyzed'])
+        return stats
+
+
+def sampling_saved_percent(total_frames: int, analyzed_frames: int) -> float:
+    """Percentage of frames whose inference was skipped."""
+    return 100.0 * (total_frames - analyzed_frames) / total_frames if total_frames else 0.0
@@ -0,0 +1,324 @@
+import io
+import os
+import tempfile
+import threading
+import uuid
+from multiprocessing import shared_memory
+from typing import Callable, Iterator, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+BACKINGS = ('memory', 'shared', 'memmap')
+
+# Where shared-memory segments live on Linux; checked before allocating so a full
+# /dev/shm (64 MB by default in containers) falls back to a file instead of crashing on write
+SHM_PATH = '/dev/shm'
+
+
+class FrameStoreHandle:
+    def __init__(self, backing: str, name: str, shape: Tuple[int, ...], dtype: str,
+                 indices: np.ndarray, timestamps: np.ndarray):
+        """
+        Picklable reference to frames held in shared memory or a memory-mapped file.
+        Sending it to another process costs a few hundred bytes instead of a copy of every frame.
+        Args:
+            backing: 'shared' or 'memmap'
+            name: Shared-memory segment name or memmap file path
+            shape: Shape of the whole ring array (capacity, height, width, channels)
+            dtype: Array dtype
+            indices: Ring slots of the referenced frames, in chronological order
+            timestamps: Capture time of each referenced frame
+        """
+        self.backing = backing
+        self.name = name
+        self.shape = tuple(shape)
+        self.dtype = dtype
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+
+    def attach(self) -> 'FrameView':
+        """Map the frames in this process (read-only, without copying them)."""
+        return FrameView.attach(self)
+
+
+class FrameView:
+    def __init__(self, data: np.ndarray, indices: np.ndarray, timestamps: np.ndarray,
+                 backing: str = 'memory', name: Optional[str] = None, owner=None):
+        """
+        Read-only, list-like sequence of frames backed by a ring array. Frames are views
+        into the ring, so they change if the store keeps recording after the snapshot.
+        Args:
+            data: Ring array (capacity, height, width, channels)
+            indices: Ring slots of the frames, in chronological order
+            timestamps: Capture time of each frame
+            backing: Backing of the ring array ('memory', 'shared' or 'memmap')
+            name: Shared-memory segment name or memmap file path
+            owner: Object keeping the mapping alive (the attached SharedMemory)
+        """
+        self._data = data
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+        self.backing = backing
+        self.name = name
+        self._owner = owner
+
+    @classmethod
+    def from_frames(cls, frames: Sequence[np.ndarray], timestamps: Optional[Sequence[float]] = None) -> 'FrameView':
+        """Stack equally sized frames into an in-memory view."""
+        data = np.stack(list(frames)) if len(frames) else np.zeros((0, 0, 0, 3), dtype=np.uint8)
+        if timestamps is None:
+            timestamps = np.arange(len(data), dtype=np.float64)
+        return cls(data, np.arange(len(data)), timestamps)
+
+    @classmethod
+    def attach(cls, handle: FrameStoreHandle) -> 'FrameView':
+        """Map the frames a handle refers to; close() releases the mapping."""
+        if handle.backing == 'shared':
+            shm = shared_memory.SharedMemory(name=handle.name)
+            data = np.ndarray(handle.shape, dtype=handle.dtype, buffer=shm.buf)
+            data.flags.writeable = False
+            return cls(data, handle.indices, handle.timestamps, 'shared', handle.name, owner=shm)
+        if handle.backing == 'memmap':
+            data = np.memmap(handle.name, dtype=handle.dtype, mode='r', shape=handle.shape)
+            return cls(data, handle.indices, handle.timestamps, 'memmap', handle.name)
+        raise ValueError(f"Frames in {handle.backing} storage cannot be attached from another process")
+
+    @property
+    def attached(self) -> bool:
+        """True if this view mapped a shared-memory segment itself (and should close it)."""
+        return self._owner is not None
+
+    @property
+    def handle(self) -> Optional[FrameStoreHandle]:
+        """Handle for other processes, or None for in-memory frames."""
+        if self.backing == 'memory' or self._data is None:
+            return None
+        return FrameStoreHandle(self.backing, self.name, self._data.shape, self._data.dtype.str,
+                                self.indices, self.timestamps)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of frame data the view refers to."""
+        if self._data is None or len(self._data) == 0:
+            return 0
+        return len(self.indices) * self._data[0].nbytes
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, key) -> Union[np.ndarray, 'FrameView']:
+        # An integer returns one frame; a slice, mask or index array returns a smaller view
+        if isinstance(key, (int, np.integer)):
+            return self._data[self.indices[key]]
+        return FrameView(self._data, self.indices[key], self.timestamps[key], self.backing, self.name, self._owner)
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for index in self.indices:
+            yield self._data[index]
+
+    def to_array(self) -> np.ndarray:
+        """Copy the frames into one (N, height, width, channels) array."""
+        return self._data[self.indices]
+
+    def close(self):
+        """Release a mapping made by attach(); views of the store's own memory are left alone."""
+        data, owner = self._data, self._owner
+        self._data = None
+        self._owner = None
+        del data
+        if owner is not None:
+            try:
+                owner.close()
+            except BufferError:
+                # Frames handed out are still referenced; the mapping goes away with them
+                pass
+
+    def __reduce__(self):
+        # Shared frames travel as a handle; in-memory frames as one compact copy
+        handle = self.handle
+        if handle is not None:
+            return FrameView.attach, (handle,)
+        return FrameView.from_frames, (self.to_array(), self.timestamps)
+
+
+def encode_frames(frames: Sequence[np.ndarray], timestamps: Optional[Sequence[float]] = None,
+                  quality: int = 90) -> bytes:
+    """
+    Pack frames as JPEG images in one npz archive (no pickled objects) for sending over HTTP.
+    Args:
+        frames: BGR frames (a FrameView or a list)
+        timestamps: Capture time of each frame (the view's own timestamps by default)
+        quality: JPEG quality
+    Returns:
+        Archive bytes, decoded with decode_frames()
+    """
+    if timestamps is None:
+        timestamps = getattr(frames, 'timestamps', np.arange(len(frames), dtype=np.float64))
+    encoded = []
+    for frame in frames:
+        ok, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise ValueError("Could not encode frame as JPEG")
+        encoded.append(jpeg.reshape(-1))
+    offsets = np.cumsum([0] + [len(jpeg) for jpeg in encoded]).astype(np.int64)
+    data = np.concatenate(encoded) if encoded else np.zeros(0, dtype=np.uint8)
+    out = io.BytesIO()
+    np.savez(out, data=data, offsets=offsets, timestamps=np.asarray(timestamps, dtype=np.float64))
+    return out.getvalue()
+
+
+def decode_frames(data: bytes) -> FrameView:
+    """Decode an archive written by encode_frames() into an in-memory frame view."""
+    with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+        jpeg, offsets, timestamps = archive['data'], archive['offsets'], archive['timestamps']
+    frames = [cv2.imdecode(jpeg[start:end], cv2.IMREAD_COLOR) for start, end in zip(offsets[:-1], offsets[1:])]
+    return FrameView.from_frames(frames, timestamps)
+
+
+class FrameStore:
+    def __init__(self, capacity: int, max_width: Optional[int] = None,
+                 face_crop: Optional[Callable[[np.ndarray], Optional[Tuple[int, int, int, int]]]] = None,
+                 crop_size: Tuple[int, int] = (96, 96), crop_margin: float = 0.25,
+                 backing: str = 'memory', directory: Optional[str] = None):
+        """
+        Timestamped video frames in a single preallocated uint8 ring array keeping the most
+        recent frames. The ring is allocated on the first frame (its size fixes the frame shape);
+        later frames of another size are resized to it.
+        Args:
+            capacity: Maximum number of frames to keep
+            max_width: Downscale wider frames to this width, keeping the aspect ratio (None keeps them as captured)
+            face_crop: Callable returning the (x, y, w, h) face box of a frame (e.g. FaceTracker.update);
+                when given only face crops of crop_size are stored, or the whole frame resized when no face is found
+            crop_size: (width, height) of stored face crops
+            crop_margin: Margin added around the face box, as a fraction of its size
+            backing: 'memory' (private array), 'shared' (multiprocessing shared memory) or
+                'memmap' (memory-mapped temporary file); the last two let worker processes read
+                the frames through a handle instead of receiving pickled copies
+            directory: Directory of memmap files (the system temporary directory by default)
+        """
+        if backing not in BACKINGS:
+            raise ValueError(f"Unknown frame store backing: {backing}")
+        self.capacity = max(1, int(capacity))
+        self.max_width = max_width
+        self.face_crop = face_crop
+        self.crop_size = tuple(crop_size)
+        self.crop_margin = crop_margin
+        self.backing = backing
+        self.directory = directory
+        self.name = None
+        self._data = None
+        self._shm = None
+        self._timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self._written = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, capacity: int, face_crop: Optional[Callable] = None) -> 'FrameStore':
+        """
+        Frame store configured from INTERVIEW_FRAME_STORE (backing, default 'shared'),
+        INTERVIEW_FRAME_WIDTH (default 320, 0 keeps full resolution) and
+        INTERVIEW_FRAME_FACE_CROP=1 (store face crops only, when face_crop is given).
+        """
+        width = int(os.environ.get('INTERVIEW_FRAME_WIDTH', 320))
+        crop_faces = os.environ.get('INTERVIEW_FRAME_FACE_CROP', '0') == '1'
+        return cls(capacity, max_width=width or None, face_crop=face_crop if crop_faces else None,
+                   backing=os.environ.get('INTERVIEW_FRAME_STORE', 'shared'))
+
+    def prepare(self, frame: np.ndarray) -> np.ndarray:
+        """Reduce a captured frame to what the store keeps (face crop or downscaled frame)."""
+        if self.face_crop is not None:
+            box = self.face_crop(frame)
+            if box is not None:
+                x, y, w, h = box
+                dx, dy = int(w * self.crop_margin), int(h * self.crop_margin)
+                frame = frame[max(y - dy, 0):y + h + dy, max(x - dx, 0):x + w + dx]
+            return cv2.resize(frame, self.crop_size, interpolation=cv2.INTER_AREA)
+        if self.max_width and frame.shape[1] > self.max_width:
+            scale = self.max_width / frame.shape[1]
+            size = (self.max_width, max(1, int(round(frame.shape[0] * scale))))
+            return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        return frame
+
+    def write(self, frame: np.ndarray, timestamp: float):
+        """Store a frame captured at the given clock time, overwriting the oldest when full."""
+        frame = self.prepare(frame)
+        with self._lock:
+            if self._data is None:
+                self._allocate(frame.shape)
+            if frame.shape != self._data.shape[1:]:
+                frame = cv2.resize(frame, (self._data.shape[2], self._data.shape[1]), interpolation=cv2.INTER_AREA)
+                frame = frame.reshape(self._data.shape[1:])
+            slot = self._written % self.capacity
+            self._data[slot] = frame
+            self._timestamps[slot] = timestamp
+            self._written += 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return min(self._written, self.capacity)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes allocated for frames."""
+        return self._data.nbytes if self._data is not None else 0
+
+    def snapshot(self) -> Tuple[FrameView, np.ndarray]:
+        """
+        Return the buffered frames in chronological order without copying them.
+        Returns:
+            Tuple of (frame view, timestamps array)
+        """
+        with self._lock:
+            count = min(self._written, self.capacity)
+            start = self._written - count
+            indices = np.arange(start, self._written) % self.capacity
+            timestamps = self._timestamps[indices]
+            if self._data is None:
+                return FrameView.from_frames([], timestamps), timestamps
+            return FrameView(self._data, indices, timestamps, self.backing, self.name), timestamps
+
+    def close(self):
+        """Release the ring array; shared segments and memmap files are removed."""
+        with self._lock:
+            data, shm = self._data, self._shm
+            self._data = None
+            self._shm = None
+            self._written = 0
+        del data
+        if shm is not None:
+            try:
+                shm.close()
+            except BufferError:
+                # Views still reference the segment; it is freed when they are
+                pass
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+        elif self.backing == 'memmap' and self.name and os.path.exists(self.name):
+            os.remove(self.name)
+
+    def _allocate(self, frame_shape: Tuple[int, ...]):
+        """Allocate the ring for frames of the given shape; caller holds the lock."""
+        shape = (self.capacity,) + tuple(frame_shape)
+        nbytes = int(np.prod(shape))
+        if self.backing == 'shared':
+            try:
+                if os.path.isdir(SHM_PATH):
+                    stats = os.statvfs(SHM_PATH)
+                    if stats.f_bavail * stats.f_frsize < nbytes:
+                        raise OSError(f"{nbytes} bytes do not fit in {SHM_PATH}")
+                self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+                self.name = self._shm.name
+                self._data = np.ndarray(shape, dtype=np.uint8, buffer=self._shm.buf)
+                return
+            except OSError as e:
+                print(f"Shared memory not available for frames, using a memory-mapped file: {str(e)}")
+                self.backing = 'memmap'
+        if self.backing == 'memmap':
+            directory = self.directory or tempfile.gettempdir()
+            self.name = os.path.join(directory, f"frames-{os.getpid()}-{uuid.uuid4().hex}.u8")
+            self._data = np.memmap(self.name, dtype=np.uint8, mode='w+', shape=shape)
+            return
+        self._data = np.empty(shape, dtype=np.uint8)
@@ -0,0 +1,233 @@
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import JSON, DateTime, Float, ForeignKey, Index, Integer, String, Text, create_engine, event, func, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship, sessionmaker
+
+from result_cache import json_default
+
+DEFAULT_HISTORY_PATH = os.path.join(os.path.expanduser("~"), ".cache", "self_interview", "history.sqlite3")
+
+# Keys of an analyze_response result stored as one stage result each
+STAGE_KEYS = ('voice_analysis', 'emotion_analysis', 'content_analysis', 'answer_evaluation', 'stage_errors')
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class InterviewSession(Base):
+    __tablename__ = 'sessions'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    candidate: Mapped[str] = mapped_column(String(200))
+    started_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+    skills: Mapped[list] = mapped_column(JSON, default=list)
+
+    answers: Mapped[List['Answer']] = relationship(back_populates='session', lazy='raise')
+
+    __table_args__ = (Index('sessions_candidate_started', 'candidate', 'started_at'),)
+
+
+class Answer(Base):
+    __tablename__ = 'answers'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    session_id: Mapped[int] = mapped_column(ForeignKey('sessions.id'), index=True)
+    # Copied from the session so the history can be paged by candidate without a join
+    candidate: Mapped[str] = mapped_column(String(200))
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+    question: Mapped[str] = mapped_column(Text)
+    category: Mapped[Optional[str]] = mapped_column(String(50))
+    transcript: Mapped[str] = mapped_column(Text, default='')
+    word_count: Mapped[int] = mapped_column(Integer, default=0)
+    dominant_emotion: Mapped[Optional[str]] = mapped_column(String(20))
+    skill_coverage: Mapped[Optional[float]] = mapped_column(Float)
+
+    session: Mapped[InterviewSession] = relationship(back_populates='answers', lazy='raise')
+    stage_results: Mapped[List['StageResult']] = relationship(back_populates='answer', lazy='raise')
+
+    __table_args__ = (
+        Index('answers_candidate_created', 'candidate', 'created_at'),
+        Index('answers_created', 'created_at'),
+    )
+
+
+class StageResult(Base):
+    __tablename__ = 'stage_results'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    answer_id: Mapped[int] = mapped_column(ForeignKey('answers.id'), index=True)
+    stage: Mapped[str] = mapped_column(String(50))
+    # Stored as text so numpy values in the results can be serialized
+    result: Mapped[str] = mapped_column(Text)
+
+    answer: Mapped[Answer] = relationship(back_populates='stage_results', lazy='raise')
+
+
+class HistoryStore:
+    def __init__(self, url: str = f"sqlite:///{DEFAULT_HISTORY_PATH}"):
+        """
+        Append-only interview history: sessions, answered questions with their transcripts,
+        and the per-stage results of every answer. Listing reads only the answers table;
+        stage results are loaded one answer at a time.
+        Args:
+            url: SQLAlchemy database URL
+        """
+        if url.startswith('sqlite:///'):
+            os.makedirs(os.path.dirname(os.path.abspath(url[len('sqlite:///'):])), exist_ok=True)
+        self.engine = create_engine(url)
+        if self.engine.dialect.name == 'sqlite':
+            event.listen(self.engine, 'connect', self._configure_sqlite)
+        Base.metadata.create_all(self.engine)
+        self._sessions = sessionmaker(self.engine, expire_on_commit=False)
+
+    @staticmethod
+    def _configure_sqlite(dbapi_connection, connection_record):
+        # WAL lets the history view read while an answer is being written
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    def start_session(self, candidate: str, skills: Optional[List[str]] = None) -> int:
+        """
+        Record the start of an interview.
+        Args:
+            candidate: Candidate name
+            skills: Skills taken from the candidate's resume
+        Returns:
+            Session id
+        """
+        with self._sessions.begin() as session:
+            interview = InterviewSession(candidate=candidate, skills=list(skills or []))
+            session.add(interview)
+            session.flush()
+            return interview.id
+
+    def add_answer(self, session_id: int, question: Dict, analysis: Dict) -> int:
+        """
+        Store an answer and its per-stage results.
+        Args:
+            session_id: Session the answer belongs to
+            question: Question dictionary ('question', 'category')
+            analysis: Result of analyze_response
+        Returns:
+            Answer id
+        """
+        emotion = analysis.get('emotion_analysis') or {}
+        evaluation = analysis.get('answer_evaluation') or {}
+        transcript = analysis.get('transcription') or ''
+        with self._sessions.begin() as session:
+            interview = session.get(InterviewSession, session_id)
+            if interview is None:
+                raise ValueError(f"Unknown interview session: {session_id}")
+            answer = Answer(
+                session_id=session_id,
+                candidate=interview.candidate,
+                question=question.get('question', ''),
+                category=question.get('category'),
+                transcript=transcript,
+                word_count=len(transcript.split()),
+                dominant_emotion=emotion.get('dominant_emotion'),
+                skill_coverage=evaluation.get('skill_coverage')
+            )
+            session.add(answer)
+            session.flush()
+            session.add_all([
+                StageResult(answer_id=answer.id, stage=key,
+                            result=json.dumps(analysis[key], ensure_ascii=False, default=json_default))
+                for key in STAGE_KEYS if key in analysis
+            ])
+            return answer.id
+
+    def count_answers(self, candidate: Optional[str] = None) -> int:
+        """Number of recorded answers, optionally for one candidate."""
+        query = select(func.count(Answer.id))
+        if candidate:
+            query = query.where(Answer.candidate == candidate)
+        with self._sessions() as session:
+            return session.scalar(query)
+
+    def list_answers(self, candidate: Optional[str] = None, page: int = 0, page_size: int = 10) -> List[Dict]:
+        """
+        One page of answers, newest first, without their stage results.
+        Args:
+            candidate: Only this candidate's answers (None for all)
+            page: Page number starting at 0
+            page_size: Answers per page
+        Returns:
+            List of answer summaries
+        """
+        query = select(Answer).order_by(Answer.created_at.desc(), Answer.id.desc())
+        if candidate:
+            query = query.where(Answer.candidate == candidate)
+        query = query.offset(max(page, 0) * page_size).limit(page_size)
+        with self._sessions() as session:
+            return [
+                {
+                    'id': answer.id,
+                    'session_id': answer.session_id,
+                    'candidate': answer.candidate,
+                    'created_at': answer.created_at,
+                    'question': answer.question,
+                    'category': answer.category,
+                    'transcript': answer.transcript,
+                    'word_count': answer.word_count,
+                    'dominant_emotion': answer.dominant_emotion,
+                    'skill_coverage': answer.skill_coverage
+                }
+                for answer in session.scalars(query)
+            ]
+
+    def get_stage_results(self, answer_id: int) -> Dict[str, Dict]:
+        """All stored stage results of one answer, by analysis key."""
+        query = select(StageResult.stage, StageResult.result).where(StageResult.answer_id == answer_id)
+        with self._sessions() as session:
+            return {stage: json.loads(result) for stage, result in session.execute(query)}
+
+    def candidates(self) -> List[str]:
+        """Candidates with at least one session, alphabetically."""
+        with self._sessions() as session:
+            return list(session.scalars(select(InterviewSession.candidate).distinct().order_by(InterviewSession.candidate)))
+
+    def list_sessions(self, candidate: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """Most recent sessions with their answer counts."""
+        query = (select(InterviewSession, func.count(Answer.id))
+                 .outerjoin(Answer, Answer.session_id == InterviewSession.id)
+                 .group_by(InterviewSession.id)
+                 .order_by(InterviewSession.started_at.desc())
+                 .limit(limit))
+        if candidate:
+            query = query.where(InterviewSession.candidate == candidate)
+        with self._sessions() as session:
+            return [
+                {'id': interview.id, 'candidate': interview.candidate, 'started_at': interview.started_at,
+                 'skills': interview.skills, 'answers': count}
+                for interview, count in session.execute(query)
+            ]
+
+
+_default_history = None
+_default_history_lock = threading.Lock()
+
+
+def default_history() -> Optional[HistoryStore]:
+    """
+    Process-wide history store configured from the environment:
+    INTERVIEW_HISTORY=0 disables it, INTERVIEW_HISTORY_URL overrides the SQLite file.
+    """
+    global _default_history
+    if os.environ.get('INTERVIEW_HISTORY', '1') == '0':
+        return None
+    with _default_history_lock:
+        if _default_history is None:
+            try:
+                _default_history = HistoryStore(os.environ.get('INTERVIEW_HISTORY_URL', f"sqlite:///{DEFAULT_HISTORY_PATH}"))
+            except Exception as e:
+                print(f"History store not available: {str(e)}")
+                return None
+        return _default_history
@@ -1,6 +1,24 @@
-from typing import List, Dict
+from functools import lru_cache
+from typing import FrozenSet, List, Dict, Optional, Sequence
 import random
 
+@lru_cache(maxsize=4096)
+def _skill_categories(skill: str) -> FrozenSet[str]:
+    """
+    General categories of one lowercased skill, by keyword. Skills repeat across
+    candidates, so results are cached (bounded, shared by every InterviewBot).
+    """
+    categories = set()
+    if any(word in skill for word in ['lead', 'manage', 'team']):
+        categories.add('leadership')
+    if any(word in skill for word in ['solve', 'debug', 'optimize']):
+        categories.add('problem_solving')
+    if any(word in skill for word in ['communicate', 'present', 'write']):
+        categories.add('communication')
+    if any(word in skill for word in ['program', 'code', 'develop', 'design']):
+        categories.add('technical')
+    return frozenset(categories)
+
 class InterviewBot:
     def __init__(self):
         # Common interview questions by category
@@ -52,71 +70,100 @@ class InterviewBot:
                 "implementaste una funcionalidad compleja"
             ]
         }
+        self._build_index()
+
+    def _build_index(self):
+        """
+        Precompute every question per skill category: for each scenario, the question text
+        of each (question category, template) pair.
+        """
+        self._question_index = {}
+        for skill_category, scenarios in self.skill_scenarios.items():
+            self._question_index[skill_category] = [
+                (scenario, [(category, template.format(scenario=scenario))
+                            for category, templates in self.question_templates.items()
+                            for template in templates])
+                for scenario in scenarios
+            ]
 
-    def generate_questions(self, skills: List[str], num_questions: int = 5) -> List[Dict]:
+    def generate_questions(self, skills: List[str], num_questions: int = 5,
+                           seed: Optional[int] = None) -> List[Dict]:
         """
         Generate interview questions based on skills.
+        Every question uses a different scenario while unused scenarios remain; after that,
+        scenarios are reused with another question category or template. Questions are never
+        repeated, so at most the number of distinct questions is returned.
         Args:
             skills: List of skills from resume
             num_questions: Number of questions to generate
+            seed: Seed for reproducible questions (None uses the global random state)
         Returns:
             List of questions with their categories and context
         """
+        rng = random.Random(seed) if seed is not None else random
+        return self._sample_questions(self._categorize_skills(skills), num_questions, rng)
+
+    def generate_question_sets(self, candidate_skills: Sequence[List[str]], num_questions: int = 5,
+                               seed: int = 0) -> List[List[Dict]]:
+        """
+        Generate question sets for many candidates at once.
+        Each candidate gets its own random stream derived from the seed and its position,
+        so a set does not depend on the other candidates in the batch.
+        Args:
+            candidate_skills: Skills of each candidate
+            num_questions: Questions per candidate
+            seed: Seed of the batch
+        Returns:
+            One list of questions per candidate, in input order
+        """
+        return [
+            self._sample_questions(self._categorize_skills(skills), num_questions, random.Random(f"{seed}:{i}"))
+            for i, skills in enumerate(candidate_skills)
+        ]
+
+    def _sample_questions(self, skill_categories: List[str], num_questions: int, rng) -> List[Dict]:
+        """Draw questions without replacement from the index entries of the given skill categories."""
+        # Without a matching category, ask about every category rather than nothing
+        skill_categories = [c for c in skill_categories if c in self._question_index] or list(self._question_index)
+        entries = []
+        seen = set()
+        for skill_category in skill_categories:
+            for scenario, variants in self._question_index[skill_category]:
+                if scenario not in seen:
+                    seen.add(scenario)
+                    entries.append((scenario, variants))
+
+        # One question per scenario first, in random order
+        picked = rng.sample(range(len(entries)), min(num_questions, len(entries)))
+        choices = [(i, rng.randrange(len(entries[i][1]))) for i in picked]
+
+        # Then the remaining (scenario, category, template) combinations
+        if num_questions > len(choices):
+            used = set(choices)
+            remaining = [(i, j) for i, (_, variants) in enumerate(entries) for j in range(len(variants))
+                         if (i, j) not in used]
+            choices += rng.sample(remaining, min(num_questions - len(choices), len(remaining)))
+
         questions = []
-        used_scenarios = set()
-        
-        # Map skills to question categories
-        skill_categories = self._categorize_skills(skills)
-        
-        while len(questions) < num_questions:
-            # Select a random category
-            category = random.choice(list(self.question_templates.keys()))
-            
-            # Get relevant scenarios for the skills
-            relevant_scenarios = []
-            for skill_category in skill_categories:
-                if skill_category in self.skill_scenarios:
-                    relevant_scenarios.extend(self.skill_scenarios[skill_category])
-            
-            if not relevant_scenarios:
-                continue
-                
-            # Select a random scenario
-            scenario = random.choice(relevant_scenarios)
-            if scenario in used_scenarios:
-                continue
-                
-            used_scenarios.add(scenario)
-            
-            # Generate question
-            template = random.choice(self.question_templates[category])
-            question = template.format(scenario=scenario)
-            
+        for i, j in choices:
+            scenario, variants = entries[i]
+            category, question = variants[j]
             questions.append({
                 'question': question,
                 'category': category,
                 'context': scenario
             })
-        
         return questions
 
     def _categorize_skills(self, skills: List[str]) -> List[str]:
-        """Categorize skills into general categories."""
+        """Categorize skills into general categories (in skill_scenarios order, so seeded output is stable)."""
         categories = set()
         
         # Simple categorization based on keywords
         for skill in skills:
-            skill = skill.lower()
-            if any(word in skill for word in ['lead', 'manage', 'team']):
-                categories.add('leadership')
-            if any(word in skill for word in ['solve', 'debug', 'optimize']):
-                categories.add('problem_solving')
-            if any(word in skill for word in ['communicate', 'present', 'write']):
-                categories.add('communication')
-            if any(word in skill for word in ['program', 'code', 'develop', 'design']):
-                categories.add('technical')
+            categories |= _skill_categories(skill.lower())
         
-        return list(categories)
+        return [category for category in self.skill_scenarios if category in categories]
 
     def evaluate_answer(self, question: Dict, answer: str, skills: List[str]) -> Dict:
         """
@@ -0,0 +1,203 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+def current_rss() -> int:
+    """Return the resident set size of this process in bytes (0 if unknown)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return 0
+
+
+class ModelRegistry:
+    def __init__(self):
+        """Process-wide registry loading each heavy model once, on first use."""
+        self._loaders = {}
+        self._models = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._warmup_thread = None
+        self._eviction_thread = None
+        self._eviction_stop = threading.Event()
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        """
+        Register a loader for a model; nothing is loaded until the model is requested.
+        Args:
+            name: Unique model name (include parameters such as model size)
+            loader: Callable returning the loaded model
+        """
+        with self._lock:
+            if name not in self._loaders:
+                self._loaders[name] = loader
+                self._load_locks[name] = threading.Lock()
+                self._stats[name] = {
+                    'loaded': False,
+                    'load_seconds': None,
+                    'rss_bytes': None,
+                    'loads': 0,
+                    'uses': 0,
+                    'last_used': None
+                }
+
+    def get(self, name: str, loader: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        Return a model, loading it the first time it is requested.
+        Args:
+            name: Registered model name
+            loader: Loader to register if the name is not registered yet
+        Returns:
+            The loaded model
+        """
+        if loader is not None:
+            self.register(name, loader)
+
+        with self._lock:
+            if name not in self._loaders:
+                raise KeyError(f"Model not registered: {name}")
+            if name in self._models:
+                return self._touch(name)
+            load_lock = self._load_locks[name]
+
+        # Only one thread loads a given model; the others wait for it
+        with load_lock:
+            with self._lock:
+                if name in self._models:
+                    return self._touch(name)
+                loader = self._loaders[name]
+
+            rss_before = current_rss()
+            start = time.perf_counter()
+            model = loader()
+            load_seconds = time.perf_counter() - start
+            rss_delta = max(0, current_rss() - rss_before)
+
+            with self._lock:
+                self._models[name] = model
+                stats = self._stats[name]
+                stats['loaded'] = True
+                stats['load_seconds'] = load_seconds
+                stats['rss_bytes'] = rss_delta
+                stats['loads'] += 1
+                print(f"Loaded model {name} in {load_seconds:.2f}s (+{rss_delta / 2**20:.0f} MB)")
+                return self._touch(name)
+
+    def is_loaded(self, name: str) -> bool:
+        """True if the model is currently in memory."""
+        with self._lock:
+            return name in self._models
+
+    def warm_up(self, names: Optional[Iterable[str]] = None, background: bool = False) -> Optional[threading.Thread]:
+        """
+        Load models ahead of their first use.
+        Args:
+            names: Models to load (all registered models by default)
+            background: Load in a daemon thread instead of blocking
+        Returns:
+            The warm-up thread when loading in the background
+        """
+        with self._lock:
+            names = list(names) if names is not None else list(self._loaders)
+
+        def load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"Error warming up model {name}: {str(e)}")
+
+        if not background:
+            load_all()
+            return None
+
+        with self._lock:
+            if self._warmup_thread is not None and self._warmup_thread.is_alive():
+                return self._warmup_thread
+            self._warmup_thread = threading.Thread(target=load_all, name="model-warmup", daemon=True)
+            self._warmup_thread.start()
+            return self._warmup_thread
+
+    def evict(self, name: str) -> bool:
+        """
+        Drop a loaded model; it is reloaded on next use.
+        Returns:
+            True if the model was loaded
+        """
+        with self._lock:
+            if self._models.pop(name, None) is None:
+                return False
+            self._stats[name]['loaded'] = False
+            print(f"Evicted model {name}")
+            return True
+
+    def evict_idle(self, max_idle_seconds: float) -> list:
+        """
+        Drop models that have not been used recently.
+        Args:
+            max_idle_seconds: Idle time after which a model is evicted
+        Returns:
+            Names of the evicted models
+        """
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                name for name in self._models
+                if now - self._stats[name]['last_used'] > max_idle_seconds
+            ]
+        return [name for name in idle if self.evict(name)]
+
+    def start_eviction(self, max_idle_seconds: float, interval: float = 60.0):
+        """
+        Periodically evict idle models in a daemon thread.
+        Args:
+            max_idle_seconds: Idle time after which a model is evicted
+            interval: Seconds between checks
+        """
+        with self._lock:
+            if self._eviction_thread is not None and self._eviction_thread.is_alive():
+                return
+            self._eviction_stop.clear()
+
+            def run():
+                while not self._eviction_stop.wait(interval):
+                    self.evict_idle(max_idle_seconds)
+
+            self._eviction_thread = threading.Thread(target=run, name="model-eviction", daemon=True)
+            self._eviction_thread.start()
+
+    def stop_eviction(self):
+        """Stop the idle eviction thread."""
+        self._eviction_stop.set()
+
+    def stats(self) -> Dict[str, Dict]:
+        """Return load time, resident memory and usage counters per model."""
+        now = time.monotonic()
+        with self._lock:
+            result = {}
+            for name, stats in self._stats.items():
+                stats = dict(stats)
+                last_used = stats.pop('last_used')
+                stats['idle_seconds'] = now - last_used if last_used is not None else None
+                result[name] = stats
+            return result
+
+    def _touch(self, name: str) -> Any:
+        """Record a use of a loaded model; caller holds the lock."""
+        stats = self._stats[name]
+        stats['uses'] += 1
+        stats['last_used'] = time.monotonic()
+        return self._models[name]
+
+
+# Shared by every analyzer in the process
+registry = ModelRegistry()
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "self_interview", "results.sqlite3")
+
+
+def hash_file(path: str, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_buffer(data) -> str:
+    """Return the SHA-256 of any contiguous buffer (bytes, numpy array) without copying it."""
+    return hashlib.sha256(memoryview(data)).hexdigest()
+
+
+def json_default(value):
+    """json.dumps default for analysis results: numpy scalars and arrays, anything else as text."""
+    import numpy as np
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+class ResultCache:
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = 512 * 2**20,
+                 max_entries: Optional[int] = None, timeout: float = 30.0):
+        """
+        Disk-backed, size-bounded LRU cache for analysis results, stored in SQLite.
+        Safe to share between threads and between worker processes.
+        Args:
+            path: SQLite database file
+            max_bytes: Maximum total size of the stored values
+            max_entries: Maximum number of entries (None for no limit)
+            timeout: Seconds to wait for another process holding the write lock
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO counters VALUES ('hits', 0), ('misses', 0), ('evictions', 0)")
+
+    @staticmethod
+    def make_key(namespace: str, content_hash: str, params: Optional[Dict] = None) -> str:
+        """
+        Build a cache key from the input's content hash and everything that affects the result.
+        Args:
+            namespace: Kind of result (e.g. 'resume', 'transcription')
+            content_hash: Hash of the input content
+            params: Model name/version and parameters used to compute the result
+        Returns:
+            Hex key
+        """
+        material = json.dumps([namespace, content_hash, params or {}], sort_keys=True, default=str)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None on a miss."""
+        with self._transaction() as conn:
+            row = conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                conn.execute("UPDATE counters SET value = value + 1 WHERE name = 'misses'")
+            else:
+                conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+                conn.execute("UPDATE counters SET value = value + 1 WHERE name = 'hits'")
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, key: str, value: Any):
+        """Store a JSON-serializable value and evict least recently used entries over the limits."""
+        payload = json.dumps(value)
+        size = len(payload.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, size, now, now)
+            )
+            self._evict(conn)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and the current entry count and size."""
+        conn = self._connection()
+        counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        counters.update({'entries': entries, 'bytes': total})
+        return counters
+
+    def clear(self):
+        """Remove every entry and reset the counters."""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM entries")
+            conn.execute("UPDATE counters SET value = 0")
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Delete least recently used entries until the size and count limits hold."""
+        entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        evicted = 0
+        while total > self.max_bytes or (self.max_entries is not None and entries > self.max_entries):
+            row = conn.execute("SELECT key, size FROM entries ORDER BY last_access LIMIT 1").fetchone()
+            if row is None:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (row[0],))
+            entries -= 1
+            total -= row[1]
+            evicted += 1
+        if evicted:
+            conn.execute("UPDATE counters SET value = value + ? WHERE name = 'evictions'", (evicted,))
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Run statements in one transaction holding the write lock from the start,
+        so concurrent processes queue on busy_timeout instead of failing to upgrade.
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread and process (connections must not cross a fork)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def default_cache() -> Optional[ResultCache]:
+    """
+    Process-wide cache configured from the environment:
+    INTERVIEW_CACHE=0 disables it, INTERVIEW_CACHE_PATH and INTERVIEW_CACHE_MAX_MB override the defaults.
+    """
+    global _default_cache
+    if os.environ.get('INTERVIEW_CACHE', '1') == '0':
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            try:
+                _default_cache = ResultCache(
+                    os.environ.get('INTERVIEW_CACHE_PATH', DEFAULT_CACHE_PATH),
+                    max_bytes=int(float(os.environ.get('INTERVIEW_CACHE_MAX_MB', 512)) * 2**20)
+                )
+            except Exception as e:
+                print(f"Result cache not available: {str(e)}")
+                return None
+        return _default_cache
@@ -1,17 +1,127 @@
 from pdfminer.high_level import extract_text
 import spacy
+from spacy.matcher import PhraseMatcher
+from spacy.util import filter_spans
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import glob
+import importlib.metadata
+import json
 import os
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from model_registry import registry
+from result_cache import ResultCache, hash_file
 
-class ResumeParser:
-    def __init__(self):
-        """Initialize the resume parser with spaCy model."""
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "skills_taxonomy.json")
+SPACY_MODEL = "en_core_web_sm"
+SPACY_FALLBACK_MODEL = "es_core_news_sm"
+
+def load_spacy_pipeline():
+    """Load the spaCy pipeline, downloading the Spanish model as a fallback."""
+    try:
+        return spacy.load(SPACY_MODEL)
+    except OSError:
+        print("Downloading spaCy model...")
+        os.system(f"python -m spacy download {SPACY_FALLBACK_MODEL}")
+        return spacy.load(SPACY_FALLBACK_MODEL)
+
+def spacy_model_version() -> str:
+    """Identify the installed spaCy model without loading it (used in cache keys)."""
+    for name in (SPACY_MODEL, SPACY_FALLBACK_MODEL):
         try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            print("Downloading spaCy model...")
-            os.system("python -m spacy download es_core_news_sm")
-            self.nlp = spacy.load("es_core_news_sm")
+            return f"{name}=={importlib.metadata.version(name.replace('_', '-'))}"
+        except importlib.metadata.PackageNotFoundError:
+            continue
+    return f"spacy=={spacy.__version__}"
+
+def extract_pdf_text(pdf_path: str) -> str:
+    """Extract text from a PDF; runs in worker processes during bulk ingestion."""
+    return extract_text(pdf_path)
+
+def iter_resume_paths(source: Union[str, Iterable[str]]) -> Iterator[str]:
+    """Yield PDF paths from a directory (recursively) or an iterable of paths."""
+    if isinstance(source, str):
+        if os.path.isdir(source):
+            yield from sorted(glob.glob(os.path.join(source, "**", "*.pdf"), recursive=True))
+        else:
+            yield source
+    else:
+        yield from source
+
+class SkillGazetteer:
+    def __init__(self, nlp, taxonomy_path: str = DEFAULT_TAXONOMY_PATH):
+        """
+        Compile a skill taxonomy into token-level phrase matchers.
+        Only the pipeline's tokenizer is used, both for the patterns and for the text.
+        Args:
+            nlp: spaCy pipeline providing the vocabulary and tokenizer
+            taxonomy_path: JSON file with {"skills": [{"name", "aliases", "exact"}]} entries
+        """
+        self.nlp = nlp
+        with open(taxonomy_path, encoding="utf-8") as f:
+            taxonomy = json.load(f)
+
+        # Aliases match case-insensitively; 'exact' forms are for names that are also common words
+        self.matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+        self.exact_matcher = PhraseMatcher(nlp.vocab, attr="ORTH")
+        self.size = 0
+        owners = {}
+        for entry in taxonomy["skills"]:
+            name = entry["name"]
+            exact = entry.get("exact", [])
+            terms = list(entry.get("aliases", [])) + ([] if exact else [name])
+            patterns = list(nlp.tokenizer.pipe(terms))
+            exact_patterns = list(nlp.tokenizer.pipe(exact))
+            # A surface form under two skills would give two identical spans, and
+            # filter_spans would keep either one
+            for pattern in patterns + exact_patterns:
+                key = tuple(token.lower_ for token in pattern)
+                owner = owners.setdefault(key, name)
+                if owner != name:
+                    raise ValueError(f"Skill term '{pattern.text}' is listed under both '{owner}' and '{name}'")
+            if patterns:
+                self.matcher.add(name, patterns)
+            if exact_patterns:
+                self.exact_matcher.add(name, exact_patterns)
+            self.size += 1
+
+    def extract(self, doc) -> List[str]:
+        """
+        Find the canonical skills mentioned in a text.
+        Args:
+            doc: Text or tokenized spaCy Doc
+        Returns:
+            Sorted list of canonical skill names
+        """
+        if isinstance(doc, str):
+            doc = self.nlp.make_doc(doc)
+        matches = self.matcher(doc, as_spans=True) + self.exact_matcher(doc, as_spans=True)
+        # Keep the longest match where matches overlap ("machine learning" over "learning")
+        return sorted({span.label_ for span in filter_spans(matches)})
+
+class ResumeParser:
+    def __init__(self, taxonomy_path: str = DEFAULT_TAXONOMY_PATH, cache: Optional[ResultCache] = None):
+        """
+        Initialize the resume parser; the spaCy model and skill gazetteer are loaded on first use.
+        Args:
+            taxonomy_path: JSON skill taxonomy compiled into the gazetteer
+            cache: Optional result cache for analyze_resume
+        """
+        self.taxonomy_path = taxonomy_path
+        self.cache = cache
+        self._taxonomy_hash = None
+        self.gazetteer_name = f"skill_gazetteer:{taxonomy_path}"
+        registry.register("spacy", load_spacy_pipeline)
+        registry.register(self.gazetteer_name, lambda: SkillGazetteer(self.nlp, taxonomy_path))
+
+    @property
+    def nlp(self):
+        """Shared spaCy pipeline from the model registry."""
+        return registry.get("spacy")
+
+    @property
+    def gazetteer(self) -> SkillGazetteer:
+        """Shared compiled skill gazetteer from the model registry."""
+        return registry.get(self.gazetteer_name)
 
     def extract_resume_text(self, pdf_path: str) -> Optional[str]:
         """
@@ -36,37 +146,8 @@ class ResumeParser:
         Returns:
             List of extracted skills
         """
-        # Common technical skills to look for
-        technical_skills = [
-            "python", "java", "javascript", "c++", "c#", "ruby", "php",
-            "html", "css", "react", "angular", "vue", "node.js", "django",
-            "flask", "spring", "sql", "nosql", "mongodb", "postgresql",
-            "aws", "azure", "gcp", "docker", "kubernetes", "git", "agile",
-            "scrum", "machine learning", "ai", "data science", "big data",
-            "tensorflow", "pytorch", "pandas", "numpy", "scikit-learn",
-            "devops", "ci/cd", "jenkins", "ansible", "terraform",
-            "rest api", "graphql", "microservices", "cloud computing",
-            "linux", "unix", "bash", "shell scripting", "networking",
-            "security", "cybersecurity", "blockchain", "web development",
-            "mobile development", "ios", "android", "swift", "kotlin"
-        ]
-        
-        # Extract named entities
-        doc = self.nlp(text)
-        entities = [ent.text.lower() for ent in doc.ents]
-        
-        # Find skills from predefined list
-        found_skills = []
-        for skill in technical_skills:
-            if skill in text.lower():
-                found_skills.append(skill)
-        
-        # Add any additional skills found in entities
-        for entity in entities:
-            if entity not in found_skills and len(entity) > 2:
-                found_skills.append(entity)
-        
-        return list(set(found_skills))
+        # Tokenizer only: the tagger, parser and NER are not needed for gazetteer matching
+        return self.gazetteer.extract(self.nlp.make_doc(text))
 
     def analyze_resume(self, pdf_path: str) -> Optional[Dict]:
         """
@@ -76,11 +157,67 @@ class ResumeParser:
         Returns:
             Dictionary containing analysis results or None if analysis fails
         """
+        cache_key = self._cache_key(pdf_path) if self.cache else None
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         text = self.extract_resume_text(pdf_path)
         if text:
             skills = self.extract_skills(text)
-            return {
+            result = {
                 "text": text,
                 "skills": skills
             }
-        return None
\ No newline at end of file
+            if cache_key:
+                self.cache.put(cache_key, result)
+            return result
+        return None
+
+    def _cache_key(self, pdf_path: str) -> Optional[str]:
+        """Cache key from the PDF content, spaCy model version and skill taxonomy."""
+        try:
+            if self._taxonomy_hash is None:
+                self._taxonomy_hash = hash_file(self.taxonomy_path)
+            return ResultCache.make_key('resume', hash_file(pdf_path), {
+                'spacy_model': spacy_model_version(),
+                'taxonomy': self._taxonomy_hash
+            })
+        except OSError as e:
+            print(f"Error hashing resume for cache: {str(e)}")
+            return None
+
+    def analyze_resumes(self, source: Union[str, Iterable[str]], workers: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Analyze many resumes, streaming results as they finish.
+        PDF text extraction runs in a process pool; each text is tokenized and matched
+        as soon as its extraction completes, so results are not held back by a batch.
+        Args:
+            source: Directory of PDFs or an iterable of PDF paths
+            workers: Processes used for PDF extraction (defaults to the CPU count)
+        Returns:
+            Iterator of {'path', 'text', 'skills'} dictionaries; failed documents are
+            reported as {'path', 'text': None, 'skills': [], 'error'} without stopping the batch
+        """
+        paths = list(iter_resume_paths(source))
+        if not paths:
+            return
+
+        # Only the tokenizer is needed: the gazetteer matches on token attributes
+        nlp = self.nlp
+        gazetteer = self.gazetteer
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(extract_pdf_text, path): path for path in paths}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    text = future.result()
+                except Exception as e:
+                    yield {'path': path, 'text': None, 'skills': [], 'error': str(e)}
+                    continue
+                if not text or not text.strip():
+                    yield {'path': path, 'text': None, 'skills': [], 'error': 'No text extracted'}
+                    continue
+                yield {'path': path, 'text': text, 'skills': gazetteer.extract(nlp.make_doc(text))}
@@ -0,0 +1,74 @@
+import os
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "samples")
+# Five consecutive sentences of a public-domain LibriVox reading of Sense and Sensibility
+# (16 kHz mono) and their lowercase transcript
+REFERENCE_SPEECH_PATH = os.path.join(SAMPLES_DIR, "reference_speech.flac")
+REFERENCE_TRANSCRIPT_PATH = os.path.join(SAMPLES_DIR, "reference_speech.txt")
+
+
+def reference_speech() -> Tuple[str, str]:
+    """
+    Recorded speech clip shipped with the project, for timing and scoring transcription.
+    Returns:
+        (path of the recording, its transcript)
+    """
+    with open(REFERENCE_TRANSCRIPT_PATH, encoding="utf-8") as f:
+        return REFERENCE_SPEECH_PATH, f.read().strip()
+
+
+def synthetic_frames(num_frames: int = 120, size: tuple = (640, 480), seed: int = 0) -> List[np.ndarray]:
+    """
+    Generate deterministic face-like BGR frames (a shaded ellipse with eyes and mouth).
+    Args:
+        num_frames: Number of frames to generate
+        size: Frame (width, height)
+        seed: Random seed for the per-frame jitter
+    Returns:
+        List of BGR frames
+    """
+    rng = np.random.default_rng(seed)
+    width, height = size
+    frames = []
+    for _ in range(num_frames):
+        frame = np.full((height, width, 3), 90, dtype=np.uint8)
+        cx = width // 2 + int(rng.integers(-10, 11))
+        cy = height // 2 + int(rng.integers(-10, 11))
+        cv2.ellipse(frame, (cx, cy), (90, 120), 0, 0, 360, (150, 180, 210), -1)
+        cv2.circle(frame, (cx - 35, cy - 30), 10, (40, 40, 40), -1)
+        cv2.circle(frame, (cx + 35, cy - 30), 10, (40, 40, 40), -1)
+        cv2.ellipse(frame, (cx, cy + 45), (35, 12), 0, 0, 180, (60, 60, 140), 4)
+        frames.append(frame)
+    return frames
+
+
+def synthetic_speech(duration: float, sample_rate: int = 16000, seed: int = 0) -> np.ndarray:
+    """
+    Generate a deterministic speech-like signal: voiced syllables with a drifting
+    pitch and formant-like harmonics, separated by short pauses.
+    Args:
+        duration: Length in seconds
+        sample_rate: Sample rate
+        seed: Random seed for syllable lengths and pitch contour
+    Returns:
+        Mono float32 samples in [-1, 1]
+    """
+    rng = np.random.default_rng(seed)
+    total = int(duration * sample_rate)
+    audio = np.zeros(total, dtype=np.float32)
+    pos = 0
+    while pos < total:
+        length = int(rng.uniform(0.12, 0.35) * sample_rate)
+        t = np.arange(min(length, total - pos)) / sample_rate
+        f0 = rng.uniform(100, 220) * (1 + 0.1 * np.sin(2 * np.pi * rng.uniform(1, 4) * t))
+        phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+        syllable = sum(np.sin(k * phase) / k for k in range(1, 8))
+        envelope = np.sin(np.pi * np.arange(len(t)) / max(len(t), 1))
+        audio[pos:pos + len(t)] = 0.2 * envelope * syllable
+        pos += len(t) + int(rng.uniform(0.05, 0.4) * sample_rate)
+    audio += 0.003 * rng.standard_normal(total).astype(np.float32)
+    return audio
@@ -1,28 +1,139 @@
 from faster_whisper import WhisperModel
+import faster_whisper
+import asyncio
 import os
-from typing import Dict, Optional
+import queue
+import threading
+from typing import AsyncIterator, Dict, Iterable, Iterator, Optional, Union
+
+import numpy as np
+from audio_buffer import AudioBuffer, resample_to
+from model_registry import registry
+from result_cache import ResultCache, hash_buffer, hash_file
+from word_timeline import WordTimeline
+
+WHISPER_SAMPLE_RATE = 16000
+
+class WhisperConfig:
+    def __init__(self, model_size: str = "base", compute_type: str = "int8", beam_size: int = 5,
+                 cpu_threads: int = 0, num_workers: int = 1, language: Optional[str] = None,
+                 device: str = "cpu"):
+        """
+        Whisper model and decoding settings.
+        Args:
+            model_size: Size of the Whisper model ("tiny", "base", "small", "medium", "large-v3", ...)
+            compute_type: CTranslate2 compute type ("int8", "int8_float32", "float32", ...)
+            beam_size: Beam size used for decoding (1 for greedy)
+            cpu_threads: Threads per model worker (0 lets CTranslate2 decide)
+            num_workers: Model workers, i.e. transcriptions that can run in parallel
+            language: Language code to pin, or None to detect it per recording
+            device: "cpu", "cuda" or "auto"
+        """
+        self.model_size = model_size
+        self.compute_type = compute_type
+        self.beam_size = beam_size
+        self.cpu_threads = cpu_threads
+        self.num_workers = num_workers
+        self.language = language
+        self.device = device
+
+    @classmethod
+    def from_env(cls, **defaults) -> 'WhisperConfig':
+        """
+        Build a configuration from INTERVIEW_WHISPER_MODEL, INTERVIEW_WHISPER_COMPUTE_TYPE,
+        INTERVIEW_WHISPER_BEAM_SIZE, INTERVIEW_WHISPER_CPU_THREADS, INTERVIEW_WHISPER_NUM_WORKERS,
+        INTERVIEW_WHISPER_LANGUAGE and INTERVIEW_WHISPER_DEVICE, falling back to the given defaults.
+        """
+        config = cls(**defaults)
+        env = os.environ
+        config.model_size = env.get('INTERVIEW_WHISPER_MODEL', config.model_size)
+        config.compute_type = env.get('INTERVIEW_WHISPER_COMPUTE_TYPE', config.compute_type)
+        config.beam_size = int(env.get('INTERVIEW_WHISPER_BEAM_SIZE', config.beam_size))
+        config.cpu_threads = int(env.get('INTERVIEW_WHISPER_CPU_THREADS', config.cpu_threads))
+        config.num_workers = int(env.get('INTERVIEW_WHISPER_NUM_WORKERS', config.num_workers))
+        config.language = env.get('INTERVIEW_WHISPER_LANGUAGE', config.language) or None
+        config.device = env.get('INTERVIEW_WHISPER_DEVICE', config.device)
+        return config
+
+    @property
+    def model_name(self) -> str:
+        """Registry name: one loaded model per size, device, compute type and thread layout."""
+        return (f"whisper:{self.model_size}:{self.device}:{self.compute_type}"
+                f":threads={self.cpu_threads}:workers={self.num_workers}")
+
+    def load_model(self) -> WhisperModel:
+        """Load the Whisper model described by this configuration."""
+        return WhisperModel(
+            self.model_size,
+            device=self.device,
+            compute_type=self.compute_type,
+            cpu_threads=self.cpu_threads,
+            num_workers=self.num_workers
+        )
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable settings."""
+        return {
+            'model_size': self.model_size,
+            'compute_type': self.compute_type,
+            'beam_size': self.beam_size,
+            'cpu_threads': self.cpu_threads,
+            'num_workers': self.num_workers,
+            'language': self.language,
+            'device': self.device
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'WhisperConfig':
+        """Rebuild a configuration from to_dict output."""
+        return cls(**data)
+
+    def __repr__(self) -> str:
+        return f"WhisperConfig({', '.join(f'{k}={v!r}' for k, v in self.to_dict().items())})"
+
 
 class SpeechToText:
-    def __init__(self, model_size: str = "base"):
+    def __init__(self, model_size: str = "base", beam_size: int = 5, cache: Optional[ResultCache] = None,
+                 config: Optional[WhisperConfig] = None):
         """
         Initialize the speech-to-text converter.
         Args:
             model_size: Size of the Whisper model ("tiny", "base", "small", "medium", "large")
+            beam_size: Beam size used for decoding
+            cache: Optional result cache for transcribe
+            config: Full Whisper configuration; overrides model_size and beam_size
         """
+        self.config = config or WhisperConfig(model_size=model_size, beam_size=beam_size)
+        self.beam_size = self.config.beam_size
+        self.model_size = self.config.model_size
+        self.model_name = self.config.model_name
+        self.cache = cache
+        self._load_error = None
+        # Use faster-whisper for better performance and compatibility
+        registry.register(self.model_name, self.config.load_model)
+
+    @property
+    def model(self) -> Optional[WhisperModel]:
+        """Shared Whisper model from the model registry, loaded on first use."""
+        if self._load_error is not None:
+            return None
         try:
-            # Use faster-whisper for better performance and compatibility
-            self.model = WhisperModel(model_size, device="cpu", compute_type="int8")
-            self.model_available = True
+            return registry.get(self.model_name)
         except Exception as e:
             print(f"Error loading Whisper model: {str(e)}")
-            self.model = None
-            self.model_available = False
+            self._load_error = e
+            return None
+
+    @property
+    def model_available(self) -> bool:
+        """True if the Whisper model could be loaded."""
+        return self.model is not None
 
-    def transcribe(self, audio_path: str) -> Dict:
+    def transcribe(self, audio: Union[str, AudioBuffer]) -> Dict:
         """
-        Transcribe audio file to text.
+        Transcribe audio to text.
         Args:
-            audio_path: Path to the audio file
+            audio: Path to the audio file, or an in-memory AudioBuffer
         Returns:
             Dictionary containing transcription results
         """
@@ -34,8 +145,8 @@ class SpeechToText:
                 'language': 'es'
             }
             
-        if not os.path.exists(audio_path):
-            print(f"Audio file not found: {audio_path}")
+        if not isinstance(audio, AudioBuffer) and not os.path.exists(audio):
+            print(f"Audio file not found: {audio}")
             return {
                 'text': '',
                 'segments': [],
@@ -43,27 +154,18 @@ class SpeechToText:
             }
 
         try:
-            # Transcribe audio using faster-whisper
-            segments, info = self.model.transcribe(audio_path, beam_size=5)
-            
-            # Convert segments to list and extract text
-            segments_list = []
-            full_text = ""
-            
-            for segment in segments:
-                segment_dict = {
-                    'start': segment.start,
-                    'end': segment.end,
-                    'text': segment.text
-                }
-                segments_list.append(segment_dict)
-                full_text += segment.text
-            
-            return {
-                'text': full_text.strip(),
-                'segments': segments_list,
-                'language': info.language
-            }
+            cache_key = self._cache_key(audio) if self.cache else None
+            if cache_key:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+
+            # Decode file paths once; buffers at 16 kHz are passed to the model without copying
+            buffer = AudioBuffer.load(audio, WHISPER_SAMPLE_RATE)
+            result = self.transcribe_samples(buffer.samples, buffer.sample_rate)
+            if cache_key:
+                self.cache.put(cache_key, result)
+            return result
             
         except Exception as e:
             print(f"Error transcribing audio: {str(e)}")
@@ -81,24 +183,304 @@ class SpeechToText:
         Returns:
             List of words with their timestamps
         """
+        timeline = WordTimeline.from_segments(segments)
+        return [
+            {'word': word, 'start': float(start), 'end': float(end)}
+            for word, start, end in zip(timeline.words, timeline.start, timeline.end)
+        ]
+
+    def get_word_timeline(self, transcription: Dict) -> WordTimeline:
+        """
+        Word timeline of a transcription: the decoder's word timestamps when present,
+        otherwise an even split of each segment.
+        Args:
+            transcription: Result of transcribe, transcribe_samples or a streaming session
+        Returns:
+            WordTimeline
+        """
+        if transcription.get('words'):
+            return WordTimeline.from_dict(transcription['words'])
+        return WordTimeline.from_segments(transcription.get('segments', []))
+
+    def _cache_key(self, audio: Union[str, AudioBuffer]) -> str:
+        """Cache key from the audio content, model and decoding parameters."""
+        if isinstance(audio, AudioBuffer):
+            content_hash = f"pcm:{audio.sample_rate}:{hash_buffer(audio.samples)}"
+        else:
+            content_hash = f"file:{hash_file(audio)}"
+        return ResultCache.make_key('transcription', content_hash, {
+            'model_size': self.model_size,
+            'compute_type': self.config.compute_type,
+            'beam_size': self.beam_size,
+            'language': self.config.language,
+            'word_timestamps': True,
+            'faster_whisper': faster_whisper.__version__
+        })
+
+    def transcribe_samples(self, audio: np.ndarray, sample_rate: int,
+                           language: Optional[str] = None, offset: float = 0.0) -> Dict:
+        """
+        Transcribe an in-memory mono audio chunk.
+        Args:
+            audio: Mono float32 samples in [-1, 1]
+            sample_rate: Sample rate of the samples
+            language: Language code to skip detection, or None to use the configured language
+            offset: Seconds added to the segment timestamps
+        Returns:
+            Dictionary containing transcription results
+        """
+        language = language or self.config.language
+        if not self.model_available or len(audio) == 0:
+            return {'text': '', 'segments': [], 'language': language or 'es'}
+
+        audio = resample_to(audio, sample_rate, WHISPER_SAMPLE_RATE)
+        segments, info = self.model.transcribe(
+            audio, beam_size=self.beam_size, language=language, word_timestamps=True
+        )
+
+        segments_list = []
         words = []
+        full_text = ""
         for segment in segments:
-            start = segment['start']
-            end = segment['end']
-            text = segment['text'].strip()
-            
-            # Simple word splitting (can be improved with better tokenization)
-            word_list = text.split()
-            duration = end - start
-            word_duration = duration / len(word_list)
-            
-            for i, word in enumerate(word_list):
-                word_start = start + (i * word_duration)
-                word_end = word_start + word_duration
-                words.append({
-                    'word': word,
-                    'start': word_start,
-                    'end': word_end
-                })
-        
-        return words 
\ No newline at end of file
+            segments_list.append({
+                'start': segment.start + offset,
+                'end': segment.end + offset,
+                'text': segment.text
+            })
+            words.extend(segment.words or [])
+            full_text += segment.text
+
+        timeline = WordTimeline.from_words(words)
+        timeline.start += offset
+        timeline.end += offset
+
+        return {
+            'text': full_text.strip(),
+            'segments': segments_list,
+            'words': timeline.to_dict(),
+            'language': info.language
+        }
+
+    def stream(self, sample_rate: int, **vad_options) -> 'StreamingTranscriber':
+        """
+        Start an incremental transcription session fed with PCM chunks.
+        Args:
+            sample_rate: Sample rate of the chunks that will be fed
+            vad_options: Options forwarded to StreamingTranscriber
+        Returns:
+            Started StreamingTranscriber
+        """
+        transcriber = StreamingTranscriber(self, sample_rate, **vad_options)
+        transcriber.start()
+        return transcriber
+
+    def transcribe_stream(self, chunks: Iterable[np.ndarray], sample_rate: int, **vad_options) -> Iterator[Dict]:
+        """
+        Transcribe an iterable of PCM chunks, yielding segments as utterances finish.
+        Args:
+            chunks: Iterable of mono float32 chunks (e.g. from a sounddevice callback queue)
+            sample_rate: Sample rate of the chunks
+            vad_options: Options forwarded to StreamingTranscriber
+        Returns:
+            Iterator over segment dictionaries
+        """
+        transcriber = self.stream(sample_rate, **vad_options)
+
+        def feed():
+            try:
+                for chunk in chunks:
+                    transcriber.feed(chunk)
+            finally:
+                transcriber.finish()
+
+        threading.Thread(target=feed, daemon=True).start()
+        yield from transcriber.segments()
+
+
+class StreamingTranscriber:
+    _END = object()
+
+    def __init__(self, speech_to_text: SpeechToText, sample_rate: int, frame_ms: int = 30,
+                 energy_threshold: float = 0.01, noise_ratio: float = 3.0,
+                 min_silence: float = 0.6, min_speech: float = 0.25,
+                 max_utterance: float = 20.0, padding: float = 0.2):
+        """
+        Incremental transcription with energy-based voice activity detection.
+        Chunks are split into utterances at pauses and each finished utterance is
+        transcribed on a background worker while recording continues.
+        Args:
+            speech_to_text: SpeechToText instance whose model is used
+            sample_rate: Sample rate of the fed chunks
+            frame_ms: VAD frame length in milliseconds
+            energy_threshold: Minimum RMS considered speech
+            noise_ratio: Speech must be this many times louder than the tracked noise floor
+            min_silence: Seconds of silence that close an utterance
+            min_speech: Utterances shorter than this are discarded
+            max_utterance: Utterances are force-split after this many seconds
+            padding: Seconds of audio kept before and after each utterance
+        """
+        self.stt = speech_to_text
+        self.sample_rate = sample_rate
+        self.frame_size = max(1, int(sample_rate * frame_ms / 1000))
+        self.energy_threshold = energy_threshold
+        self.noise_ratio = noise_ratio
+        self.min_silence_frames = int(min_silence * 1000 / frame_ms)
+        self.min_speech_samples = int(min_speech * sample_rate)
+        self.max_utterance_samples = int(max_utterance * sample_rate)
+        self.padding_samples = int(padding * sample_rate)
+
+        self._input = queue.Queue()
+        self._output = queue.Queue()
+        self._worker = None
+        self._segments = []
+        self._timelines = []
+        self._language = None
+
+        # VAD state
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._history = np.zeros(0, dtype=np.float32)
+        self._utterance = []
+        self._utterance_start = 0
+        self._utterance_samples = 0
+        self._silence_frames = 0
+        self._samples_seen = 0
+        self._noise_floor = None
+
+    def start(self):
+        """Start the background worker."""
+        self._worker = threading.Thread(target=self._run, name="streaming-transcriber", daemon=True)
+        self._worker.start()
+
+    def feed(self, chunk: np.ndarray):
+        """
+        Queue a PCM chunk; safe to call from an audio callback.
+        Args:
+            chunk: Samples (frames x channels or 1-D); channels are averaged to mono
+        """
+        chunk = np.asarray(chunk, dtype=np.float32)
+        if chunk.ndim > 1:
+            chunk = chunk.mean(axis=1)
+        self._input.put(chunk.copy())
+
+    def finish(self):
+        """Signal the end of the audio; the last utterance is flushed and transcribed."""
+        self._input.put(self._END)
+
+    def segments(self) -> Iterator[Dict]:
+        """Yield segments as they are transcribed, until finish() has been processed."""
+        while True:
+            segment = self._output.get()
+            if segment is self._END:
+                return
+            yield segment
+
+    async def asegments(self) -> AsyncIterator[Dict]:
+        """Async variant of segments()."""
+        loop = asyncio.get_running_loop()
+        while True:
+            segment = await loop.run_in_executor(None, self._output.get)
+            if segment is self._END:
+                return
+            yield segment
+
+    def result(self, timeout: Optional[float] = None) -> Dict:
+        """
+        Wait for the worker to finish and return the full transcription.
+        Args:
+            timeout: Maximum seconds to wait for pending utterances
+        Returns:
+            Dictionary with 'text', 'segments' and 'language'
+        """
+        if self._worker is not None:
+            self._worker.join(timeout)
+        segments = list(self._segments)
+        timeline = WordTimeline.concatenate(list(self._timelines))
+        return {
+            'text': ''.join(segment['text'] for segment in segments).strip(),
+            'segments': segments,
+            'words': timeline.to_dict(),
+            'language': self._language or 'es'
+        }
+
+    def _run(self):
+        while True:
+            chunk = self._input.get()
+            if chunk is self._END:
+                self._close_utterance()
+                self._output.put(self._END)
+                return
+            self._process(chunk)
+
+    def _process(self, chunk: np.ndarray):
+        """Run the VAD over complete frames of the chunk."""
+        samples = np.concatenate((self._pending, chunk))
+        num_frames = len(samples) // self.frame_size
+        self._pending = samples[num_frames * self.frame_size:]
+        if num_frames == 0:
+            return
+
+        frames = samples[:num_frames * self.frame_size].reshape(num_frames, self.frame_size)
+        energies = np.sqrt(np.mean(frames ** 2, axis=1))
+        for frame, energy in zip(frames, energies):
+            self._process_frame(frame, float(energy))
+
+    def _process_frame(self, frame: np.ndarray, energy: float):
+        if self._noise_floor is None:
+            self._noise_floor = energy
+        is_speech = energy > max(self.energy_threshold, self._noise_floor * self.noise_ratio)
+        if not is_speech:
+            # Track the background level slowly so speech does not raise it
+            self._noise_floor = 0.95 * self._noise_floor + 0.05 * energy
+
+        frame_start = self._samples_seen
+        self._samples_seen += len(frame)
+
+        if self._utterance:
+            self._utterance.append(frame)
+            self._utterance_samples += len(frame)
+            self._silence_frames = 0 if is_speech else self._silence_frames + 1
+            if (self._silence_frames >= self.min_silence_frames
+                    or self._utterance_samples >= self.max_utterance_samples):
+                self._close_utterance()
+        elif is_speech:
+            # Start a new utterance with some leading context
+            self._utterance = [self._history, frame]
+            self._utterance_start = frame_start - len(self._history)
+            self._utterance_samples = len(self._history) + len(frame)
+            self._silence_frames = 0
+
+        if not self._utterance:
+            self._history = np.concatenate((self._history, frame))[-self.padding_samples:] \
+                if self.padding_samples else np.zeros(0, dtype=np.float32)
+
+    def _close_utterance(self):
+        """Transcribe the current utterance and publish its segments."""
+        if not self._utterance:
+            return
+        audio = np.concatenate(self._utterance)
+        # Drop trailing silence beyond the padding
+        trailing = max(0, self._silence_frames * self.frame_size - self.padding_samples)
+        if trailing:
+            audio = audio[:-trailing]
+        start = self._utterance_start
+        self._utterance = []
+        self._utterance_samples = 0
+        self._silence_frames = 0
+        self._history = np.zeros(0, dtype=np.float32)
+
+        if len(audio) < self.min_speech_samples:
+            return
+        try:
+            result = self.stt.transcribe_samples(
+                audio, self.sample_rate, language=self._language, offset=start / self.sample_rate
+            )
+        except Exception as e:
+            print(f"Error transcribing audio chunk: {str(e)}")
+            return
+        # Pin the language detected on the first utterance for the rest of the stream
+        if self._language is None and result['segments']:
+            self._language = result['language']
+        self._timelines.append(WordTimeline.from_dict(result.get('words')))
+        for segment in result['segments']:
+            self._segments.append(segment)
+            self._output.put(segment)
@@ -0,0 +1,318 @@
+import copy
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+from tracing import NoopTrace, call_measured
+
+# How often run() and _execute check queued stages with a timeout for having started
+_START_POLL_SECONDS = 0.05
+
+# Start times of the tasks of this worker's process pool, indexed by task slot (set in workers)
+_worker_start_times = None
+
+
+def _init_worker(start_times):
+    """Process pool initializer: keep the pool's shared start-time array."""
+    global _worker_start_times
+    _worker_start_times = start_times
+
+
+def _call_started(slot: int, func: Callable, kwargs: Dict) -> Tuple[Any, Dict]:
+    """Report the task's start to the parent, then run it under call_measured."""
+    # Wall-clock time: unlike time.monotonic() it is comparable between processes
+    _worker_start_times[slot] = time.time()
+    return call_measured(func, kwargs)
+
+
+def default_workers(executor: str) -> int:
+    """
+    Pool size for stages that do not set one: a few threads per stage so concurrent runs
+    do not queue behind each other, and fewer processes since each loads its own models.
+    """
+    cpus = os.cpu_count() or 1
+    if executor == 'process':
+        return max(1, min(2, cpus // 2))
+    return max(2, min(4, cpus))
+
+
+class Stage:
+    def __init__(self, name: str, func: Callable, inputs: Sequence[str] = (), executor: str = 'thread',
+                 workers: Optional[int] = None, timeout: Optional[float] = None, fallback: Any = None,
+                 input_bytes: Optional[Callable[..., int]] = None, cpu_clock: str = 'thread'):
+        """
+        One node of a stage graph.
+        Args:
+            name: Stage name; its result is available to later stages under this name
+            func: Callable receiving the declared inputs as keyword arguments. Process stages
+                need a picklable callable (module-level function or functools.partial of one)
+            inputs: Names of graph inputs or earlier stages this stage needs
+            executor: 'thread' for GIL-releasing work, 'process' for CPU-bound Python work
+            workers: Size of this stage's pool (default_workers(executor) when None)
+            timeout: Seconds the stage may run once started before it is abandoned (None for
+                no limit)
+            fallback: Result used when the stage fails or times out (a callable is called to
+                build it); without one, stages depending on it are skipped
+            input_bytes: Callable computing the traced input size from the inputs
+            cpu_clock: CPU time traced for a thread stage: 'thread', or 'process' for stages whose
+                library computes on its own native threads (it then includes concurrent work in
+                the process). Process stages always report their worker's process time
+        """
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor: {executor}")
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.executor = executor
+        self.workers = workers if workers is not None else default_workers(executor)
+        self.timeout = timeout
+        self.fallback = fallback
+        self.input_bytes = input_bytes
+        self.cpu_clock = cpu_clock
+
+    def fallback_value(self) -> Any:
+        """A fresh copy of the fallback result."""
+        return self.fallback() if callable(self.fallback) else copy.deepcopy(self.fallback)
+
+
+class StageGraph:
+    def __init__(self, stages: Iterable[Stage], inputs: Iterable[str] = ()):
+        """
+        Run stages as soon as their inputs are ready, independent stages concurrently,
+        each on its own thread or process pool. Pools are created on first use and reused,
+        and shared by concurrent runs; a pool whose worker is stuck in a timed out stage is
+        replaced so later runs do not wait for it.
+        Args:
+            stages: Stages of the graph
+            inputs: Names of the values passed to run()
+        """
+        self.stages = {stage.name: stage for stage in stages}
+        self.inputs = set(inputs)
+        self._check()
+        self._lock = threading.Lock()
+        self._thread_pools = {}
+        self._process_pools = {}
+
+    def _check(self):
+        """Reject unknown inputs and cycles."""
+        for stage in self.stages.values():
+            for name in stage.inputs:
+                if name not in self.inputs and name not in self.stages:
+                    raise ValueError(f"Stage {stage.name} needs unknown input {name}")
+        resolved = set(self.inputs)
+        remaining = dict(self.stages)
+        while remaining:
+            ready = [name for name, stage in remaining.items() if all(i in resolved for i in stage.inputs)]
+            if not ready:
+                raise ValueError(f"Cycle between stages: {', '.join(sorted(remaining))}")
+            for name in ready:
+                resolved.add(name)
+                del remaining[name]
+
+    def run(self, inputs: Dict[str, Any], trace=None) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        Execute the graph once.
+        Args:
+            inputs: Values for the graph inputs
+            trace: Trace receiving one span per stage (optional)
+        Returns:
+            (results by stage name, error messages by stage name); failed stages with a
+            fallback appear in both
+        """
+        trace = trace or NoopTrace()
+        values = dict(inputs)
+        errors = {}
+        failed = set()
+        remaining = dict(self.stages)
+        running = {}  # future -> (stage, state dict given 'span' and 'start' by _execute)
+
+        while remaining or running:
+            # Start every stage whose inputs are resolved; skip those behind a failure
+            for name, stage in list(remaining.items()):
+                blocked = [i for i in stage.inputs if i in failed]
+                if blocked:
+                    errors[name] = f"skipped: {blocked[0]} failed"
+                    failed.add(name)
+                    del remaining[name]
+                elif all(i in values for i in stage.inputs):
+                    kwargs = {i: values[i] for i in stage.inputs}
+                    state = {}
+                    future = self._thread_pool(stage).submit(self._execute, stage, kwargs, trace, state)
+                    running[future] = (stage, state)
+                    del remaining[name]
+
+            if not running:
+                break
+
+            # Timeouts count from the moment a stage starts, not while it waits for a worker;
+            # process stages time out inside _execute
+            deadlines = []
+            for stage, state in running.values():
+                if stage.timeout is None or stage.executor == 'process':
+                    continue
+                started = state.get('start')
+                deadlines.append(started + stage.timeout if started else time.monotonic() + _START_POLL_SECONDS)
+            wait_timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            done, _ = wait(running, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                stage, _ = running.pop(future)
+                try:
+                    values[stage.name] = future.result()
+                except Exception as e:
+                    print(f"Error in stage {stage.name}: {str(e)}")
+                    self._fail(stage, str(e) or type(e).__name__, values, errors, failed)
+
+            now = time.monotonic()
+            for future, (stage, state) in list(running.items()):
+                if stage.timeout is None or stage.executor == 'process' or 'start' not in state:
+                    continue
+                if now >= state['start'] + stage.timeout:
+                    # Threads cannot be interrupted: the result is dropped when it arrives, and
+                    # the busy thread's pool is replaced for later stages
+                    del running[future]
+                    self._retire_thread_pool(stage)
+                    message = f"timed out after {stage.timeout}s"
+                    print(f"Stage {stage.name} {message}")
+                    # The trace may be exported before the thread ends; record its span now
+                    trace.abandon(state['span'], message)
+                    self._fail(stage, message, values, errors, failed)
+
+        return values, errors
+
+    def _fail(self, stage: Stage, message: str, values: Dict, errors: Dict, failed: set):
+        """Record a failed stage and substitute its fallback result if it has one."""
+        errors[stage.name] = message
+        if stage.fallback is not None:
+            values[stage.name] = stage.fallback_value()
+        else:
+            failed.add(stage.name)
+
+    def _execute(self, stage: Stage, kwargs: Dict, trace, state: Dict) -> Any:
+        """
+        Run one stage in its thread pool, delegating to its process pool if configured.
+        The span and then the start time are published in state for run()'s timeout checks.
+        """
+        input_bytes = stage.input_bytes(**kwargs) if stage.input_bytes else 0
+        with trace.span(stage.name, input_bytes=input_bytes, cpu_clock=stage.cpu_clock,
+                        executor=stage.executor) as span:
+            state['span'] = span
+            state['start'] = time.monotonic()
+            if stage.executor == 'thread':
+                return stage.func(**kwargs)
+            pool, start_times, slots = self._process_pool(stage)
+            slot = slots.get()
+            start_times[slot] = 0.0
+            try:
+                # Measured in the worker: this thread only waits
+                future = pool.submit(_call_started, slot, stage.func, kwargs)
+                result, span['usage'] = self._wait_started(future, stage.timeout, start_times, slot)
+                return result
+            except TimeoutError:
+                if future.done():
+                    # Raised by the stage itself
+                    raise
+                if not future.cancel():
+                    # The worker is stuck in this stage: replace the pool and stop its processes
+                    self._retire_process_pool(stage, pool, terminate=True)
+                span['status'] = 'timeout'
+                raise TimeoutError(f"timed out after {stage.timeout}s")
+            except BrokenProcessPool:
+                # A crashed worker breaks the pool; start a fresh one for the next run
+                self._retire_process_pool(stage, pool)
+                raise
+            finally:
+                slots.put(slot)
+
+    @staticmethod
+    def _wait_started(future, timeout: Optional[float], start_times, slot: int) -> Any:
+        """
+        Wait for a process task, counting the timeout from when a worker started it
+        rather than from submission, so time spent queued for a busy or starting worker is free.
+        Raises:
+            TimeoutError: The task ran longer than timeout
+        """
+        if timeout is None:
+            return future.result()
+        while True:
+            started = start_times[slot]
+            if started:
+                return future.result(max(0.0, started + timeout - time.time()))
+            try:
+                return future.result(_START_POLL_SECONDS)
+            except TimeoutError:
+                if future.done():
+                    raise
+
+    def _thread_pool(self, stage: Stage) -> ThreadPoolExecutor:
+        """Per-stage thread pool (process stages use it to wait on their process pool)."""
+        with self._lock:
+            pool = self._thread_pools.get(stage.name)
+            if pool is None:
+                pool = ThreadPoolExecutor(max_workers=stage.workers, thread_name_prefix=f"stage-{stage.name}")
+                self._thread_pools[stage.name] = pool
+            return pool
+
+    def _process_pool(self, stage: Stage) -> Tuple[ProcessPoolExecutor, Any, queue.Queue]:
+        """
+        Per-stage process pool; workers keep their models loaded between runs.
+        Returns:
+            (pool, shared array of task start times, queue of free slots in that array)
+        """
+        with self._lock:
+            entry = self._process_pools.get(stage.name)
+            if entry is None:
+                # spawn: TensorFlow and CTranslate2 do not survive fork after initialization
+                context = multiprocessing.get_context('spawn')
+                # One slot per thread of the stage's thread pool, which bounds the tasks in flight
+                start_times = context.RawArray('d', stage.workers)
+                slots = queue.Queue()
+                for slot in range(stage.workers):
+                    slots.put(slot)
+                pool = ProcessPoolExecutor(max_workers=stage.workers, mp_context=context,
+                                           initializer=_init_worker, initargs=(start_times,))
+                entry = (pool, start_times, slots)
+                self._process_pools[stage.name] = entry
+            return entry
+
+    def _retire_thread_pool(self, stage: Stage):
+        """Stop sending work to a stage's thread pool; its stuck thread exits when its stage returns."""
+        with self._lock:
+            pool = self._thread_pools.pop(stage.name, None)
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def _retire_process_pool(self, stage: Stage, pool: ProcessPoolExecutor, terminate: bool = False):
+        """
+        Drop a stage's process pool so the next run starts a fresh one.
+        Args:
+            stage: Stage the pool belongs to
+            pool: Pool to retire (ignored if it was already replaced)
+            terminate: Kill its worker processes, for a worker stuck in a timed out stage.
+                Other runs' tasks in the pool fail and use the stage fallback
+        """
+        with self._lock:
+            entry = self._process_pools.get(stage.name)
+            if entry is None or entry[0] is not pool:
+                return
+            del self._process_pools[stage.name]
+        # The process list is cleared by shutdown(), so take it first
+        processes = list((getattr(pool, '_processes', None) or {}).values()) if terminate else []
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    def shutdown(self, wait: bool = True):
+        """Stop every pool."""
+        with self._lock:
+            pools = list(self._thread_pools.values()) + [entry[0] for entry in self._process_pools.values()]
+            self._thread_pools.clear()
+            self._process_pools.clear()
+        for pool in pools:
+            pool.shutdown(wait=wait)
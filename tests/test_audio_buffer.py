@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from audio_buffer import AudioBuffer, resample_to
+
+
+def test_buffer_is_read_only_without_freezing_callers_array():
+    samples = np.zeros(16, dtype=np.float32)
+    buffer = AudioBuffer(samples, 16000)
+    assert np.shares_memory(buffer.samples, samples)
+    assert not buffer.samples.flags.writeable
+    samples[0] = 0.5
+    with pytest.raises(ValueError):
+        buffer.samples[0] = 1.0
+
+
+def test_buffer_converts_dtype_and_downmixes():
+    stereo = np.stack([np.ones(8), -np.ones(8) * 0.5], axis=1)
+    buffer = AudioBuffer(stereo, 8000)
+    assert buffer.samples.dtype == np.float32 and buffer.samples.shape == (8,)
+    np.testing.assert_allclose(buffer.samples, 0.25)
+    assert buffer.duration == 0.001
+
+
+def test_bytes_round_trip():
+    buffer = AudioBuffer(np.linspace(-1, 1, 100), 16000)
+    restored = AudioBuffer.from_bytes(buffer.to_bytes())
+    assert restored.sample_rate == 16000
+    np.testing.assert_array_equal(restored.samples, buffer.samples)
+
+
+def test_resample_to_target_rate():
+    audio = np.zeros(44100, dtype=np.float32)
+    assert len(resample_to(audio, 44100, 16000)) == 16000
+    assert resample_to(audio, 16000, 16000) is audio
@@ -0,0 +1,141 @@
+import itertools
+import wave
+
+import numpy as np
+import pytest
+
+from capture import AudioRingBuffer, CaptureSession, FileAudioStream, FileVideoCapture
+from frame_store import FrameStore
+
+SAMPLE_RATE = 8000
+
+
+def write_wav(path, samples, sample_rate=SAMPLE_RATE, channels=1):
+    data = (np.clip(samples, -1, 1) * 32767).astype(np.int16)
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(data.tobytes())
+
+
+@pytest.fixture
+def tone(tmp_path):
+    samples = 0.5 * np.sin(2 * np.pi * 440 * np.arange(SAMPLE_RATE) / SAMPLE_RATE)
+    path = tmp_path / "tone.wav"
+    write_wav(path, samples)
+    return path, samples
+
+
+def test_audio_ring_buffer_keeps_newest_samples():
+    buffer = AudioRingBuffer(capacity_seconds=1, sample_rate=10)
+    buffer.write(np.arange(8, dtype=np.float32), timestamp=2.0)
+    buffer.write(np.arange(8, 14, dtype=np.float32), timestamp=2.8)
+    samples, start = buffer.snapshot()
+    np.testing.assert_array_equal(samples, np.arange(4, 14))
+    assert start == pytest.approx(2.4)
+
+
+def test_file_audio_stream_delivers_whole_file(tone):
+    path, samples = tone
+    blocks = []
+    stream = FileAudioStream(str(path), SAMPLE_RATE, channels=2, blocksize=1000, realtime=False,
+                             callback=lambda indata, frames, time_info, status: blocks.append(indata.copy()))
+    stream.start()
+    stream._thread.join(timeout=5)
+    stream.stop()
+    audio = np.concatenate(blocks)
+    assert audio.shape == (len(samples), 2)
+    np.testing.assert_allclose(audio[:, 0], samples, atol=1e-4)
+
+
+def test_file_audio_stream_resamples(tone):
+    path, samples = tone
+    blocks = []
+    stream = FileAudioStream(str(path), SAMPLE_RATE // 2, blocksize=512, realtime=False,
+                             callback=lambda indata, frames, time_info, status: blocks.append(indata))
+    stream.start()
+    stream._thread.join(timeout=5)
+    stream.stop()
+    assert sum(len(block) for block in blocks) == len(samples) // 2
+
+
+def test_file_video_capture_reads_frames_then_stops():
+    frames = [np.full((4, 4, 3), i, dtype=np.uint8) for i in range(3)]
+    cap = FileVideoCapture(frames, realtime=False)
+    assert cap.isOpened()
+    read = [cap.read() for _ in range(4)]
+    assert [ok for ok, _ in read] == [True, True, True, False]
+    assert [frame[0, 0, 0] for _, frame in read[:3]] == [0, 1, 2]
+    cap.release()
+    assert not cap.isOpened()
+
+
+def test_capture_session_aligns_audio_and_frames(tone):
+    path, _ = tone
+    frames = [np.full((8, 8, 3), i, dtype=np.uint8) for i in range(15)]
+    seen = []
+    session = CaptureSession(
+        duration=2,
+        sample_rate=SAMPLE_RATE,
+        audio_stream_factory=lambda samplerate, channels, callback: FileAudioStream(
+            str(path), samplerate, channels, callback, blocksize=400),
+        video_capture_factory=lambda index: FileVideoCapture(frames, fps=30),
+        on_frame=lambda frame, timestamp: seen.append(timestamp),
+        max_fps=30
+    )
+    session.start()
+    session.wait(timeout=1.5)
+    session.stop()
+    try:
+        capture = session.result()
+        assert len(seen) == len(frames)
+        assert len(capture.frames) == len(capture.frame_timestamps) > 0
+        assert np.all(np.diff(capture.frame_timestamps) > 0)
+        # Both streams are trimmed to the window they cover together
+        audio_end = capture.audio_start + capture.duration
+        # Audio is cut on sample boundaries
+        assert capture.frame_timestamps[0] >= capture.audio_start - 1.0 / SAMPLE_RATE
+        assert capture.frame_timestamps[-1] <= audio_end + 1.0 / SAMPLE_RATE
+        assert capture.duration > 0
+    finally:
+        session.close()
+
+
+def test_capture_session_stops_early(tone):
+    path, _ = tone
+    session = CaptureSession(
+        duration=30,
+        sample_rate=SAMPLE_RATE,
+        audio_stream_factory=lambda samplerate, channels, callback: FileAudioStream(
+            str(path), samplerate, channels, callback),
+        video_capture_factory=lambda index: FileVideoCapture(itertools.repeat(np.zeros((4, 4, 3), np.uint8)), fps=30),
+        max_fps=30,
+        frame_store=FrameStore(64)
+    )
+    session.start()
+    assert not session.wait(timeout=0.2)
+    session.stop()
+    assert not session.is_running()
+    assert session.elapsed() < 5
+    session.close()
+
+
+def test_capture_session_without_audio_device():
+    def broken_stream(samplerate, channels, callback):
+        raise RuntimeError("no microphone")
+
+    session = CaptureSession(
+        duration=1,
+        sample_rate=SAMPLE_RATE,
+        audio_stream_factory=broken_stream,
+        video_capture_factory=lambda index: FileVideoCapture([np.zeros((4, 4, 3), np.uint8)] * 3, realtime=False),
+        max_fps=30
+    )
+    session.start()
+    session.wait()
+    session.stop()
+    capture = session.result()
+    assert capture.audio_start is None and len(capture.audio) == 0
+    assert len(capture.frames) == 3
+    session.close()
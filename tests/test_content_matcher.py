@@ -0,0 +1,54 @@
+import pytest
+
+from content_matcher import ContentMatcher, PhraseAutomaton, compile_phrases, normalize_text
+
+
+def test_phrase_automaton_finds_whole_words():
+    automaton = PhraseAutomaton(['machine learning', 'learning', 'java'])
+    matches = automaton.find_all('i like machine learning and javascript not java')
+    assert matches == [('machine learning', 7), ('learning', 15), ('java', 43)]
+
+
+def test_phrase_automaton_overlapping_and_repeated_phrases():
+    automaton = PhraseAutomaton(['a b', 'b c', 'a'])
+    assert automaton.find_all('a b c a b') == [('a b', 0), ('a', 0), ('b c', 2), ('a b', 6), ('a', 6)]
+
+
+def test_phrase_automaton_ignores_empty_phrases():
+    assert PhraseAutomaton(['', 'x']).find_all('x y') == [('x', 0)]
+
+
+def test_compile_phrases_normalizes_and_caches():
+    automaton = compile_phrases(('Team-work', 'SQL'))
+    assert automaton is compile_phrases(('Team-work', 'SQL'))
+    assert automaton.find_all(normalize_text('Good teamwork with sql!')) == [('teamwork', 5), ('sql', 19)]
+
+
+@pytest.fixture
+def matcher():
+    return ContentMatcher()
+
+
+def test_match_skills_scores_exact_and_fuzzy_mentions(matcher):
+    scores = matcher.match_skills(['Python', 'machine learning', 'kubernetes'],
+                                  'I used python and machine-learning models')
+    assert scores['python'] == 100
+    assert scores['machine learning'] >= 90
+    assert scores['kubernetes'] < matcher.threshold
+
+
+def test_match_skills_with_skill_longer_than_transcript(matcher):
+    scores = matcher.match_skills(['machine learning engineer', 'python'], 'learning')
+    assert set(scores) == {'machine learning engineer', 'python'}
+    assert 0 < scores['machine learning engineer'] < matcher.threshold
+
+
+def test_match_skills_empty_inputs(matcher):
+    assert matcher.match_skills([], 'python') == {}
+    assert all(score == 0 for score in matcher.match_skills(['python'], '').values())
+
+
+def test_analyze_content_match_statistics(matcher):
+    analysis = matcher.analyze_content_match(['python', 'go'], 'python every day')
+    assert analysis['match_statistics']['total_skills'] == 2
+    assert analysis['match_statistics']['matched_skills'] == 1
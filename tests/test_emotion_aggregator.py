@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from emotion_aggregator import EMOTIONS, EmotionAggregator
+
+
+def result(dominant, **scores):
+    return {'emotion': dominant, 'emotions': {emotion: scores.get(emotion, 0.0) for emotion in EMOTIONS}}
+
+
+def test_empty_aggregator():
+    aggregator = EmotionAggregator()
+    assert aggregator.summary() == {}
+    assert aggregator.total == 0
+    assert aggregator.timeline()['times'] == []
+
+
+def test_summary_percentages_and_averages():
+    aggregator = EmotionAggregator()
+    aggregator.update(result('happy', happy=80.0, neutral=20.0))
+    aggregator.update(result('happy', happy=60.0, neutral=40.0))
+    aggregator.update(result('neutral', happy=10.0, neutral=90.0))
+    summary = aggregator.summary()
+    assert summary['dominant_emotion'] == 'happy'
+    assert summary['total_frames_analyzed'] == 3
+    assert summary['emotion_percentages']['happy'] == pytest.approx(200 / 3)
+    assert summary['average_emotions']['neutral'] == pytest.approx(50.0)
+    assert sum(summary['emotion_percentages'].values()) == pytest.approx(100.0)
+
+
+def test_accepts_dominant_emotion_key_and_ignores_unknown_emotions():
+    aggregator = EmotionAggregator()
+    aggregator.update({'dominant_emotion': 'sad', 'emotions': {'sad': 70.0, 'bored': 30.0}})
+    summary = aggregator.summary()
+    assert summary['dominant_emotion'] == 'sad'
+    assert summary['average_emotions']['sad'] == pytest.approx(70.0)
+
+
+def test_timeline_windows():
+    aggregator = EmotionAggregator(window_seconds=1.0)
+    aggregator.update(result('happy', happy=100.0), timestamp=10.2)
+    aggregator.update(result('sad', sad=100.0), timestamp=10.9)
+    aggregator.update(result('sad', sad=100.0), timestamp=12.5)
+    # Results without a timestamp only count towards the totals
+    aggregator.update(result('angry', angry=100.0))
+    timeline = aggregator.timeline()
+    assert timeline['times'] == pytest.approx([10.2, 12.2])
+    assert timeline['frames'] == [2, 1]
+    assert timeline['emotions']['happy'] == pytest.approx([50.0, 0.0])
+    assert timeline['dominant'][1] == 'sad'
+    assert aggregator.total == 4
+
+
+def test_timeline_coarsens_instead_of_growing():
+    aggregator = EmotionAggregator(window_seconds=1.0, max_windows=4)
+    for second in range(10):
+        aggregator.update(result('happy', happy=float(second)), timestamp=float(second))
+    timeline = aggregator.timeline()
+    assert aggregator.window_seconds == 4.0
+    assert sum(timeline['frames']) == 10
+    assert len(timeline['times']) <= 4
+    assert timeline['emotions']['happy'][0] == pytest.approx(np.mean([0, 1, 2, 3]))
+
+
+def test_reset():
+    aggregator = EmotionAggregator(max_windows=2)
+    for second in range(5):
+        aggregator.update(result('fear', fear=1.0), timestamp=float(second))
+    aggregator.reset()
+    assert aggregator.summary() == {}
+    assert aggregator.window_seconds == 1.0
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import numpy as np
+
+from frame_analysis_pool import FrameAnalysisPool
+
+
+def frame(value=0):
+    return np.full((4, 4, 3), value, dtype=np.uint8)
+
+
+def test_every_nth_and_rate_limit_skip_frames():
+    pool = FrameAnalysisPool(lambda f: {}, every_nth=3)
+    submitted = [pool.submit(frame()) for _ in range(7)]
+    assert submitted == [True, False, False, True, False, False, True]
+    assert pool.get_stats()['skipped'] == 4
+
+    limited = FrameAnalysisPool(lambda f: {}, max_fps=0.001)
+    assert limited.submit(frame()) and not limited.submit(frame())
+
+
+def test_full_queue_drops_oldest_frame():
+    pool = FrameAnalysisPool(lambda f: {'value': int(f[0, 0, 0])}, num_workers=1, max_queue_size=2)
+    for value in range(5):
+        pool.submit(frame(value))
+    stats = pool.get_stats()
+    assert stats['dropped'] == 3 and stats['pending'] == 2
+
+    pool.start()
+    pool.stop()
+    assert pool.get_stats()['pending'] == 0
+
+
+def test_latest_result_keeps_newest_frame():
+    release = threading.Event()
+    done = threading.Semaphore(0)
+
+    def analyze(f):
+        value = int(f[0, 0, 0])
+        # The first frame finishes last
+        if value == 0:
+            release.wait(5)
+        done.release()
+        return {'value': value}
+
+    pool = FrameAnalysisPool(analyze, num_workers=2)
+    pool.start()
+    pool.submit(frame(0))
+    pool.submit(frame(1))
+    assert done.acquire(timeout=5)
+    deadline = time.monotonic() + 5
+    while pool.latest_result() is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert pool.latest_result() == {'value': 1}
+    release.set()
+    assert done.acquire(timeout=5)
+    pool.stop()
+    assert pool.latest_result() == {'value': 1}
+    assert pool.get_stats()['analyzed'] == 2
+
+
+def test_errors_are_counted_and_reported():
+    done = threading.Event()
+
+    def analyze(f):
+        done.set()
+        raise RuntimeError('bad frame')
+
+    pool = FrameAnalysisPool(analyze, num_workers=1)
+    pool.start()
+    pool.submit(frame())
+    assert done.wait(5)
+    pool.stop()
+    assert pool.get_stats()['errors'] == 1
+    assert pool.latest_result()['dominant_emotion'] == 'error'
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from frame_selector import FrameSelector, sampling_saved_percent
+
+
+def frame(value):
+    return np.full((48, 64, 3), value, dtype=np.uint8)
+
+
+def test_static_frames_reuse_previous_result_until_max_gap():
+    selector = FrameSelector(max_gap=3)
+    assert selector.select([frame(100)] * 9) == [0, 0, 0, 0, 4, 4, 4, 4, 8]
+    stats = selector.get_stats()
+    assert stats['frames_analyzed'] == 3 and stats['frames_skipped'] == 6
+    assert stats['inference_saved_percent'] == pytest.approx(100 * 6 / 9)
+
+
+def test_changed_frame_is_analyzed():
+    selector = FrameSelector(diff_threshold=4.0, max_gap=100)
+    frames = [frame(100), frame(102), frame(110), frame(111)]
+    assert selector.select(frames) == [0, 0, 2, 2]
+
+
+def test_max_gap_seconds_uses_timestamps():
+    selector = FrameSelector(max_gap=100, max_gap_seconds=1.0)
+    assert selector.select([frame(50)] * 5, timestamps=[0.0, 0.4, 0.8, 1.2, 1.6]) == [0, 0, 0, 3, 3]
+
+
+def test_select_resets_between_recordings():
+    selector = FrameSelector(max_gap=100)
+    selector.select([frame(0)] * 3)
+    assert selector.select([frame(0)] * 2) == [0, 0]
+
+
+def test_accepts_grayscale_frames():
+    selector = FrameSelector()
+    assert selector.accept(np.zeros((48, 64), dtype=np.uint8))
+    assert not selector.accept(np.zeros((48, 64), dtype=np.uint8))
+
+
+def test_sampling_saved_percent_of_empty_stream():
+    assert sampling_saved_percent(0, 0) == 0.0
+    assert sampling_saved_percent(10, 4) == 60.0
@@ -0,0 +1,105 @@
+import multiprocessing
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from frame_store import FrameStore, FrameView, decode_frames, encode_frames
+
+
+def frame(value, shape=(24, 32, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def fill(store, count):
+    for n in range(count):
+        store.write(frame(n), float(n))
+
+
+def frame_values(view):
+    return [int(f[0, 0, 0]) for f in view]
+
+
+def test_ring_keeps_newest_frames_in_order():
+    store = FrameStore(3, backing='memory')
+    fill(store, 5)
+    view, timestamps = store.snapshot()
+    assert frame_values(view) == [2, 3, 4]
+    assert list(timestamps) == [2.0, 3.0, 4.0]
+    assert view.handle is None
+    assert frame_values(view[1:]) == [3, 4] and int(view[-1][0, 0, 0]) == 4
+
+
+def test_frames_are_downscaled_and_resized_to_ring_shape():
+    store = FrameStore(2, max_width=16, backing='memory')
+    store.write(frame(1, (24, 32, 3)), 0.0)
+    store.write(frame(2, (60, 40, 3)), 1.0)
+    view, _ = store.snapshot()
+    assert view.to_array().shape == (2, 12, 16, 3)
+
+
+@pytest.mark.parametrize('backing', ['shared', 'memmap'])
+def test_handle_attaches_without_copying(backing, tmp_path):
+    store = FrameStore(4, backing=backing, directory=str(tmp_path))
+    fill(store, 6)
+    view, _ = store.snapshot()
+    handle = view.handle
+    assert handle.backing == store.backing
+    assert len(pickle.dumps(handle)) < 1000
+
+    attached = pickle.loads(pickle.dumps(handle)).attach()
+    assert frame_values(attached) == [2, 3, 4, 5]
+    assert not attached[0].flags.writeable
+    # The attached view maps the same memory, so new frames show through
+    store.write(frame(9), 6.0)
+    assert int(attached._data[handle.indices[0]][0, 0, 0]) == 9
+    attached.close()
+    store.close()
+    if backing == 'memmap':
+        assert not os.path.exists(handle.name)
+
+
+@pytest.mark.parametrize('backing', ['memory', 'shared'])
+def test_view_pickles_as_handle_or_copy(backing):
+    store = FrameStore(2, backing=backing)
+    fill(store, 2)
+    view, _ = store.snapshot()
+    payload = pickle.dumps(view)
+    assert (len(payload) < view.nbytes) == (backing == 'shared')
+    restored = pickle.loads(payload)
+    assert frame_values(restored) == [0, 1]
+    restored.close()
+    store.close()
+
+
+def _sum_frames(handle):
+    view = handle.attach()
+    try:
+        return int(view.to_array().sum())
+    finally:
+        view.close()
+
+
+def test_worker_process_reads_shared_frames():
+    store = FrameStore(3, backing='shared')
+    fill(store, 3)
+    view, _ = store.snapshot()
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        total = pool.apply(_sum_frames, (view.handle,))
+    assert total == int(view.to_array().sum())
+    store.close()
+
+
+def test_in_memory_view_cannot_be_attached():
+    view = FrameView.from_frames([frame(0)])
+    assert view.handle is None
+    with pytest.raises(ValueError):
+        FrameView.attach(type('Handle', (), {'backing': 'memory'})())
+
+
+def test_encode_decode_round_trip():
+    frames = [frame(10), frame(200)]
+    decoded = decode_frames(encode_frames(frames, [0.5, 1.0]))
+    assert list(decoded.timestamps) == [0.5, 1.0]
+    assert np.abs(decoded.to_array().astype(int) - np.stack(frames)).max() <= 2
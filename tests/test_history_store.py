@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('sqlalchemy')
+from sqlalchemy import event
+
+from history_store import HistoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(f"sqlite:///{tmp_path / 'history.sqlite3'}")
+
+
+def analysis(n):
+    return {
+        'transcription': f"respuesta numero {n}",
+        'voice_analysis': {'energy': np.float32(0.25), 'mfcc': np.arange(3)},
+        'emotion_analysis': {'dominant_emotion': 'happy'},
+        'answer_evaluation': {'skill_coverage': 0.5}
+    }
+
+
+def record(store, candidate, answers):
+    session_id = store.start_session(candidate, ['python'])
+    return [store.add_answer(session_id, {'question': f"q{n}", 'category': 'technical'}, analysis(n))
+            for n in range(answers)]
+
+
+def test_pages_newest_first_and_filters_by_candidate(store):
+    ana = record(store, 'Ana', 5)
+    record(store, 'Luis', 2)
+    assert store.count_answers() == 7 and store.count_answers('Ana') == 5
+
+    first = store.list_answers('Ana', page=0, page_size=2)
+    second = store.list_answers('Ana', page=1, page_size=2)
+    last = store.list_answers('Ana', page=2, page_size=2)
+    assert [a['id'] for a in first + second + last] == ana[::-1]
+    assert store.list_answers('Ana', page=3, page_size=2) == []
+    assert first[0]['word_count'] == 3 and first[0]['dominant_emotion'] == 'happy'
+    assert store.candidates() == ['Ana', 'Luis']
+    assert [s['answers'] for s in store.list_sessions()] == [2, 5]
+
+
+def test_listing_does_not_read_stage_results(store):
+    answer_id, = record(store, 'Ana', 1)
+    statements = []
+    event.listen(store.engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    summary, = store.list_answers()
+    assert 'voice_analysis' not in summary
+    assert not any('stage_results' in s for s in statements)
+
+    results = store.get_stage_results(answer_id)
+    assert any('stage_results' in s for s in statements)
+    assert results['voice_analysis'] == {'energy': 0.25, 'mfcc': [0, 1, 2]}
+    assert set(results) == {'voice_analysis', 'emotion_analysis', 'answer_evaluation'}
+
+
+def test_unknown_session_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.add_answer(12345, {'question': 'q'}, analysis(0))
@@ -0,0 +1,49 @@
+import pytest
+
+from interview_bot import InterviewBot
+
+
+@pytest.fixture
+def bot():
+    return InterviewBot()
+
+
+def test_scenarios_are_not_reused_while_unused_ones_remain(bot):
+    questions = bot.generate_questions(['team lead'], num_questions=4, seed=1)
+    assert len({q['context'] for q in questions}) == 4
+    assert {q['context'] for q in questions} == set(bot.skill_scenarios['leadership'])
+
+
+def test_request_beyond_distinct_questions_terminates(bot):
+    per_category = sum(len(t) for t in bot.question_templates.values())
+    available = len(bot.skill_scenarios['leadership']) * per_category
+    questions = bot.generate_questions(['team lead'], num_questions=available + 50, seed=2)
+    assert len(questions) == available
+    assert len({q['question'] for q in questions}) == available
+
+
+def test_seed_makes_questions_reproducible(bot):
+    skills = ['python developer', 'public speaking, present']
+    assert bot.generate_questions(skills, 6, seed=7) == InterviewBot().generate_questions(skills, 6, seed=7)
+    assert bot.generate_questions(skills, 6, seed=7) != bot.generate_questions(skills, 6, seed=8)
+
+
+def test_unknown_skills_use_every_category(bot):
+    contexts = {q['context'] for q in bot.generate_questions(['underwater basket weaving'], 16, seed=3)}
+    all_scenarios = {s for scenarios in bot.skill_scenarios.values() for s in scenarios}
+    assert contexts == all_scenarios
+
+
+def test_question_sets_do_not_depend_on_the_batch(bot):
+    skills = [['team lead'], ['debug code'], ['write docs']]
+    sets = bot.generate_question_sets(skills, num_questions=3, seed=5)
+    assert len(sets) == 3 and all(len(s) == 3 for s in sets)
+    assert bot.generate_question_sets(skills[:2], num_questions=3, seed=5) == sets[:2]
+    assert bot.generate_question_sets(skills, num_questions=3, seed=6) != sets
+
+
+def test_skill_category_cache_is_bounded(bot):
+    from interview_bot import _skill_categories
+    bot.generate_questions([f"skill {n}" for n in range(10000)], 1, seed=0)
+    assert _skill_categories.cache_info().currsize <= _skill_categories.cache_info().maxsize
+    assert _skill_categories('team lead') == {'leadership'}
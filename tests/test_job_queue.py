@@ -0,0 +1,123 @@
+import threading
+
+import pytest
+
+from analysis_service import JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.sqlite3"))
+
+
+def test_submit_claim_finish(queue):
+    queue.register_worker('w1', pid=1)
+    job_id = queue.submit('audio', {'skills': ['python']})
+    assert queue.get(job_id)['status'] == 'queued'
+    assert queue.get(job_id)['queue_position'] == 0
+
+    job = queue.claim('w1')
+    assert job == {'id': job_id, 'kind': 'audio', 'params': {'skills': ['python']}, 'input_path': None}
+    assert queue.get(job_id)['status'] == 'running'
+    assert queue.stats()['workers'][0]['status'] == 'busy'
+
+    queue.finish(job_id, 'w1', result={'score': 1})
+    job = queue.get(job_id)
+    assert job['status'] == 'done' and job['result'] == {'score': 1}
+    worker, = queue.stats()['workers']
+    assert worker['status'] == 'idle' and worker['jobs_done'] == 1
+
+
+def test_claims_oldest_first_and_empty_queue(queue):
+    queue.register_worker('w1', pid=1)
+    assert queue.claim('w1') is None
+    first = queue.submit('resume', {})
+    second = queue.submit('frames', {})
+    assert queue.get(second)['queue_position'] == 1
+    assert queue.claim('w1')['id'] == first
+    assert queue.claim('w1')['id'] == second
+    assert queue.claim('w1') is None
+
+
+def test_rejects_unknown_kind(queue):
+    with pytest.raises(ValueError):
+        queue.submit('video', {})
+    assert queue.get('missing') is None
+
+
+def test_error_result(queue):
+    queue.register_worker('w1', pid=1)
+    job_id = queue.submit('audio', {})
+    queue.claim('w1')
+    queue.finish(job_id, 'w1', error='boom')
+    job = queue.get(job_id)
+    assert job['status'] == 'error' and job['error'] == 'boom' and 'result' not in job
+
+
+def test_concurrent_workers_claim_each_job_once(queue):
+    job_ids = {queue.submit('audio', {'n': n}) for n in range(40)}
+    claimed = []
+    lock = threading.Lock()
+
+    def work(worker_id):
+        # Each thread opens its own connection, like a worker process
+        queue.register_worker(worker_id, pid=0)
+        while True:
+            job = queue.claim(worker_id)
+            if job is None:
+                return
+            with lock:
+                claimed.append(job['id'])
+            queue.finish(job['id'], worker_id, result=None)
+
+    threads = [threading.Thread(target=work, args=(f"w{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(claimed) == sorted(job_ids)
+    assert queue.stats()['queue']['done'] == 40
+
+
+def test_dead_worker_jobs_fail_and_recover_requeues(queue):
+    queue.register_worker('w1', pid=1)
+    first = queue.submit('audio', {})
+    second = queue.submit('audio', {})
+    queue.claim('w1')
+    assert queue.fail_worker_jobs('w1', 'worker died') == 1
+    assert queue.get(first)['error'] == 'worker died'
+
+    queue.register_worker('w2', pid=2)
+    queue.claim('w2')
+    assert queue.recover() == 1
+    assert queue.get(second)['status'] == 'queued'
+    assert queue.stats()['workers'] == []
+
+
+def test_prune_deletes_old_finished_jobs(queue, tmp_path):
+    input_path = tmp_path / "upload.bin"
+    input_path.write_bytes(b"data")
+    queue.register_worker('w1', pid=1)
+    job_id = queue.submit('audio', {}, input_path=str(input_path))
+    pending = queue.submit('audio', {})
+    queue.claim('w1')
+    queue.finish(job_id, 'w1', result={})
+    assert queue.prune(max_age_seconds=-1) == [str(input_path)]
+    assert queue.get(job_id) is None
+    assert queue.get(pending)['status'] == 'queued'
+
+
+def test_pickled_queue_reopens_its_database(queue):
+    import pickle
+    job_id = queue.submit('resume', {})
+    copy = pickle.loads(pickle.dumps(queue))
+    assert copy.get(job_id)['status'] == 'queued'
+
+
+def test_submit_tolerates_inputs_removed_while_pruning(tmp_path, monkeypatch):
+    from analysis_service import AnalysisService
+    service = AnalysisService(str(tmp_path / "service"), retention_seconds=0)
+    # A worker deleted the finished job's input between prune() and the removal
+    monkeypatch.setattr(service.queue, 'prune', lambda max_age: [str(tmp_path / "already_removed.wav")])
+    job_id = service.submit('audio', b'data', '.wav')
+    assert service.queue.get(job_id)['status'] == 'queued'
@@ -0,0 +1,102 @@
+import json
+
+import numpy as np
+import pytest
+
+from result_cache import ResultCache, hash_buffer, hash_file, json_default
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path / "results.sqlite3"))
+
+
+def test_make_key_depends_on_content_and_params():
+    key = ResultCache.make_key('resume', 'abc', {'model': 'v1', 'beam': 5})
+    assert key == ResultCache.make_key('resume', 'abc', {'beam': 5, 'model': 'v1'})
+    assert key != ResultCache.make_key('resume', 'abd', {'model': 'v1', 'beam': 5})
+    assert key != ResultCache.make_key('resume', 'abc', {'model': 'v2', 'beam': 5})
+    assert key != ResultCache.make_key('transcription', 'abc', {'model': 'v1', 'beam': 5})
+
+
+def test_hashes_follow_content(tmp_path):
+    path = tmp_path / "a.bin"
+    path.write_bytes(b'x' * 10)
+    first = hash_file(str(path))
+    path.write_bytes(b'x' * 9 + b'y')
+    assert hash_file(str(path)) != first
+    samples = np.zeros(8, dtype=np.float32)
+    assert hash_buffer(samples) == hash_buffer(samples.tobytes())
+
+
+def test_get_put_and_counters(cache):
+    assert cache.get('k') is None
+    cache.put('k', {'skills': ['python']})
+    assert cache.get('k') == {'skills': ['python']}
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1 and stats['entries'] == 1
+    cache.clear()
+    assert cache.get('k') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.sqlite3"), max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_oversized_value_is_not_stored(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.sqlite3"), max_bytes=10)
+    cache.put('big', 'x' * 100)
+    assert cache.get('big') is None
+
+
+def test_shared_between_instances(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    ResultCache(path).put('k', [1, 2])
+    assert ResultCache(path).get('k') == [1, 2]
+
+
+def test_resume_key_invalidated_by_resume_and_taxonomy(tmp_path):
+    pytest.importorskip('spacy')
+    from resume_parser import ResumeParser
+
+    resume = tmp_path / "cv.pdf"
+    resume.write_bytes(b'%PDF-1.4 one')
+    taxonomy = tmp_path / "taxonomy.json"
+    taxonomy.write_text('{"skills": []}', encoding='utf-8')
+
+    key = ResumeParser(str(taxonomy))._cache_key(str(resume))
+    assert key == ResumeParser(str(taxonomy))._cache_key(str(resume))
+    resume.write_bytes(b'%PDF-1.4 two')
+    changed_resume = ResumeParser(str(taxonomy))._cache_key(str(resume))
+    taxonomy.write_text('{"skills": [{"name": "python", "aliases": []}]}', encoding='utf-8')
+    changed_taxonomy = ResumeParser(str(taxonomy))._cache_key(str(resume))
+    assert len({key, changed_resume, changed_taxonomy}) == 3
+    assert ResumeParser(str(taxonomy))._cache_key(str(tmp_path / "missing.pdf")) is None
+
+
+def test_transcription_key_invalidated_by_audio_and_decoding(tmp_path):
+    pytest.importorskip('faster_whisper')
+    from audio_buffer import AudioBuffer
+    from speech_to_text import SpeechToText
+
+    audio = AudioBuffer(np.zeros(1600, dtype=np.float32), 16000)
+    key = SpeechToText(beam_size=5)._cache_key(audio)
+    assert key == SpeechToText(beam_size=5)._cache_key(AudioBuffer(np.zeros(1600, dtype=np.float32), 16000))
+    assert key != SpeechToText(beam_size=1)._cache_key(audio)
+    assert key != SpeechToText(model_size='small', beam_size=5)._cache_key(audio)
+    assert key != SpeechToText(beam_size=5)._cache_key(AudioBuffer(np.ones(1600, dtype=np.float32), 16000))
+
+
+def test_json_default_serializes_numpy_values():
+    value = {'energy': np.float32(0.5), 'mfcc': np.arange(3), 'count': np.int64(2), 'path': object}
+    decoded = json.loads(json.dumps(value, default=json_default))
+    assert decoded['energy'] == 0.5 and decoded['mfcc'] == [0, 1, 2] and decoded['count'] == 2
+    assert isinstance(decoded['path'], str)
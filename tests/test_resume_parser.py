@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+spacy = pytest.importorskip('spacy')
+
+from resume_parser import SkillGazetteer
+
+
+@pytest.fixture(scope='module')
+def gazetteer():
+    return SkillGazetteer(spacy.blank('es'))
+
+
+def test_shipped_taxonomy_has_unique_terms(gazetteer):
+    assert gazetteer.size > 2000
+
+
+def test_acronyms_match_case_sensitively(gazetteer):
+    assert gazetteer.extract('I do AI and machine learning') == ['artificial intelligence', 'machine learning']
+    assert gazetteer.extract('Experiencia en IA') == ['artificial intelligence']
+    assert 'artificial intelligence' not in gazetteer.extract('send an email, ai ai')
+
+
+def test_former_duplicates_map_to_one_skill(gazetteer):
+    assert gazetteer.extract('PySpark') == ['apache spark']
+    assert gazetteer.extract('Istio') == ['service mesh']
+    assert gazetteer.extract('coaching') == ['mentoring']
+
+
+def test_term_listed_under_two_skills_is_rejected(tmp_path):
+    path = tmp_path / 'taxonomy.json'
+    path.write_text(json.dumps({'skills': [
+        {'name': 'apache spark', 'aliases': ['pyspark']},
+        {'name': 'pyspark', 'aliases': []},
+    ]}), encoding='utf-8')
+    with pytest.raises(ValueError, match='pyspark'):
+        SkillGazetteer(spacy.blank('es'), str(path))
+
+
+def test_exact_form_clashing_with_alias_is_rejected(tmp_path):
+    path = tmp_path / 'taxonomy.json'
+    path.write_text(json.dumps({'skills': [
+        {'name': 'artificial intelligence', 'aliases': [], 'exact': ['AI']},
+        {'name': 'adobe illustrator', 'aliases': ['ai']},
+    ]}), encoding='utf-8')
+    with pytest.raises(ValueError):
+        SkillGazetteer(spacy.blank('es'), str(path))
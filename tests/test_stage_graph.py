@@ -0,0 +1,230 @@
+import threading
+import time
+from functools import partial
+
+import pytest
+
+from stage_graph import Stage, StageGraph
+from tracing import Trace, Tracer
+
+
+def add(a, b):
+    return a + b
+
+
+def sleep_and_return(seconds, value=None):
+    time.sleep(seconds)
+    return value
+
+
+def raise_timeout():
+    raise TimeoutError('socket timed out')
+
+
+@pytest.fixture
+def graphs():
+    created = []
+
+    def make(*args, **kwargs):
+        graph = StageGraph(*args, **kwargs)
+        created.append(graph)
+        return graph
+
+    yield make
+    for graph in created:
+        graph.shutdown(wait=False)
+
+
+def test_runs_stages_in_dependency_order(graphs):
+    graph = graphs([
+        Stage('sum', lambda x, y: x + y, ('x', 'y')),
+        Stage('double', lambda sum: sum * 2, ('sum',)),
+    ], inputs=('x', 'y'))
+    values, errors = graph.run({'x': 1, 'y': 2})
+    assert values['double'] == 6
+    assert errors == {}
+
+
+def test_independent_stages_run_concurrently(graphs):
+    barrier = threading.Barrier(2, timeout=5)
+    graph = graphs([
+        Stage('a', lambda: barrier.wait() is not None),
+        Stage('b', lambda: barrier.wait() is not None),
+    ])
+    values, errors = graph.run({})
+    assert values['a'] and values['b'] and errors == {}
+
+
+def test_rejects_unknown_inputs_and_cycles():
+    with pytest.raises(ValueError):
+        StageGraph([Stage('a', add, ('missing',))])
+    with pytest.raises(ValueError):
+        StageGraph([Stage('a', lambda b: b, ('b',)), Stage('b', lambda a: a, ('a',))])
+
+
+def test_failure_uses_fallback_or_skips_dependents(graphs):
+    def fail():
+        raise RuntimeError("boom")
+
+    graph = graphs([
+        Stage('with_fallback', fail, fallback={'ok': False}),
+        Stage('without_fallback', fail),
+        Stage('dependent', lambda without_fallback: without_fallback, ('without_fallback',)),
+    ])
+    values, errors = graph.run({})
+    assert values['with_fallback'] == {'ok': False}
+    assert errors['with_fallback'] == 'boom'
+    assert 'without_fallback' not in values
+    assert errors['dependent'] == 'skipped: without_fallback failed'
+
+
+def test_fallback_is_copied_per_run(graphs):
+    def fail():
+        raise RuntimeError("boom")
+
+    graph = graphs([Stage('a', fail, fallback={'items': []})])
+    first, _ = graph.run({})
+    first['a']['items'].append(1)
+    second, _ = graph.run({})
+    assert second['a'] == {'items': []}
+
+
+def test_timeout_counts_from_stage_start(graphs):
+    # One worker: the second concurrent run queues behind the first without timing out
+    graph = graphs([Stage('slow', partial(sleep_and_return, 0.3, 'done'), workers=1, timeout=0.5, fallback='late')])
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(graph.run({}))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [values['slow'] for values, _ in results] == ['done', 'done']
+
+
+def test_stuck_thread_stage_does_not_block_later_runs(graphs):
+    release = threading.Event()
+    calls = []
+
+    def stage():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(5)
+        return 'ok'
+
+    graph = graphs([Stage('a', stage, workers=1, timeout=0.2, fallback='timeout')])
+    values, errors = graph.run({})
+    assert values['a'] == 'timeout'
+    assert errors['a'] == 'timed out after 0.2s'
+    start = time.monotonic()
+    values, errors = graph.run({})
+    assert values['a'] == 'ok' and errors == {}
+    assert time.monotonic() - start < 1
+    release.set()
+
+
+def test_stage_pools_default_to_several_workers():
+    assert Stage('a', add).workers >= 2
+    assert Stage('b', add, executor='process').workers >= 1
+    assert Stage('c', add, workers=3).workers == 3
+
+
+def test_process_stage_reports_worker_usage(graphs):
+    graph = graphs([Stage('sum', partial(add, 1), ('b',), executor='process')], inputs=('b',))
+    trace = Trace('test')
+    values, errors = graph.run({'b': 2}, trace)
+    assert values['sum'] == 3 and errors == {}
+    span, = trace.to_dict()['spans']
+    assert span['attributes']['executor'] == 'process'
+    assert span['peak_rss_bytes'] > 0
+    assert 'usage' not in span
+
+
+def test_stuck_process_stage_is_replaced(graphs):
+    graph = graphs([Stage('a', partial(sleep_and_return, 30), executor='process', workers=1,
+                          timeout=1, fallback='timeout')])
+    values, errors = graph.run({})
+    assert values['a'] == 'timeout' and errors['a'] == 'timed out after 1s'
+    graph.stages['a'].func = partial(sleep_and_return, 0, 'ok')
+    values, errors = graph.run({})
+    assert values['a'] == 'ok' and errors == {}
+
+
+def test_process_stage_timeout_excludes_queue_time(graphs):
+    stage = Stage('a', partial(sleep_and_return, 0.2, 'done'), executor='process', workers=1,
+                  timeout=0.8, fallback='timeout')
+    graph = graphs([stage])
+    # Occupy the only worker (including its start-up) for longer than the stage timeout
+    pool, _, _ = graph._process_pool(stage)
+    busy = pool.submit(sleep_and_return, 1.5)
+    values, errors = graph.run({})
+    assert values['a'] == 'done' and errors == {}
+    busy.result()
+
+    stage.func = partial(sleep_and_return, 5, 'done')
+    values, errors = graph.run({})
+    assert values['a'] == 'timeout' and errors['a'] == 'timed out after 0.8s'
+
+
+def test_process_stage_raising_timeout_error_is_not_treated_as_stuck(graphs):
+    graph = graphs([Stage('a', raise_timeout, executor='process', workers=1, timeout=5,
+                          fallback='fallback')])
+    pool = graph._process_pool(graph.stages['a'])[0]
+    values, errors = graph.run({})
+    assert values['a'] == 'fallback' and errors['a'] == 'socket timed out'
+    assert graph._process_pool(graph.stages['a'])[0] is pool
+
+
+def test_timed_out_thread_stage_span_is_exported(graphs):
+    release = threading.Event()
+    finished = threading.Event()
+
+    def stuck():
+        release.wait(5)
+        finished.set()
+
+    class ListExporter:
+        def __init__(self):
+            self.exported = []
+
+        def export(self, trace):
+            self.exported.append(trace.to_dict())
+
+    exporter = ListExporter()
+    graph = graphs([Stage('stuck', stuck, timeout=0.2), Stage('fast', lambda: 1)])
+    with Tracer(1.0, [exporter]).trace('answer') as trace:
+        graph.run({}, trace)
+    spans = {span['name']: span for span in exporter.exported[0]['spans']}
+    assert spans['stuck']['status'] == 'timeout'
+    assert spans['stuck']['error'] == 'timed out after 0.2s'
+    assert spans['stuck']['wall_seconds'] >= 0.2 and spans['stuck']['cpu_seconds'] is None
+    assert spans['fast']['status'] == 'ok'
+
+    # The stage's own span is dropped when its thread finally returns
+    release.set()
+    assert finished.wait(5)
+    time.sleep(0.05)
+    assert len(trace.spans) == 2
+
+
+def test_timed_out_process_stage_span_status(graphs):
+    graph = graphs([Stage('a', partial(sleep_and_return, 30), executor='process', workers=1,
+                          timeout=1, fallback='timeout')])
+    trace = Trace('test')
+    graph.run({}, trace)
+    span, = trace.to_dict()['spans']
+    assert span['status'] == 'timeout'
+
+
+def test_thread_stage_can_trace_process_cpu_time(graphs):
+    def burn_in_helper_thread():
+        helper = threading.Thread(target=lambda: sum(range(3_000_000)))
+        helper.start()
+        helper.join()
+
+    graph = graphs([Stage('native', burn_in_helper_thread, cpu_clock='process'),
+                    Stage('plain', burn_in_helper_thread)])
+    trace = Trace('test')
+    graph.run({}, trace)
+    spans = {span['name']: span for span in trace.to_dict()['spans']}
+    assert spans['native']['cpu_clock'] == 'process' and spans['plain']['cpu_clock'] == 'thread'
+    assert spans['native']['cpu_seconds'] > spans['plain']['cpu_seconds']
@@ -0,0 +1,65 @@
+import threading
+import time
+
+from tracing import PrometheusExporter, Trace, call_measured, measure_usage
+
+
+def spin(seconds):
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        pass
+
+
+def test_thread_clock_excludes_other_threads_process_clock_includes_them():
+    for clock in ('thread', 'process'):
+        worker = threading.Thread(target=spin, args=(0.3,))
+        with measure_usage(clock) as usage:
+            worker.start()
+            worker.join()
+        assert usage['cpu_clock'] == clock
+        if clock == 'thread':
+            assert usage['cpu_seconds'] < 0.1
+        else:
+            assert usage['cpu_seconds'] >= 0.25
+        assert usage['peak_rss_bytes'] > 0
+
+
+def test_call_measured_uses_process_clock():
+    result, usage = call_measured(lambda x: x * 2, {'x': 21})
+    assert result == 42 and usage['cpu_clock'] == 'process'
+
+
+def test_abandoned_span_is_recorded_once():
+    trace = Trace('test')
+    release = threading.Event()
+    spans = []
+
+    def stage():
+        with trace.span('slow', input_bytes=10) as span:
+            spans.append(span)
+            release.wait(5)
+
+    worker = threading.Thread(target=stage)
+    worker.start()
+    while not spans:
+        time.sleep(0.01)
+    trace.abandon(spans[0], 'timed out after 0.1s')
+    release.set()
+    worker.join()
+
+    span, = trace.to_dict()['spans']
+    assert span['status'] == 'timeout' and span['input_bytes'] == 10
+    assert 'abandoned' not in span
+
+    exporter = PrometheusExporter()
+    exporter.export(trace)
+    assert 'interview_stage_errors_total{stage="slow"} 1' in exporter.render()
+
+
+def test_abandon_after_finish_keeps_finished_span():
+    trace = Trace('test')
+    with trace.span('quick') as span:
+        pass
+    trace.abandon(span, 'too late')
+    finished, = trace.to_dict()['spans']
+    assert finished['status'] == 'ok'
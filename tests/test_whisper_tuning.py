@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('faster_whisper')
+
+import whisper_tuning
+from audio_buffer import AudioBuffer
+from result_cache import ResultCache
+from speech_to_text import WHISPER_SAMPLE_RATE, WhisperConfig
+
+CANDIDATES = [WhisperConfig(model_size=size, beam_size=beam) for size, beam in
+              [('small', 5), ('base', 5), ('base', 1), ('tiny', 1)]]
+
+
+@pytest.fixture
+def measure(monkeypatch):
+    """Replace model timing with fixed (rtf, wer) per model name and record what was measured."""
+    measured = []
+    timings = {}
+
+    def fake_measure(config, clip, reference_text=None):
+        measured.append(config.model_name)
+        rtf, wer = timings[config.model_name]
+        return {'config': config.to_dict(), 'rtf': rtf, 'wer': wer if reference_text is not None else None}
+
+    def fake_clip(path=None, reference_text=None, duration=20.0):
+        return AudioBuffer(np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32), WHISPER_SAMPLE_RATE), reference_text
+
+    monkeypatch.setattr(whisper_tuning, 'measure_config', fake_measure)
+    monkeypatch.setattr(whisper_tuning, 'load_reference_clip', fake_clip)
+
+    def configure(*values):
+        timings.update({config.model_name: value for config, value in zip(CANDIDATES, values)})
+        return measured
+    return configure
+
+
+def test_without_transcript_first_candidate_within_budget_wins(measure):
+    measured = measure((0.9, None), (0.4, None), (0.2, None), (0.1, None))
+    chosen, report = whisper_tuning.autotune(0.5, candidates=CANDIDATES)
+    assert chosen.model_name == CANDIDATES[1].model_name
+    assert len(measured) == 2 and [m['meets_target'] for m in report] == [False, True]
+
+
+def test_with_transcript_lowest_wer_within_budget_wins(measure):
+    measured = measure((0.9, 0.05), (0.4, 0.2), (0.2, 0.15), (0.1, 0.4))
+    chosen, report = whisper_tuning.autotune(0.5, candidates=CANDIDATES, reference_text='hola')
+    assert chosen.model_name == CANDIDATES[2].model_name
+    assert len(measured) == len(CANDIDATES)
+
+
+def test_fastest_candidate_when_none_meets_target(measure):
+    measure((3.0, None), (2.0, None), (1.5, None), (None, None))
+    chosen, _ = whisper_tuning.autotune(0.5, candidates=CANDIDATES)
+    assert chosen.model_name == CANDIDATES[2].model_name
+
+
+def test_last_candidate_when_nothing_could_be_measured(measure):
+    measure((None, None), (None, None), (None, None), (None, None))
+    chosen, _ = whisper_tuning.autotune(0.5, candidates=CANDIDATES)
+    assert chosen.model_name == CANDIDATES[-1].model_name
+
+
+def test_decision_is_cached(measure, tmp_path):
+    measured = measure((0.9, None), (0.4, None), (0.2, None), (0.1, None))
+    cache = ResultCache(str(tmp_path / "results.sqlite3"))
+    first, _ = whisper_tuning.autotune(0.5, candidates=CANDIDATES, cache=cache)
+    second, report = whisper_tuning.autotune(0.5, candidates=CANDIDATES, cache=cache)
+    assert second.to_dict() == first.to_dict()
+    assert len(measured) == 2 and len(report) == 2
+    whisper_tuning.autotune(0.3, candidates=CANDIDATES, cache=cache)
+    assert len(measured) > 2
+
+
+def test_word_error_rate_ignores_case_and_punctuation():
+    assert whisper_tuning.word_error_rate('he was not an ill disposed young man',
+                                          'He was not an ill-disposed young man.') == 0.0
+    assert whisper_tuning.word_error_rate('a b c d', 'a x c') == 0.5
+    assert whisper_tuning.word_error_rate('', '') == 0.0
+
+
+def test_shipped_reference_clip_has_transcript():
+    pytest.importorskip('librosa')
+    clip, transcript = whisper_tuning.load_reference_clip()
+    assert clip.sample_rate == WHISPER_SAMPLE_RATE and 20 < clip.duration < 30
+    assert transcript.startswith('and mister john dashwood')
+    assert whisper_tuning.load_reference_clip(reference_text='x')[1] == transcript
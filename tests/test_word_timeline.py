@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from word_timeline import WordTimeline, normalize_token
+
+
+def words(*items):
+    return [SimpleNamespace(word=f" {word}", start=start, end=end, probability=0.9) for word, start, end in items]
+
+
+def test_from_words_shares_the_token_table():
+    timeline = WordTimeline.from_words(words(('hola', 0.0, 0.4), ('eh', 0.5, 0.6), ('hola', 1.0, 1.4)))
+    assert timeline.tokens == ['hola', 'eh']
+    assert timeline.token_ids.tolist() == [0, 1, 0]
+    assert timeline.words == ['hola', 'eh', 'hola']
+    assert len(timeline) == 3
+
+
+def test_pauses_and_fluency_metrics():
+    timeline = WordTimeline.from_words(words(('Um,', 0.0, 0.5), ('I', 0.6, 0.8), ('think', 2.0, 2.5), ('so', 2.5, 3.0)))
+    np.testing.assert_allclose(timeline.pauses(), [0.1, 1.2, 0.0], atol=1e-6)
+    metrics = timeline.fluency_metrics()
+    assert metrics['word_count'] == 4
+    assert metrics['words_per_minute'] == pytest.approx(80.0)
+    assert metrics['long_silences'] == 1
+    assert metrics['filler_count'] == 1
+    assert metrics['filler_rate'] == pytest.approx(0.25)
+    assert metrics['pause_histogram'] == {'<0.25s': 2, '<0.5s': 0, '<1s': 0, '<2s': 1, '>=2s': 0}
+    assert metrics['mean_word_probability'] == pytest.approx(0.9)
+
+
+def test_empty_timeline_metrics():
+    metrics = WordTimeline.empty().fluency_metrics()
+    assert metrics['word_count'] == 0 and metrics['mean_word_probability'] is None
+    assert len(WordTimeline.empty().pauses()) == 0
+
+
+def test_from_segments_splits_duration_evenly():
+    timeline = WordTimeline.from_segments([{'start': 0.0, 'end': 2.0, 'text': 'uno dos'},
+                                           {'start': 3.0, 'end': 3.0, 'text': ' '}])
+    assert timeline.words == ['uno', 'dos']
+    np.testing.assert_allclose(timeline.start, [0.0, 1.0])
+    np.testing.assert_allclose(timeline.end, [1.0, 2.0])
+    assert np.isnan(timeline.probability).all()
+    assert timeline.fluency_metrics()['mean_word_probability'] is None
+
+
+def test_concatenate_merges_token_tables():
+    first = WordTimeline.from_words(words(('a', 0.0, 0.1), ('b', 0.2, 0.3)))
+    second = WordTimeline.from_words(words(('b', 1.0, 1.1), ('c', 1.2, 1.3)))
+    joined = WordTimeline.concatenate([first, WordTimeline.empty(), second])
+    assert joined.tokens == ['a', 'b', 'c']
+    assert joined.words == ['a', 'b', 'b', 'c']
+    assert len(WordTimeline.concatenate([])) == 0
+
+
+def test_dict_round_trip():
+    timeline = WordTimeline.from_words(words(('hola', 0.0, 0.4), ('mundo', 0.5, 0.9)))
+    restored = WordTimeline.from_dict(timeline.to_dict())
+    assert restored.words == timeline.words
+    np.testing.assert_allclose(restored.end, timeline.end)
+    assert len(WordTimeline.from_dict(None)) == 0
+
+
+def test_normalize_token():
+    assert normalize_token('¿Hola?') == 'hola'
+    assert normalize_token("don't") == "don't"
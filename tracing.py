@@ -0,0 +1,378 @@
+import json
+import os
+import random
+import resource
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_TRACE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "self_interview", "traces.jsonl")
+
+# Upper bounds (seconds) of the Prometheus stage latency histogram
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def current_rss_bytes() -> int:
+    """Current resident set size of this process in bytes (the peak where /proc is not available)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+@contextmanager
+def measure_usage(cpu_clock: str = 'thread') -> Iterator[Dict]:
+    """
+    Measure CPU time and the RSS of the process around a block.
+    Args:
+        cpu_clock: 'thread' counts only the calling thread, so concurrent stages in one process
+            are told apart, but misses work a library does on its own native threads
+            (CTranslate2, BLAS); 'process' counts every thread of the process
+    Returns:
+        Dictionary filled in on exit with cpu_seconds, cpu_clock, rss_delta_bytes (growth of
+        the current RSS) and peak_rss_bytes (peak RSS of the process so far)
+    """
+    clock = time.process_time if cpu_clock == 'process' else time.thread_time
+    usage = {}
+    rss_before = current_rss_bytes()
+    cpu_before = clock()
+    try:
+        yield usage
+    finally:
+        usage['cpu_seconds'] = clock() - cpu_before
+        usage['cpu_clock'] = cpu_clock
+        usage['rss_delta_bytes'] = current_rss_bytes() - rss_before
+        usage['peak_rss_bytes'] = peak_rss_bytes()
+
+
+def call_measured(func: Callable, kwargs: Dict) -> Tuple[Any, Dict]:
+    """
+    Call func(**kwargs) under measure_usage(); submitted to worker processes so a span
+    can report the CPU time and memory of the process that did the work. A worker runs one
+    task at a time, so its whole process CPU time is counted, native library threads included.
+    Returns:
+        (result, usage dictionary)
+    """
+    with measure_usage('process') as usage:
+        result = func(**kwargs)
+    return result, usage
+
+
+class Trace:
+    def __init__(self, name: str, attributes: Optional[Dict] = None):
+        """
+        One traced request (e.g. the analysis of one answer) made of stage spans.
+        Spans may be recorded from several threads.
+        Args:
+            name: Trace name
+            attributes: Extra fields stored with the trace
+        """
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.spans = []
+        self.started_at = datetime.now().isoformat()
+        self.wall_seconds = None
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, input_bytes: int = 0, cpu_clock: str = 'thread', **attributes) -> Iterator[Dict]:
+        """
+        Measure one stage: wall time, input size, CPU time and RSS of its process
+        (see measure_usage). A stage run in another process stores that
+        process's call_measured usage under span['usage'], which replaces the local
+        measurements. Exceptions are recorded and re-raised; a stage may set a more specific
+        status (e.g. 'timeout') before raising.
+        Args:
+            name: Stage name
+            input_bytes: Bytes of input the stage processes
+            cpu_clock: CPU time of the calling 'thread' or of the whole 'process'
+            attributes: Extra fields stored with the span
+        Returns:
+            The span dictionary, which the stage may add attributes to
+        """
+        span = {
+            'name': name,
+            'offset_seconds': time.perf_counter() - self._start,
+            'input_bytes': int(input_bytes),
+            'status': 'ok',
+            'attributes': attributes
+        }
+        start = time.perf_counter()
+        try:
+            with measure_usage(cpu_clock) as usage:
+                yield span
+        except BaseException as e:
+            if span['status'] == 'ok':
+                span['status'] = 'error'
+            span['error'] = str(e)
+            raise
+        finally:
+            span['wall_seconds'] = time.perf_counter() - start
+            span.update(span.pop('usage', None) or usage)
+            with self._lock:
+                # An abandoned stage already has its span
+                if not span.pop('abandoned', False):
+                    self.spans.append(span)
+
+    def abandon(self, span: Dict, error: str, status: str = 'timeout'):
+        """
+        Record the span of a stage that is still running but no longer awaited (a timed out
+        thread), so it is exported with the trace; the stage's own span is dropped when it ends.
+        CPU time and RSS cannot be measured from another thread and are left as None.
+        Args:
+            span: Span dictionary yielded by span()
+            error: Reason the stage was abandoned
+            status: Span status
+        """
+        with self._lock:
+            if any(recorded is span for recorded in self.spans):
+                # The stage finished in the meantime
+                return
+            record = dict(span, status=status, error=error,
+                          wall_seconds=time.perf_counter() - self._start - span['offset_seconds'],
+                          cpu_seconds=None, rss_delta_bytes=None, peak_rss_bytes=None)
+            span['abandoned'] = True
+            self.spans.append(record)
+
+    def finish(self):
+        """Record the total wall time of the trace."""
+        self.wall_seconds = time.perf_counter() - self._start
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable trace with its spans in start order."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span['offset_seconds'])
+        return {
+            'trace_id': self.trace_id,
+            'name': self.name,
+            'started_at': self.started_at,
+            'wall_seconds': self.wall_seconds,
+            'attributes': self.attributes,
+            'spans': spans
+        }
+
+
+class NoopTrace:
+    """Stand-in for unsampled requests; spans cost one context manager call."""
+    trace_id = None
+
+    @contextmanager
+    def span(self, name: str, input_bytes: int = 0, cpu_clock: str = 'thread', **attributes) -> Iterator[Dict]:
+        yield {}
+
+    def abandon(self, span: Dict, error: str, status: str = 'timeout'):
+        """Nothing to record."""
+
+    def finish(self):
+        """Nothing to record."""
+
+
+class JsonlExporter:
+    def __init__(self, path: str = DEFAULT_TRACE_PATH):
+        """Append every finished trace as one JSON line."""
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def export(self, trace: Trace):
+        """Append the trace to the JSONL file."""
+        line = json.dumps(trace.to_dict(), default=str)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+
+class PrometheusExporter:
+    def __init__(self, path: Optional[str] = None, prefix: str = "interview"):
+        """
+        Aggregate finished traces into Prometheus metrics, exposed in the text format
+        through a file (for node_exporter's textfile collector) and/or an HTTP endpoint.
+        Args:
+            path: Metrics file rewritten after every trace (None to skip)
+            prefix: Metric name prefix
+        """
+        self.path = path
+        self.prefix = prefix
+        self.sample_rate = 1.0
+        self._lock = threading.Lock()
+        self._server = None
+        self._traces = {}
+        self._stages = {}
+
+    def export(self, trace: Trace):
+        """Add the trace's spans to the aggregated metrics."""
+        with self._lock:
+            self._traces[trace.name] = self._traces.get(trace.name, 0) + 1
+            for span in trace.spans:
+                stats = self._stages.setdefault(span['name'], {
+                    'count': 0,
+                    'errors': 0,
+                    'seconds': 0.0,
+                    'cpu_seconds': 0.0,
+                    'input_bytes': 0,
+                    'buckets': [0] * len(LATENCY_BUCKETS)
+                })
+                stats['count'] += 1
+                stats['errors'] += span['status'] != 'ok'
+                stats['seconds'] += span['wall_seconds']
+                stats['cpu_seconds'] += span['cpu_seconds'] or 0.0
+                stats['input_bytes'] += span['input_bytes']
+                for i, bound in enumerate(LATENCY_BUCKETS):
+                    if span['wall_seconds'] <= bound:
+                        stats['buckets'][i] += 1
+        if self.path:
+            self.write(self.path)
+
+    def render(self) -> str:
+        """Current metrics in the Prometheus text exposition format."""
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_trace_sample_rate Fraction of requests traced.",
+            f"# TYPE {p}_trace_sample_rate gauge",
+            f"{p}_trace_sample_rate {self.sample_rate}",
+            f"# HELP {p}_traces_total Traced requests.",
+            f"# TYPE {p}_traces_total counter",
+        ]
+        with self._lock:
+            lines += [f'{p}_traces_total{{trace="{name}"}} {count}' for name, count in self._traces.items()]
+            lines += [
+                f"# HELP {p}_stage_seconds Wall time per analysis stage.",
+                f"# TYPE {p}_stage_seconds histogram",
+            ]
+            for stage, stats in self._stages.items():
+                for bound, count in zip(LATENCY_BUCKETS, stats['buckets']):
+                    lines.append(f'{p}_stage_seconds_bucket{{stage="{stage}",le="{bound:g}"}} {count}')
+                lines.append(f'{p}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {stats["count"]}')
+                lines.append(f'{p}_stage_seconds_sum{{stage="{stage}"}} {stats["seconds"]:.6f}')
+                lines.append(f'{p}_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+            for metric, key, help_text in (
+                ('stage_cpu_seconds_total', 'cpu_seconds', "CPU time per analysis stage."),
+                ('stage_input_bytes_total', 'input_bytes', "Input bytes processed per analysis stage."),
+                ('stage_errors_total', 'errors', "Failed runs per analysis stage."),
+            ):
+                lines += [f"# HELP {p}_{metric} {help_text}", f"# TYPE {p}_{metric} counter"]
+                lines += [f'{p}_{metric}{{stage="{stage}"}} {stats[key]}' for stage, stats in self._stages.items()]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """Atomically rewrite the metrics file."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+    def serve(self, port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+        """
+        Serve /metrics from a daemon thread.
+        Args:
+            port: Port to listen on
+            host: Interface to bind
+        Returns:
+            The running server
+        """
+        if self._server is not None:
+            return self._server
+        exporter = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+        return self._server
+
+
+class Tracer:
+    def __init__(self, sample_rate: float = 1.0, exporters: Optional[List] = None):
+        """
+        Create traces for a sampled fraction of requests and hand finished traces to exporters.
+        Args:
+            sample_rate: Fraction of requests traced (0 disables tracing)
+            exporters: Objects with an export(trace) method
+        """
+        self.sample_rate = sample_rate
+        self.exporters = list(exporters or [])
+        for exporter in self.exporters:
+            if isinstance(exporter, PrometheusExporter):
+                exporter.sample_rate = sample_rate
+
+    @contextmanager
+    def trace(self, name: str, **attributes) -> Iterator:
+        """
+        Trace one request; yields a Trace, or a NoopTrace when the request is not sampled.
+        Args:
+            name: Trace name
+            attributes: Extra fields stored with the trace
+        """
+        if not self.exporters or self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            yield NoopTrace()
+            return
+
+        trace = Trace(name, attributes)
+        try:
+            yield trace
+        finally:
+            trace.finish()
+            for exporter in self.exporters:
+                try:
+                    exporter.export(trace)
+                except Exception as e:
+                    print(f"Error exporting trace: {str(e)}")
+
+
+_default_tracer = None
+_default_tracer_lock = threading.Lock()
+
+
+def default_tracer() -> Tracer:
+    """
+    Process-wide tracer configured from the environment:
+    INTERVIEW_TRACE_SAMPLE_RATE (default 0, tracing off), INTERVIEW_TRACE_PATH (JSONL traces),
+    INTERVIEW_METRICS_PATH (Prometheus text file) and INTERVIEW_METRICS_PORT (/metrics endpoint).
+    """
+    global _default_tracer
+    with _default_tracer_lock:
+        if _default_tracer is None:
+            sample_rate = float(os.environ.get('INTERVIEW_TRACE_SAMPLE_RATE', 0))
+            exporters = []
+            if sample_rate > 0:
+                try:
+                    exporters.append(JsonlExporter(os.environ.get('INTERVIEW_TRACE_PATH', DEFAULT_TRACE_PATH)))
+                    metrics_path = os.environ.get('INTERVIEW_METRICS_PATH')
+                    metrics_port = os.environ.get('INTERVIEW_METRICS_PORT')
+                    if metrics_path or metrics_port:
+                        prometheus = PrometheusExporter(metrics_path)
+                        if metrics_port:
+                            prometheus.serve(int(metrics_port))
+                        exporters.append(prometheus)
+                except Exception as e:
+                    print(f"Tracing exporters not available: {str(e)}")
+            _default_tracer = Tracer(sample_rate, exporters)
+        return _default_tracer
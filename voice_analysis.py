@@ -1,32 +1,55 @@
 import librosa
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Union
 import os
+from audio_buffer import AudioBuffer
 
 class VoiceAnalyzer:
-    def __init__(self):
+    def __init__(self, n_fft: int = 2048, hop_length: int = 512, n_mels: int = 128,
+                 fmin: float = 60.0, fmax: float = 500.0):
+        """
+        Initialize the voice analyzer.
+        Args:
+            n_fft: FFT size of the shared STFT
+            hop_length: Hop between STFT frames in samples
+            n_mels: Number of mel bands derived from the STFT
+            fmin: Lowest pitch considered, in Hz
+            fmax: Highest pitch considered, in Hz
+        """
         self.sample_rate = 22050  # Standard sample rate
         self.n_mfcc = 13  # Number of MFCC features
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_mels = n_mels
+        self.fmin = fmin
+        self.fmax = fmax
+        self.harmonics = 3  # Harmonics multiplied in the pitch estimator
 
-    def extract_features(self, audio_path: str) -> Dict:
+    def extract_features(self, audio: Union[str, AudioBuffer]) -> Dict:
         """
-        Extract audio features from the audio file.
-        Returns a dictionary containing various audio features.
+        Extract audio features from an audio file or an in-memory AudioBuffer.
+        Buffers are analyzed at their own sample rate without copying.
+        Returns a dictionary containing various audio features, plus per-frame
+        time series under 'frames'.
         """
-        if not os.path.exists(audio_path):
-            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+        if not isinstance(audio, AudioBuffer) and not os.path.exists(audio):
+            raise FileNotFoundError(f"Audio file not found: {audio}")
 
         try:
-            # Load audio file
-            y, sr = librosa.load(audio_path, sr=self.sample_rate)
+            # Decode file paths at the analyzer's sample rate
+            buffer = AudioBuffer.load(audio, self.sample_rate)
+            y, sr = buffer.samples, buffer.sample_rate
+            
+            frames = self.extract_frame_features(y, sr)
+            voiced_pitch = frames['pitch'][~np.isnan(frames['pitch'])]
             
-            # Extract features
             features = {
-                'mfcc': self._extract_mfcc(y, sr),
-                'pitch': self._extract_pitch(y, sr),
-                'energy': self._extract_energy(y),
-                'tempo': self._extract_tempo(y, sr),
-                'duration': librosa.get_duration(y=y, sr=sr)
+                'mfcc': np.mean(frames['mfcc'], axis=1),
+                'pitch': float(np.mean(voiced_pitch)) if len(voiced_pitch) else 0.0,
+                'energy': float(np.mean(frames['rms'])),
+                'tempo': self._extract_tempo(frames['onset_envelope'], sr),
+                'duration': librosa.get_duration(y=y, sr=sr),
+                'frames': frames
             }
             
             return features
@@ -35,27 +58,75 @@ class VoiceAnalyzer:
             print(f"Error analyzing audio: {str(e)}")
             return {}
 
-    def _extract_mfcc(self, y: np.ndarray, sr: int) -> np.ndarray:
-        """Extract MFCC features."""
-        mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=self.n_mfcc)
-        return np.mean(mfccs, axis=1)
+    def extract_frame_features(self, y: np.ndarray, sr: int) -> Dict[str, np.ndarray]:
+        """
+        Compute one STFT and derive every per-frame feature from it.
+        Args:
+            y: Mono audio samples
+            sr: Sample rate
+        Returns:
+            Dictionary of numpy arrays: 'times', 'mfcc' (n_mfcc x frames), 'rms',
+            'onset_envelope' and 'pitch' (Hz, NaN for unvoiced frames)
+        """
+        magnitude = np.abs(librosa.stft(y, n_fft=self.n_fft, hop_length=self.hop_length))
+        mel = librosa.feature.melspectrogram(S=magnitude ** 2, sr=sr, n_mels=self.n_mels)
+        log_mel = librosa.power_to_db(mel)
+
+        # RMS from the raw frames: the Hann-windowed STFT would scale it by about
+        # 0.6 and shift the absolute energy thresholds used downstream
+        rms = librosa.feature.rms(y=y, frame_length=self.n_fft, hop_length=self.hop_length)[0]
+        return {
+            'times': librosa.frames_to_time(np.arange(magnitude.shape[1]), sr=sr, hop_length=self.hop_length),
+            'mfcc': librosa.feature.mfcc(S=log_mel, n_mfcc=self.n_mfcc),
+            'rms': rms,
+            'onset_envelope': librosa.onset.onset_strength(S=log_mel, sr=sr, hop_length=self.hop_length),
+            'pitch': self._estimate_pitch(magnitude, sr, rms)
+        }
+
+    def _estimate_pitch(self, magnitude: np.ndarray, sr: int, rms: np.ndarray) -> np.ndarray:
+        """
+        Estimate the fundamental frequency per frame with a harmonic product spectrum.
+        Args:
+            magnitude: STFT magnitude (bins x frames)
+            sr: Sample rate
+            rms: RMS energy per frame, used to mark quiet frames as unvoiced
+        Returns:
+            Pitch in Hz per frame, NaN where the frame is unvoiced
+        """
+        num_bins = magnitude.shape[0] // self.harmonics
+        log_hps = np.log(magnitude[:num_bins] + 1e-10)
+        for harmonic in range(2, self.harmonics + 1):
+            log_hps += np.log(magnitude[::harmonic][:num_bins] + 1e-10)
+
+        bin_hz = sr / self.n_fft
+        low = max(1, int(np.floor(self.fmin / bin_hz)))
+        high = min(num_bins - 2, int(np.ceil(self.fmax / bin_hz)))
+        if high <= low:
+            return np.full(magnitude.shape[1], np.nan)
+
+        band = log_hps[low:high + 1]
+        peak = np.argmax(band, axis=0)
+        columns = np.arange(band.shape[1])
 
-    def _extract_pitch(self, y: np.ndarray, sr: int) -> float:
-        """Extract pitch (fundamental frequency)."""
-        pitches, magnitudes = librosa.piptrack(y=y, sr=sr)
-        pitch_mean = np.mean(pitches[magnitudes > np.median(magnitudes)])
-        return float(pitch_mean)
+        # Parabolic interpolation around the peak for sub-bin resolution
+        left = log_hps[low + peak - 1, columns]
+        center = band[peak, columns]
+        right = log_hps[low + peak + 1, columns]
+        denominator = left - 2 * center + right
+        curved = np.abs(denominator) > 1e-12
+        offset = np.where(curved, 0.5 * (left - right) / np.where(curved, denominator, 1.0), 0.0)
+        pitch = (low + peak + np.clip(offset, -0.5, 0.5)) * bin_hz
 
-    def _extract_energy(self, y: np.ndarray) -> float:
-        """Extract energy (RMS)."""
-        return float(np.mean(librosa.feature.rms(y=y)))
+        # Frames well below the clip's loudness are treated as unvoiced
+        voiced = rms > 0.1 * np.max(rms) if len(rms) else np.zeros(0, dtype=bool)
+        pitch[~voiced] = np.nan
+        return pitch
 
-    def _extract_tempo(self, y: np.ndarray, sr: int) -> float:
-        """Extract tempo (BPM)."""
+    def _extract_tempo(self, onset_env: np.ndarray, sr: int) -> float:
+        """Extract tempo (BPM) from the onset envelope."""
         try:
-            onset_env = librosa.onset.onset_strength(y=y, sr=sr)
-            # Use the updated API for librosa >= 0.10.0
-            tempo = librosa.feature.rhythm.tempo(onset_envelope=onset_env, sr=sr)
+            # librosa.feature.tempo is the librosa 0.10 location of the tempo estimator
+            tempo = librosa.feature.tempo(onset_envelope=onset_env, sr=sr, hop_length=self.hop_length)
             return float(tempo[0]) if len(tempo) > 0 else 120.0
         except Exception:
             # Fallback to default tempo if extraction fails
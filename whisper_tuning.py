@@ -0,0 +1,199 @@
+import os
+import platform
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from audio_buffer import AudioBuffer
+from model_registry import registry
+from result_cache import ResultCache, hash_buffer
+from sample_media import reference_speech, synthetic_speech
+from speech_to_text import WHISPER_SAMPLE_RATE, SpeechToText, WhisperConfig
+
+# Candidate (model size, compute type, beam size), most accurate first
+DEFAULT_CANDIDATES = [
+    ("small", "int8", 5),
+    ("small", "int8", 1),
+    ("base", "int8", 5),
+    ("base", "int8", 1),
+    ("tiny", "int8", 5),
+    ("tiny", "int8", 1),
+]
+
+_tuned = {}
+_tuned_lock = threading.Lock()
+
+
+def default_candidates(cpu_threads: Optional[int] = None, num_workers: int = 1,
+                       language: Optional[str] = None) -> List[WhisperConfig]:
+    """
+    Candidate configurations for auto-tuning, ordered by expected accuracy.
+    Args:
+        cpu_threads: Threads per model worker (defaults to the CPU count divided by the workers)
+        num_workers: Model workers
+        language: Language to pin in every candidate
+    Returns:
+        List of WhisperConfig
+    """
+    if cpu_threads is None:
+        cpu_threads = max(1, (os.cpu_count() or 1) // num_workers)
+    return [
+        WhisperConfig(model_size=size, compute_type=compute_type, beam_size=beam_size,
+                      cpu_threads=cpu_threads, num_workers=num_workers, language=language)
+        for size, compute_type, beam_size in DEFAULT_CANDIDATES
+    ]
+
+
+def load_reference_clip(path: Optional[str] = None, reference_text: Optional[str] = None,
+                        duration: float = 20.0) -> Tuple[AudioBuffer, Optional[str]]:
+    """
+    Audio used to time the candidates: the given recording, INTERVIEW_WHISPER_REFERENCE,
+    the speech clip shipped in samples/ (with its transcript), or a synthetic speech-like
+    signal when none is available.
+    Args:
+        path: Reference recording
+        reference_text: Transcript of the given recording
+        duration: Length of the synthetic clip in seconds
+    Returns:
+        (AudioBuffer at 16 kHz, transcript or None when it is unknown)
+    """
+    path = path or os.environ.get('INTERVIEW_WHISPER_REFERENCE')
+    if path and os.path.exists(path):
+        return AudioBuffer.from_file(path, WHISPER_SAMPLE_RATE), reference_text
+    try:
+        speech_path, transcript = reference_speech()
+        return AudioBuffer.from_file(speech_path, WHISPER_SAMPLE_RATE), transcript
+    except Exception as e:
+        print(f"Reference speech clip not available, using a synthetic clip: {str(e)}")
+    return AudioBuffer(synthetic_speech(duration, WHISPER_SAMPLE_RATE), WHISPER_SAMPLE_RATE), None
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level edit distance divided by the reference length, ignoring case and punctuation."""
+    from rapidfuzz.distance import Levenshtein
+    # Hyphens and punctuation separate words ("ill-disposed" matches "ill disposed")
+    reference_words = re.findall(r"\w+(?:'\w+)?", reference.lower())
+    hypothesis_words = re.findall(r"\w+(?:'\w+)?", hypothesis.lower())
+    if not reference_words:
+        return 0.0 if not hypothesis_words else 1.0
+    return Levenshtein.distance(reference_words, hypothesis_words) / len(reference_words)
+
+
+def measure_config(config: WhisperConfig, clip: AudioBuffer, reference_text: Optional[str] = None) -> Dict:
+    """
+    Time one configuration on the reference clip (model loading and a warm-up pass excluded).
+    Args:
+        config: Configuration to measure
+        clip: Reference audio
+        reference_text: Expected transcript, to compute the word error rate
+    Returns:
+        Dictionary with the real-time factor, word error rate and any error
+    """
+    stt = SpeechToText(config=config)
+    if not stt.model_available:
+        return {'config': config.to_dict(), 'rtf': None, 'wer': None, 'error': str(stt._load_error)}
+
+    # The first call pays for lazy allocations inside CTranslate2
+    stt.transcribe_samples(clip.samples[:WHISPER_SAMPLE_RATE], clip.sample_rate)
+    start = time.perf_counter()
+    result = stt.transcribe_samples(clip.samples, clip.sample_rate)
+    elapsed = time.perf_counter() - start
+    return {
+        'config': config.to_dict(),
+        'rtf': elapsed / clip.duration if clip.duration else None,
+        'wer': word_error_rate(reference_text, result['text']) if reference_text is not None else None
+    }
+
+
+def autotune(target_rtf: float = 0.5, candidates: Optional[List[WhisperConfig]] = None,
+             reference_path: Optional[str] = None, reference_text: Optional[str] = None,
+             cache: Optional[ResultCache] = None) -> Tuple[WhisperConfig, List[Dict]]:
+    """
+    Pick the most accurate configuration whose real-time factor meets the target on this machine.
+    With a reference transcript (the shipped clip has one), every candidate is measured and the
+    lowest word error rate within budget wins; without one, candidates are tried in order and
+    the first one within budget wins. If none meets the target, the fastest one is used.
+    Args:
+        target_rtf: Maximum processing time per second of audio
+        candidates: Configurations ordered by expected accuracy (default_candidates() by default)
+        reference_path: Reference recording (see load_reference_clip)
+        reference_text: Transcript of the reference recording
+        cache: Result cache for the decision, so later starts on the same machine skip the benchmark
+    Returns:
+        (chosen configuration, per-candidate measurements)
+    """
+    candidates = candidates or default_candidates()
+    clip, reference_text = load_reference_clip(reference_path, reference_text)
+
+    cache_key = None
+    if cache is not None:
+        cache_key = ResultCache.make_key('whisper_autotune', hash_buffer(clip.samples), {
+            'target_rtf': target_rtf,
+            'candidates': [config.to_dict() for config in candidates],
+            'reference_text': reference_text,
+            'machine': [platform.machine(), platform.processor(), os.cpu_count()]
+        })
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return WhisperConfig.from_dict(cached['config']), cached['report']
+
+    report = []
+    chosen = None
+    for config in candidates:
+        measurement = measure_config(config, clip, reference_text)
+        measurement['meets_target'] = measurement['rtf'] is not None and measurement['rtf'] <= target_rtf
+        report.append(measurement)
+        print(f"Whisper {config.model_size}/{config.compute_type}/beam={config.beam_size}: "
+              f"rtf={measurement['rtf']}, wer={measurement['wer']}")
+        if measurement['meets_target'] and reference_text is None:
+            chosen = config
+            break
+
+    if chosen is None:
+        within_budget = [(m['wer'], i) for i, m in enumerate(report) if m['meets_target']]
+        measured = [(m['rtf'], i) for i, m in enumerate(report) if m['rtf'] is not None]
+        if within_budget:
+            chosen = candidates[min(within_budget)[1]]
+        elif measured:
+            chosen = candidates[min(measured)[1]]
+        else:
+            chosen = candidates[-1]
+
+    # Free the models that lost
+    for config in candidates:
+        if config.model_name != chosen.model_name:
+            registry.evict(config.model_name)
+
+    if cache_key:
+        cache.put(cache_key, {'config': chosen.to_dict(), 'report': report})
+    return chosen, report
+
+
+def tuned_config(target_rtf: float, cache: Optional[ResultCache] = None, **kwargs) -> WhisperConfig:
+    """Auto-tune once per process and return the chosen configuration."""
+    key = (target_rtf, repr(sorted(kwargs.items())))
+    with _tuned_lock:
+        if key not in _tuned:
+            _tuned[key] = autotune(target_rtf, cache=cache, **kwargs)[0]
+        return _tuned[key]
+
+
+def whisper_config_from_env(cache: Optional[ResultCache] = None) -> WhisperConfig:
+    """
+    Configuration for the app: auto-tuned when INTERVIEW_WHISPER_AUTOTUNE=1
+    (target INTERVIEW_WHISPER_TARGET_RTF, default 0.5), otherwise WhisperConfig.from_env().
+    """
+    config = WhisperConfig.from_env()
+    if os.environ.get('INTERVIEW_WHISPER_AUTOTUNE', '0') != '1':
+        return config
+    try:
+        return tuned_config(
+            float(os.environ.get('INTERVIEW_WHISPER_TARGET_RTF', 0.5)),
+            cache=cache,
+            reference_text=os.environ.get('INTERVIEW_WHISPER_REFERENCE_TEXT'),
+            candidates=default_candidates(language=config.language, num_workers=config.num_workers)
+        )
+    except Exception as e:
+        print(f"Error auto-tuning Whisper, using the configured model: {str(e)}")
+        return config
@@ -0,0 +1,180 @@
+import re
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# Hesitation sounds counted as fillers (Spanish and English transcriptions)
+DEFAULT_FILLERS = frozenset({'eh', 'ehm', 'em', 'emm', 'mm', 'mmm', 'hm', 'hmm', 'ah', 'uh', 'um', 'uhm', 'umm'})
+
+# Upper edges (seconds) of the pause histogram bins; the last bin is open-ended
+DEFAULT_PAUSE_BINS = (0.25, 0.5, 1.0, 2.0)
+
+
+def normalize_token(token: str) -> str:
+    """Lowercase a word and strip surrounding punctuation."""
+    return re.sub(r'^\W+|\W+$', '', token.lower())
+
+
+class WordTimeline:
+    def __init__(self, tokens: Sequence[str], token_ids: np.ndarray, start: np.ndarray,
+                 end: np.ndarray, probability: np.ndarray):
+        """
+        Word-level transcript stored as parallel arrays instead of one object per word.
+        Args:
+            tokens: Token table (each distinct word once, as transcribed)
+            token_ids: Index into the token table for every word
+            start: Word start times in seconds
+            end: Word end times in seconds
+            probability: Word probabilities from the decoder
+        """
+        self.tokens = list(tokens)
+        self.token_ids = np.asarray(token_ids, dtype=np.int32)
+        self.start = np.asarray(start, dtype=np.float32)
+        self.end = np.asarray(end, dtype=np.float32)
+        self.probability = np.asarray(probability, dtype=np.float32)
+
+    @classmethod
+    def from_words(cls, words: Iterable) -> 'WordTimeline':
+        """
+        Build a timeline from faster-whisper Word objects (word, start, end, probability).
+        Args:
+            words: Iterable of word objects with timestamps
+        Returns:
+            WordTimeline
+        """
+        table = {}
+        token_ids, starts, ends, probabilities = [], [], [], []
+        for word in words:
+            token = word.word.strip()
+            token_ids.append(table.setdefault(token, len(table)))
+            starts.append(word.start)
+            ends.append(word.end)
+            probabilities.append(word.probability)
+        return cls(list(table), token_ids, starts, ends, probabilities)
+
+    @classmethod
+    def from_segments(cls, segments: List[Dict]) -> 'WordTimeline':
+        """
+        Approximate word timings by splitting each segment's duration evenly between its
+        words; used for transcripts produced without word timestamps.
+        Args:
+            segments: Segment dictionaries with 'start', 'end' and 'text'
+        Returns:
+            WordTimeline with probability set to NaN
+        """
+        table = {}
+        token_ids, starts, ends = [], [], []
+        for segment in segments:
+            words = segment['text'].split()
+            if not words:
+                continue
+            edges = np.linspace(segment['start'], segment['end'], len(words) + 1)
+            token_ids.extend(table.setdefault(word, len(table)) for word in words)
+            starts.append(edges[:-1])
+            ends.append(edges[1:])
+        if not token_ids:
+            return cls.empty()
+        return cls(list(table), token_ids, np.concatenate(starts), np.concatenate(ends),
+                   np.full(len(token_ids), np.nan))
+
+    @classmethod
+    def empty(cls) -> 'WordTimeline':
+        """Timeline without words."""
+        return cls([], np.zeros(0), np.zeros(0), np.zeros(0), np.zeros(0))
+
+    @classmethod
+    def concatenate(cls, timelines: Iterable['WordTimeline']) -> 'WordTimeline':
+        """Join timelines (e.g. streamed utterances) into one, merging their token tables."""
+        table = {}
+        token_ids, starts, ends, probabilities = [], [], [], []
+        for timeline in timelines:
+            remap = np.array([table.setdefault(token, len(table)) for token in timeline.tokens], dtype=np.int32)
+            token_ids.append(remap[timeline.token_ids] if len(timeline) else timeline.token_ids)
+            starts.append(timeline.start)
+            ends.append(timeline.end)
+            probabilities.append(timeline.probability)
+        if not token_ids:
+            return cls.empty()
+        return cls(list(table), np.concatenate(token_ids), np.concatenate(starts),
+                   np.concatenate(ends), np.concatenate(probabilities))
+
+    def to_dict(self) -> Dict:
+        """Columnar, JSON-serializable representation (used in transcription results and the cache)."""
+        return {
+            'tokens': self.tokens,
+            'token_ids': self.token_ids.tolist(),
+            'start': np.round(self.start.astype(np.float64), 3).tolist(),
+            'end': np.round(self.end.astype(np.float64), 3).tolist(),
+            'probability': np.round(self.probability.astype(np.float64), 4).tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> 'WordTimeline':
+        """Rebuild a timeline from to_dict output (an empty timeline for None)."""
+        if not data:
+            return cls.empty()
+        return cls(data['tokens'], data['token_ids'], data['start'], data['end'],
+                   np.array(data['probability'], dtype=np.float32))
+
+    def __len__(self) -> int:
+        return len(self.token_ids)
+
+    @property
+    def words(self) -> List[str]:
+        """Words in order, as transcribed."""
+        return [self.tokens[i] for i in self.token_ids]
+
+    def pauses(self) -> np.ndarray:
+        """Silence in seconds between consecutive words."""
+        if len(self) < 2:
+            return np.zeros(0, dtype=np.float32)
+        return np.maximum(self.start[1:] - self.end[:-1], 0)
+
+    def fluency_metrics(self, long_pause: float = 1.0, pause_bins: Sequence[float] = DEFAULT_PAUSE_BINS,
+                        fillers: Iterable[str] = DEFAULT_FILLERS) -> Dict:
+        """
+        Compute speech fluency metrics over the whole timeline.
+        Args:
+            long_pause: Pauses at least this long (seconds) count as long silences
+            pause_bins: Upper edges of the pause histogram bins in seconds
+            fillers: Normalized filler words
+        Returns:
+            Dictionary with words per minute, pause histogram, long silence count and filler rate
+        """
+        num_words = len(self)
+        if num_words == 0:
+            return {
+                'word_count': 0,
+                'words_per_minute': 0.0,
+                'articulation_rate': 0.0,
+                'pause_histogram': {},
+                'long_silences': 0,
+                'filler_count': 0,
+                'filler_rate': 0.0,
+                'mean_word_probability': None
+            }
+
+        pauses = self.pauses()
+        span = float(self.end[-1] - self.start[0])
+        speaking_time = float(np.sum(self.end - self.start))
+
+        edges = np.concatenate(([0.0], np.asarray(pause_bins, dtype=np.float64), [np.inf]))
+        counts, _ = np.histogram(pauses, bins=edges)
+        labels = [f"<{edge:g}s" for edge in pause_bins] + [f">={pause_bins[-1]:g}s"]
+
+        # Look up fillers once per distinct token, then count them over all words
+        fillers = set(fillers)
+        is_filler = np.array([normalize_token(token) in fillers for token in self.tokens], dtype=bool)
+        filler_count = int(np.count_nonzero(is_filler[self.token_ids]))
+
+        probabilities = self.probability[~np.isnan(self.probability)]
+        return {
+            'word_count': num_words,
+            'words_per_minute': 60.0 * num_words / span if span > 0 else 0.0,
+            'articulation_rate': 60.0 * num_words / speaking_time if speaking_time > 0 else 0.0,
+            'pause_histogram': dict(zip(labels, counts.tolist())),
+            'long_silences': int(np.count_nonzero(pauses >= long_pause)),
+            'filler_count': filler_count,
+            'filler_rate': filler_count / num_words,
+            'mean_word_probability': float(np.mean(probabilities)) if len(probabilities) else None
+        }